@@ -2,6 +2,7 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 import sqlalchemy as sa
+import io
 import os
 from dotenv import load_dotenv
 from alembic import context
@@ -9,6 +10,11 @@ from sqlmodel import SQLModel
 from app.models.abstractions.base_entity import BaseEntity
 import logging
 from app.models import *
+# Registers op.create_partitioned_table / op.create_monthly_partitions / op.detach_monthly_partitions
+import app.database.partitioning  # noqa: F401
+# Registers op.create_index_concurrently / op.add_foreign_key_not_valid / op.batched_update / ...
+import app.database.online_migrations  # noqa: F401
+from app.database.lock_impact import analyze_script, format_report
 from sqlalchemy.dialects.postgresql import UUID
 
 
@@ -48,6 +54,17 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+# -x options:
+#   zero_downtime=true  one transaction per migration (autocommit blocks for CONCURRENTLY /
+#                       VALIDATE / batched_update) and a lock_timeout so DDL fails fast instead
+#                       of queueing every other query behind it
+#   lock_timeout=5s     lock_timeout used by zero_downtime
+#   lock_report=true    with --sql: print the estimated lock impact instead of the SQL
+x_args = context.get_x_argument(as_dictionary=True)
+ZERO_DOWNTIME = x_args.get("zero_downtime", "false").lower() == "true"
+LOCK_TIMEOUT = x_args.get("lock_timeout", "5s")
+LOCK_REPORT = x_args.get("lock_report", "false").lower() == "true"
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -67,17 +84,21 @@ def run_migrations_offline() -> None:
 
     """
     url = config.get_main_option("sqlalchemy.url")
+    buffer = io.StringIO() if LOCK_REPORT else None
     context.configure(
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,  # Usa batch mode para PostgreSQL
-        include_sql=True  # Opcional, para debug
+        include_sql=True,  # Opcional, para debug
+        output_buffer=buffer,
     )
     logging.info("Initializing offline migrations...")
     with context.begin_transaction():
         context.run_migrations()
+    if buffer is not None:
+        print(format_report(analyze_script(buffer.getvalue())))
     logging.info("Offline migrations completed successfully.")
 
 
@@ -95,9 +116,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if ZERO_DOWNTIME:
+            connection.execute(sa.text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+            connection.commit()
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            transaction_per_migration=ZERO_DOWNTIME,
         )
         logging.info("Initializing online migrations...")
         with context.begin_transaction():
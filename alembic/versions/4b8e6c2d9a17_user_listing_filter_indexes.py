@@ -0,0 +1,32 @@
+"""indexes backing the user listing filters
+
+Revision ID: 4b8e6c2d9a17
+Revises: 9d4f2b7e1c63
+Create Date: 2026-10-19 16:42:10.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e6c2d9a17'
+down_revision: Union[str, Sequence[str], None] = '9d4f2b7e1c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index_concurrently('ix_user_date_created', 'user', ['date_created'])
+    op.create_index_concurrently('ix_user_last_name_name', 'user', ['last_name', 'name'])
+    op.create_index_concurrently('ix_user_role_id', 'user', ['role_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index_concurrently('ix_user_role_id', 'user')
+    op.drop_index_concurrently('ix_user_last_name_name', 'user')
+    op.drop_index_concurrently('ix_user_date_created', 'user')
@@ -0,0 +1,47 @@
+"""stats_rollup table for incrementally maintained group-by counts
+
+Revision ID: 7c1e5a9d2b40
+Revises: 134b55b1963c
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5a9d2b40'
+down_revision: Union[str, Sequence[str], None] = '134b55b1963c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stats_rollup',
+    sa.Column('model_name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('dimension', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('value', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('model_name', 'dimension', 'value')
+    )
+    # Backfill the User rollups (UserRepository.rollup_dimensions)
+    op.execute("""
+        INSERT INTO stats_rollup (model_name, dimension, value, count)
+        SELECT 'User', 'date_created', to_char(date_trunc('day', date_created), 'YYYY-MM-DD'), count(*)
+        FROM "user" WHERE is_deleted IS false GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT 'User', 'role_id', coalesce(role_id::text, 'null'), count(*)
+        FROM "user" WHERE is_deleted IS false GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT 'User', 'is_deleted', CASE WHEN coalesce(is_deleted, false) THEN 'true' ELSE 'false' END, count(*)
+        FROM "user" GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_rollup')
@@ -0,0 +1,45 @@
+"""backfill user.is_deleted for rows created before the column existed
+
+Revision ID: 9d4f2b7e1c63
+Revises: 7c1e5a9d2b40
+Create Date: 2026-10-19 14:05:52.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f2b7e1c63'
+down_revision: Union[str, Sequence[str], None] = '7c1e5a9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # e3498440323f added the column without a value: those users are hidden by `is_deleted IS false`.
+    # Keyset batches with resume (migration_backfill_progress), run with -x zero_downtime=true.
+    op.batched_update('user', 'is_deleted = false', where='is_deleted IS NULL',
+                      batch_size=5000, pause=0.05, name='user.is_deleted')
+    # The now visible rows were skipped by the stats_rollup backfill; recount the User rollups
+    op.execute("DELETE FROM stats_rollup WHERE model_name = 'User'")
+    op.execute("""
+        INSERT INTO stats_rollup (model_name, dimension, value, count)
+        SELECT 'User', 'date_created', to_char(date_trunc('day', date_created), 'YYYY-MM-DD'), count(*)
+        FROM "user" WHERE is_deleted IS false GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT 'User', 'role_id', coalesce(role_id::text, 'null'), count(*)
+        FROM "user" WHERE is_deleted IS false GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT 'User', 'is_deleted', CASE WHEN is_deleted THEN 'true' ELSE 'false' END, count(*)
+        FROM "user" GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data-only migration: NULL and false are equivalent for the application
+    pass
@@ -0,0 +1,33 @@
+"""pattern_ops indexes for the user email/last_name prefix filters
+
+Revision ID: a3f9c27d5e18
+Revises: e5b3f1a8c472
+Create Date: 2026-10-19 10:12:37.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9c27d5e18'
+down_revision: Union[str, Sequence[str], None] = 'e5b3f1a8c472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain btrees only serve LIKE 'abc%' under the C collation
+    op.create_index_concurrently('ix_user_email_prefix', 'user', ['email'],
+                                 postgresql_ops={'email': 'varchar_pattern_ops'})
+    op.create_index_concurrently('ix_user_last_name_prefix', 'user', ['last_name'],
+                                 postgresql_ops={'last_name': 'varchar_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index_concurrently('ix_user_last_name_prefix', 'user')
+    op.drop_index_concurrently('ix_user_email_prefix', 'user')
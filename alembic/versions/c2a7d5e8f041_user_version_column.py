@@ -0,0 +1,29 @@
+"""user.version for optimistic concurrency (If-Match)
+
+Revision ID: c2a7d5e8f041
+Revises: 4b8e6c2d9a17
+Create Date: 2026-10-19 17:20:37.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a7d5e8f041'
+down_revision: Union[str, Sequence[str], None] = '4b8e6c2d9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Constant default: catalog-only on PostgreSQL 11+, no table rewrite
+    op.add_column('user', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user', 'version')
@@ -0,0 +1,29 @@
+"""BRIN index on user.date_created for time-window queries
+
+Revision ID: e5b3f1a8c472
+Revises: c2a7d5e8f041
+Create Date: 2026-10-19 18:05:12.417390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b3f1a8c472'
+down_revision: Union[str, Sequence[str], None] = 'c2a7d5e8f041'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ix_user_date_created (btree) stays: it gives ordered scans for /window pages and sorting
+    op.create_index_concurrently('ix_user_date_created_brin', 'user', ['date_created'], postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index_concurrently('ix_user_date_created_brin', 'user')
@@ -1,10 +1,26 @@
-from typing import TypeVar, Generic, Callable, Type, Optional, List, Any, Tuple
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from http import HTTPStatus
+from typing import TypeVar, Generic, Callable, Type, Optional, List, Any, Tuple, Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse
+from app.core.admission import AdmissionController, READ, WRITE, admission_controller
+from app.core.compression import disable_compression
+from app.core.config import settings
+from app.core.deadlines import request_deadline
+from app.core.security import require_permission
+from app.core.wire_formats import ARROW, JSON, WireFormatRoute, response_media_type, wire_response
+from app.database.change_stream import change_stream
+from app.database.result_cache import ResultCache, cache_key, result_cache
 from app.database.session import get_db
+from app.schemas.abstractions.filters import Condition, created_window, filter_dependency
 from app.schemas.abstractions.paginated_output import PaginatedOutput
+from app.schemas.abstractions.partial_update import partial_update_schema
+from app.schemas.abstractions.sparse_fields import parse_fields
+from app.schemas.abstractions.stats_output import StatsOutput
+from app.schemas.abstractions.window_output import WindowOutput
 from app.services.abstractions.base_service import BaseService
 
 TService = TypeVar("TService", bound=BaseService)
@@ -23,6 +39,22 @@ def get_service_dependency(service_factory: Callable[[Session], Any]):
     return _dependency
 
 
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """If-Match: "<version>" (weak tags accepted) -> expected version; None for absent or "*"."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=HTTPStatus.PRECONDITION_FAILED, detail="If-Match does not match any version")
+    return int(tag)
+
+
+def set_etag(response: Response, result: Any) -> None:
+    version = getattr(result, "version", None)
+    if version is not None:
+        response.headers["ETag"] = f'"{version}"'
+
+
 class BaseRouter(Generic[TService, TInput, TUpdate, TOutput, TPaginatedInput]):
     def __init__(
             self,
@@ -36,8 +68,15 @@ class BaseRouter(Generic[TService, TInput, TUpdate, TOutput, TPaginatedInput]):
             resource_name: str,
             tags: Optional[list[str]] = None,
             id_type: Type[Any] = str,  # uuid.UUID, int, etc.
+            route_limits: Optional[dict[str, int]] = None,  # {"get_paged": 10, ...}
+            admission: AdmissionController = admission_controller,
+            uncompressed_routes: Optional[set[str]] = None,  # {"get_by_id", ...}
+            stats_dimensions: Optional[list[str]] = None,  # enables GET /stats, e.g. ["date_created", "role_id"]
+            route_timeouts: Optional[dict[str, Optional[int]]] = None,  # ms, {"get_paged": 5000, ...}
+            route_permissions: Optional[dict[str, list[str]]] = None,  # {"delete_item": ["users:delete"], ...}
+            listing_cache: Optional[ResultCache] = result_cache,  # None disables caching of GET / pages
     ):
-        self.router = APIRouter(prefix=prefix, tags=tags or [])
+        self.router = APIRouter(prefix=prefix, tags=tags or [], route_class=WireFormatRoute)
         self.service_factory = service_factory
         self.input_schema = input_schema
         self.update_schema = update_schema
@@ -46,8 +85,37 @@ class BaseRouter(Generic[TService, TInput, TUpdate, TOutput, TPaginatedInput]):
         self.id_type = id_type
         self.resource_name = resource_name
         self.service_dependency = get_service_dependency(service_factory)
+        self.route_limits = route_limits or {}
+        self.admission = admission
+        self.uncompressed_routes = uncompressed_routes or set()
+        self.stats_dimensions = stats_dimensions or []
+        self.route_timeouts = route_timeouts or {}
+        self.route_permissions = route_permissions or {}
+        self.listing_cache = listing_cache if settings.RESULT_CACHE_ENABLED else None
         self._register_routes()
 
+    def admission_dependency(self, route_name: str, priority: str = READ) -> Any:
+        """Admission slot for a route; resolved before get_db checks out a connection."""
+        return Depends(self.admission.dependency(
+            f"{self.router.prefix}:{route_name}", priority, self.route_limits.get(route_name)
+        ))
+
+    def route_dependencies(self, route_name: str, priority: str = READ) -> List[Any]:
+        dependencies = []
+        if route_name in self.route_permissions:
+            # Authorized from the token claims, before an admission slot or connection is taken
+            dependencies.append(Depends(require_permission(*self.route_permissions[route_name])))
+        dependencies += [
+            self.admission_dependency(route_name, priority),
+            Depends(request_deadline(
+                f"{self.router.prefix}:{route_name}",
+                self.route_timeouts.get(route_name, settings.QUERY_TIMEOUT_DEFAULT_MS),
+            )),
+        ]
+        if route_name in self.uncompressed_routes:
+            dependencies.append(Depends(disable_compression))
+        return dependencies
+
 
     def _register_routes(self):
 
@@ -55,48 +123,172 @@ class BaseRouter(Generic[TService, TInput, TUpdate, TOutput, TPaginatedInput]):
         paginated_input_schema = self.paginated_input_schema
         input_schema = self.input_schema
         update_schema = self.update_schema
+        patch_schema = partial_update_schema(self.update_schema)
+
+        # GET /stats (before /{item_id} so it is not parsed as an id)
+        if self.stats_dimensions:
+            @self.router.get(
+                "/stats",
+                response_model=StatsOutput,
+                status_code=status.HTTP_200_OK,
+                dependencies=self.route_dependencies("stats", READ),
+            )
+            async def get_stats(
+                    group_by: List[str] = Query(..., description=f"Dimensions: {', '.join(self.stats_dimensions)}"),
+                    bucket: Literal["day", "week", "month"] = Query("day", description="Bucket for date dimensions"),
+                    created_from: Optional[datetime] = Query(None, description="date_created >= created_from"),
+                    created_to: Optional[datetime] = Query(None, description="date_created < created_to"),
+                    service: TService = Depends(self.service_dependency),
+            ):
+                invalid = [d for d in group_by if d not in self.stats_dimensions]
+                if invalid:
+                    raise HTTPException(
+                        status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                        detail=f"Unknown dimensions: {', '.join(invalid)}",
+                    )
+                return await service.get_stats(list(dict.fromkeys(group_by)), bucket, created_from, created_to)
+
+        # GET /count and GET /window (before /{item_id} as well)
+        @self.router.get(
+            "/count",
+            status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("count", READ),
+        )
+        async def count(
+                filters: List[Condition] = Depends(filter_dependency(paginated_input_schema.filters)),
+                window: List[Condition] = Depends(created_window),
+                service: TService = Depends(self.service_dependency),
+        ):
+            return {"total": await service.count(filters + window)}
+
+        @self.router.get(
+            "/window",
+            response_model=WindowOutput,
+            status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("window", READ),
+        )
+        async def get_window(
+                size: int = Query(100, ge=1, le=1000, description="Rows per page"),
+                cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                filters: List[Condition] = Depends(filter_dependency(paginated_input_schema.filters)),
+                window: List[Condition] = Depends(created_window),
+                fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+                media_type: str = Depends(response_media_type(tabular=True)),
+                service: TService = Depends(self.service_dependency),
+        ):
+            selected = parse_fields(fields, self.output_schema, service.model)
+            result = await service.get_window(size, cursor, filters + window, selected, id_type)
+            if media_type != JSON:
+                return wire_response(result, media_type)
+            return result
+
+        # GET /changes: long-lived, so it takes no admission slot and no deadline
+        @self.router.get(
+            "/changes",
+            response_class=StreamingResponse,
+            responses={200: {"content": {"text/event-stream": {}}}},
+            dependencies=[Depends(require_permission(*self.route_permissions["changes"]))]
+            if "changes" in self.route_permissions else [],
+        )
+        async def changes(
+                last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+                since: Optional[str] = Query(None, description="Event id to resume after (instead of Last-Event-ID)"),
+                service: TService = Depends(self.service_dependency),
+        ):
+            client = change_stream.subscribe(service.model.__name__, last_event_id or since)
+            return StreamingResponse(
+                change_stream.stream(client),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
         # GET /{id}
         @self.router.get(
             "/{item_id}",
             response_model=self.output_schema,
             status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("get_by_id", READ),
         )
         async def get_by_id(
                 item_id: id_type,
+                response: Response,
+                fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+                media_type: str = Depends(response_media_type()),
                 service: TService = Depends(self.service_dependency),
         ):
-            return await service.get_by_id(item_id)
+            selected = parse_fields(fields, self.output_schema, service.model)
+            result = await service.get_by_id(item_id, fields=selected)
+            if not selected:
+                set_etag(response, result)
+            if media_type != JSON:
+                return wire_response(result, media_type, headers=dict(response.headers))
+            if selected:
+                # Partial payload: bypass response_model validation against the full schema
+                return JSONResponse(content=jsonable_encoder(result))
+            return result
 
         # GET /
         @self.router.get(
             "/",
             response_model=PaginatedOutput[self.output_schema],  # (items, total)
             status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("get_paged", READ),
         )
         async def get_paged(
                 params: paginated_input_schema = Depends(paginated_input_schema),
+                filters: List[Condition] = Depends(filter_dependency(paginated_input_schema.filters)),
+                window: List[Condition] = Depends(created_window),
+                fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+                media_type: str = Depends(response_media_type(tabular=True)),
                 service: TService = Depends(self.service_dependency),
         ):
+            filters = filters + window
             # Por defecto, delega completamente en service.get_paged
-            items, total = await service.get_paged(params)
-            return PaginatedOutput(items=items, total=total)
+            selected = parse_fields(fields, self.output_schema, service.model)
+            # Arrow carries the total in a header, which the cache does not keep
+            cache = self.listing_cache if media_type != ARROW else None
+            if cache is not None:
+                model_name = service.model.__name__
+                key = cache_key(self.router.prefix, params.model_dump(mode="json"),
+                                [(f.field, f.operator, f.value) for f in filters], selected, media_type)
+                body = cache.get(model_name, key)
+                if body is not None:
+                    return Response(content=body, media_type=media_type)
+                # Read before querying: a write committed meanwhile makes this page stale
+                generation = cache.generation(model_name)
+
+            items, total = await service.get_paged(params, fields=selected, filters=filters)
+            page = PaginatedOutput(items=items, total=total)
+            if media_type != JSON:
+                response = wire_response(page, media_type)
+            elif cache is None:
+                return page
+            else:
+                response = Response(content=page.model_dump_json().encode(), media_type=media_type)
+            if cache is not None:
+                cache.put(model_name, key, generation, response.body)
+            return response
 
         # POST /
         @self.router.post(
             "/",
             response_model=self.output_schema,
             status_code=status.HTTP_201_CREATED,
+            dependencies=self.route_dependencies("create_item", WRITE),
         )
         async def create_item(
                 payload: input_schema,
+                media_type: str = Depends(response_media_type()),
                 service: TService = Depends(self.service_dependency),
         ):
             result = await service.create(payload)
             location = f"{self.router.prefix}/{result.id}"
+            output = self.output_schema.model_validate(result, from_attributes=True)
+            if media_type != JSON:
+                return wire_response(output, media_type, status.HTTP_201_CREATED, {"Location": location})
             return JSONResponse(
                     status_code=status.HTTP_201_CREATED,
-                    content=jsonable_encoder(self.output_schema.model_validate(result, from_attributes=True)),
+                    content=jsonable_encoder(output),
                     headers={"Location": location}
             )
 
@@ -105,31 +297,54 @@ class BaseRouter(Generic[TService, TInput, TUpdate, TOutput, TPaginatedInput]):
             "/{item_id}",
             response_model=self.output_schema,
             status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("update_item", WRITE),
         )
         async def update_item(
                 item_id: id_type,
                 payload: update_schema,
+                response: Response,
+                if_match: Optional[str] = Header(None, alias="If-Match", description='ETag from a previous read, e.g. "3"'),
+                media_type: str = Depends(response_media_type()),
+                service: TService = Depends(self.service_dependency),
+        ):
+            result = await service.update_item(item_id, payload, expected_version=parse_if_match(if_match))
+            set_etag(response, result)
+            if media_type != JSON:
+                return wire_response(result, media_type, headers=dict(response.headers))
+            return result
+
+        # PATCH /{id}
+        @self.router.patch(
+            "/{item_id}",
+            response_model=self.output_schema,
+            status_code=status.HTTP_200_OK,
+            dependencies=self.route_dependencies("patch_item", WRITE),
+        )
+        async def patch_item(
+                item_id: id_type,
+                payload: patch_schema,
+                response: Response,
+                if_match: Optional[str] = Header(None, alias="If-Match", description='ETag from a previous read, e.g. "3"'),
+                media_type: str = Depends(response_media_type()),
                 service: TService = Depends(self.service_dependency),
         ):
-            # BaseService.update requiere un update_fn; el servicio concreto puede exponer
-            # un método update_xxx que envuelva esta lógica, así que por defecto aquí
-            # llamamos a un método estándar del service si lo define.
-            if not hasattr(service, "update_item"):
-                # Si el servicio no define un método de actualización “simple”,
-                # se espera que el router concreto lo sobrescriba.
-                raise NotImplementedError(
-                    "El servicio debe implementar 'update_item' o el router debe definir su propia ruta PUT."
-                )
-            return await service.update_item(item_id, payload)  # type: ignore
+            # Only the fields present in the body are compared and written
+            result = await service.patch_item(item_id, payload, expected_version=parse_if_match(if_match))
+            set_etag(response, result)
+            if media_type != JSON:
+                return wire_response(result, media_type, headers=dict(response.headers))
+            return result
 
         # DELETE /{id}
         @self.router.delete(
             "/{item_id}",
             status_code=status.HTTP_204_NO_CONTENT,
+            dependencies=self.route_dependencies("delete_item", WRITE),
         )
         async def delete_item(
                 item_id: id_type,
+                if_match: Optional[str] = Header(None, alias="If-Match", description='ETag from a previous read, e.g. "3"'),
                 service: TService = Depends(self.service_dependency),
         ):
-            await service.delete(item_id)
+            await service.delete(item_id, expected_version=parse_if_match(if_match))
             return None
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.profiling import PROFILE_HEADER, profile_store, profile_token, profiling_toggle
+from app.core.security import require_permission
+from app.database.existence_filter import user_email_filter
+from app.database.query_plans import plan_capture
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_permission(settings.ADMIN_PERMISSION))],
+)
+
+
+@router.get("/query-plans", status_code=status.HTTP_200_OK)
+async def get_query_plans():
+    return {
+        "slow_ms": plan_capture.slow_ms,
+        "sample_rate": plan_capture.sample_rate,
+        "dropped": plan_capture.dropped,
+        "groups": plan_capture.grouped(),
+    }
+
+
+@router.delete("/query-plans", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_query_plans():
+    plan_capture.clear()
+
+
+class ProfilingInput(BaseModel):
+    enabled: bool
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+
+
+@router.get("/profiling", status_code=status.HTTP_200_OK)
+async def get_profiling():
+    return {"enabled": profiling_toggle.enabled, "sample_rate": profiling_toggle.sample_rate}
+
+
+@router.post("/profiling", status_code=status.HTTP_200_OK)
+async def set_profiling(payload: ProfilingInput):
+    # Per worker process; the signed header works on every worker
+    profiling_toggle.enabled = payload.enabled
+    if payload.sample_rate is not None:
+        profiling_toggle.sample_rate = payload.sample_rate
+    return {"enabled": profiling_toggle.enabled, "sample_rate": profiling_toggle.sample_rate}
+
+
+@router.post("/profiling/token", status_code=status.HTTP_200_OK)
+async def create_profiling_token(ttl_seconds: int = 600):
+    return {"header": PROFILE_HEADER, "value": profile_token(ttl_seconds)}
+
+
+@router.get("/profiles", status_code=status.HTTP_200_OK)
+async def list_profiles():
+    return {"directory": profile_store.directory, "max_files": profile_store.max_files,
+            "profiles": profile_store.list()}
+
+
+@router.get("/profiles/{name}")
+async def get_profile(name: str):
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=name)
+
+
+@router.get("/loop-stalls", status_code=status.HTTP_200_OK)
+async def get_loop_stalls():
+    return {"threshold_ms": loop_monitor.threshold_ms, "stalls": loop_monitor.recent()}
+
+
+@router.delete("/loop-stalls", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_loop_stalls():
+    loop_monitor.clear()
+
+
+@router.get("/existence-filters", status_code=status.HTTP_200_OK)
+async def get_existence_filters():
+    return {"filters": [user_email_filter.stats()]}
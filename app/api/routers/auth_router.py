@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.core.security import Claims, get_current_claims
+from app.database.session import get_db
+from app.schemas.auth.auth_schemas import LoginInput, TokenOutput
+from app.services.auth.auth_service import AuthService
+
+
+def auth_service_factory(db: Session = Depends(get_db)) -> AuthService:
+    return AuthService(db)
+
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/login", response_model=TokenOutput, status_code=status.HTTP_200_OK)
+async def login(
+        credentials: LoginInput,
+        auth_service: AuthService = Depends(auth_service_factory),
+):
+    return await auth_service.login(credentials)
+
+
+@router.get("/me", status_code=status.HTTP_200_OK)
+async def me(claims: Claims = Depends(get_current_claims)):
+    # Served from the token alone, no DB access
+    return {"id": claims["sub"], "role": claims.get("role"), "permissions": claims.get("permissions", [])}
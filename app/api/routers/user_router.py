@@ -30,6 +30,7 @@ user_base_router = BaseRouter[
     resource_name="user",
     tags=["Users"],
     id_type=uuid.UUID,
+    stats_dimensions=["date_created", "role_id", "is_deleted"],
 )
 
 router: APIRouter = user_base_router.router
@@ -40,7 +41,7 @@ router: APIRouter = user_base_router.router
 # async def get_me(...):
 #     ...
 
-@router.get("/users/by_email/{email}")
+@router.get("/users/by_email/{email}", dependencies=user_base_router.route_dependencies("by_email"))
 async def by_email(
     email: str,
     user_service: UserService = Depends(user_service_factory),
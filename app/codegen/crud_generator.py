@@ -0,0 +1,331 @@
+"""Ahead-of-time CRUD generator.
+
+Emits a specialized repository, service and router module for one model so the
+read path has no generic indirection (abstract properties, closures, lambda
+predicates): statements are built once at import time with bind parameters and
+every field is accessed directly.
+
+Writes (create, update, delete) and filtered listings are delegated to the
+model's hand-written service, so its overrides (password hashing, existence
+filter, If-Match versions, write invalidation) apply unchanged. A service that
+overrides get_by_id or get_paged is refused: the compiled reads would bypass it.
+
+    python -m app.codegen.crud_generator app.models.user:User \\
+        --service app.services.user.user_service:UserService \\
+        --input app.schemas.user.user_schemas:UserInput \\
+        --update app.schemas.user.user_schemas:UserUpdateInput \\
+        --output app.schemas.user.user_schemas:UserOutput \\
+        --paginated app.schemas.user.user_schemas:UserPaginatedInput \\
+        --prefix /users --tags Users --out app/generated
+"""
+import argparse
+import importlib
+import os
+import re
+from dataclasses import dataclass
+from string import Template
+from typing import Dict, List, Literal, Optional, get_args, get_origin
+
+GENERATED_HEADER = "# Generated by app.codegen.crud_generator - do not edit by hand.\n"
+
+
+# Compiled in the generated modules; a service overriding one of these cannot be specialized
+COMPILED_READS = ("get_by_id", "get_paged")
+
+
+@dataclass
+class CrudSpec:
+    model: type
+    service: type
+    input_schema: type
+    update_schema: type
+    output_schema: type
+    paginated_input_schema: type
+    prefix: str
+    tags: List[str]
+
+    @property
+    def name(self) -> str:
+        return self.model.__name__
+
+    @property
+    def snake_name(self) -> str:
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", self.name).lower()
+
+    @property
+    def order_fields(self) -> List[str]:
+        field = self.paginated_input_schema.model_fields.get("offset_field")
+        if field is None or get_origin(field.annotation) is not Literal:
+            return []
+        return list(get_args(field.annotation))
+
+
+def load_object(path: str):
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def check_service(spec: CrudSpec) -> None:
+    from app.services.abstractions.base_service import BaseService
+
+    overridden = [name for name in COMPILED_READS if getattr(spec.service, name) is not getattr(BaseService, name)]
+    if overridden:
+        raise ValueError(f"{spec.service.__name__} overrides {', '.join(overridden)}; "
+                         "the generated read path would bypass it")
+
+
+def _imports(spec: CrudSpec) -> Dict[str, str]:
+    schema_names = sorted({
+        spec.input_schema.__name__, spec.update_schema.__name__,
+        spec.output_schema.__name__, spec.paginated_input_schema.__name__,
+    })
+    schema_modules = {
+        spec.input_schema.__module__, spec.update_schema.__module__,
+        spec.output_schema.__module__, spec.paginated_input_schema.__module__,
+    }
+    if len(schema_modules) == 1:
+        schema_import = f"from {schema_modules.pop()} import (\n    {', '.join(schema_names)},\n)"
+    else:
+        schema_import = "\n".join(
+            f"from {schema.__module__} import {schema.__name__}"
+            for schema in (spec.input_schema, spec.update_schema, spec.output_schema, spec.paginated_input_schema)
+        )
+    return {
+        "model_import": f"from {spec.model.__module__} import {spec.name}",
+        "schema_import": schema_import,
+        "service_import": f"from {spec.service.__module__} import {spec.service.__name__}",
+    }
+
+
+REPOSITORY_TEMPLATE = Template('''$header
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import asc, bindparam, desc, func, select
+from sqlalchemy.orm import Session
+
+from app.repositories.abstractions.base_repository import run_off_loop
+$model_import
+
+_ACTIVE = $model.is_deleted.is_(False)
+
+_GET_BY_ID = select($model).where(_ACTIVE, $model.id == bindparam("id"))
+_COUNT = select(func.count()).select_from($model).where(_ACTIVE)
+_PAGE = select($model).where(_ACTIVE).offset(bindparam("offset")).limit(bindparam("limit"))
+_PAGE_ORDERED = {
+$page_ordered}
+
+
+class ${model}CompiledRepository:
+    __slots__ = ("db",)
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @run_off_loop
+    def get_by_id(self, id) -> Optional[$model]:
+        return self.db.execute(_GET_BY_ID, {"id": id}).scalar_one_or_none()
+
+    @run_off_loop
+    def get_paged(self, page: int, size: int, order_field: Optional[str] = None,
+                  ascending: bool = True) -> Tuple[Sequence[$model], int]:
+        total = self.db.execute(_COUNT).scalar() or 0
+        statement = _PAGE_ORDERED[(order_field, ascending)] if order_field else _PAGE
+        items = self.db.execute(statement, {"offset": (page - 1) * size, "limit": size}).scalars().all()
+        return items, total
+''')
+
+SERVICE_TEMPLATE = Template('''$header
+from http import HTTPStatus
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.schemas.abstractions.filters import Condition
+$schema_import
+$service_import
+from $repository_module import ${model}CompiledRepository
+
+_validate_output = ${output}.model_validate
+
+
+class ${model}CompiledService:
+    __slots__ = ("db", "repository", "service")
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = ${model}CompiledRepository(db)
+        # Writes and filtered listings keep every rule of the hand-written service
+        self.service = ${service}(db)
+
+    async def get_by_id(self, entity_id) -> $output:
+        entity = await self.repository.get_by_id(entity_id)
+        if entity is None:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="$model not found")
+        return _validate_output(entity, from_attributes=True)
+
+    async def get_paged(self, params: $paginated,
+                        filters: Optional[List[Condition]] = None) -> Tuple[List[$output], int]:
+        if filters:
+            return await self.service.get_paged(params, filters=filters)
+        entities, total = await self.repository.get_paged(params.page, params.size, $order_field_expr, params.ascending)
+        return [_validate_output(e, from_attributes=True) for e in entities], total
+
+    async def create(self, payload: $input) -> $output:
+        return _validate_output(await self.service.create(payload), from_attributes=True)
+
+    async def update_item(self, entity_id, payload: $update, expected_version: Optional[int] = None) -> $output:
+        return await self.service.update_item(entity_id, payload, expected_version=expected_version)
+
+    async def delete(self, entity_id, expected_version: Optional[int] = None) -> bool:
+        return await self.service.delete(entity_id, expected_version=expected_version)
+''')
+
+ROUTER_TEMPLATE = Template('''$header
+import uuid
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.api.routers.abstractions.base_router import parse_if_match, set_etag
+from app.database.session import get_db
+from app.schemas.abstractions.filters import Condition, created_window, filter_dependency
+from app.schemas.abstractions.paginated_output import PaginatedOutput
+$schema_import
+from $service_module import ${model}CompiledService
+
+router = APIRouter(prefix="$prefix", tags=$tags)
+
+
+def get_${snake}_service(db: Session = Depends(get_db)) -> ${model}CompiledService:
+    return ${model}CompiledService(db)
+
+
+@router.get("/{item_id}", response_model=$output, status_code=status.HTTP_200_OK)
+async def get_by_id(item_id: uuid.UUID, response: Response,
+                    service: ${model}CompiledService = Depends(get_${snake}_service)):
+    result = await service.get_by_id(item_id)
+    set_etag(response, result)
+    return result
+
+
+@router.get("/", response_model=PaginatedOutput[$output], status_code=status.HTTP_200_OK)
+async def get_paged(params: $paginated = Depends($paginated),
+                    filters: List[Condition] = Depends(filter_dependency(${paginated}.filters)),
+                    window: List[Condition] = Depends(created_window),
+                    service: ${model}CompiledService = Depends(get_${snake}_service)):
+    items, total = await service.get_paged(params, filters + window)
+    return PaginatedOutput(items=items, total=total)
+
+
+@router.post("/", response_model=$output, status_code=status.HTTP_201_CREATED)
+async def create_item(payload: $input, service: ${model}CompiledService = Depends(get_${snake}_service)):
+    result = await service.create(payload)
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content=jsonable_encoder(result),
+        headers={"Location": f"$prefix/{result.id}"},
+    )
+
+
+@router.put("/{item_id}", response_model=$output, status_code=status.HTTP_200_OK)
+async def update_item(item_id: uuid.UUID, payload: $update, response: Response,
+                      if_match: Optional[str] = Header(None, alias="If-Match"),
+                      service: ${model}CompiledService = Depends(get_${snake}_service)):
+    result = await service.update_item(item_id, payload, expected_version=parse_if_match(if_match))
+    set_etag(response, result)
+    return result
+
+
+@router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(item_id: uuid.UUID, if_match: Optional[str] = Header(None, alias="If-Match"),
+                      service: ${model}CompiledService = Depends(get_${snake}_service)):
+    await service.delete(item_id, expected_version=parse_if_match(if_match))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+''')
+
+
+def render(spec: CrudSpec, package: str) -> Dict[str, str]:
+    """Return {filename: source} for the repository, service and router modules."""
+    check_service(spec)
+    imports = _imports(spec)
+    snake = spec.snake_name
+    repository_module = f"{package}.{snake}_repository"
+    service_module = f"{package}.{snake}_service"
+
+    page_ordered = "".join(
+        f'    ("{field}", {ascending}): _PAGE.order_by({"asc" if ascending else "desc"}({spec.name}.{field})),\n'
+        for field in spec.order_fields for ascending in (True, False)
+    )
+    order_field_expr = "params.offset_field" if spec.order_fields else "None"
+    common = {
+        "header": GENERATED_HEADER,
+        "model": spec.name,
+        "service": spec.service.__name__,
+        "snake": snake,
+        "input": spec.input_schema.__name__,
+        "update": spec.update_schema.__name__,
+        "output": spec.output_schema.__name__,
+        "paginated": spec.paginated_input_schema.__name__,
+        "prefix": spec.prefix,
+        "tags": repr(spec.tags),
+        "repository_module": repository_module,
+        "service_module": service_module,
+        **imports,
+    }
+    return {
+        f"{snake}_repository.py": REPOSITORY_TEMPLATE.substitute(common, page_ordered=page_ordered),
+        f"{snake}_service.py": SERVICE_TEMPLATE.substitute(common, order_field_expr=order_field_expr),
+        f"{snake}_router.py": ROUTER_TEMPLATE.substitute(common),
+    }
+
+
+def write(spec: CrudSpec, out_dir: str, package: Optional[str] = None) -> List[str]:
+    package = package or out_dir.strip("/").replace("/", ".")
+    os.makedirs(out_dir, exist_ok=True)
+    init_file = os.path.join(out_dir, "__init__.py")
+    if not os.path.exists(init_file):
+        open(init_file, "w").close()
+    written = []
+    for filename, source in render(spec, package).items():
+        path = os.path.join(out_dir, filename)
+        with open(path, "w") as f:
+            f.write(source)
+        written.append(path)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a specialized CRUD repository/service/router")
+    parser.add_argument("model", help="module:Model, e.g. app.models.user:User")
+    parser.add_argument("--service", required=True, help="module:Service handling writes, e.g. "
+                                                         "app.services.user.user_service:UserService")
+    parser.add_argument("--input", required=True, help="module:InputSchema")
+    parser.add_argument("--update", required=True, help="module:UpdateSchema")
+    parser.add_argument("--output", required=True, help="module:OutputSchema")
+    parser.add_argument("--paginated", required=True, help="module:PaginatedInputSchema")
+    parser.add_argument("--prefix", required=True, help="Router prefix, e.g. /users")
+    parser.add_argument("--tags", nargs="*", default=[])
+    parser.add_argument("--out", default="app/generated", help="Output directory (a Python package)")
+    parser.add_argument("--package", default=None, help="Import path of --out (defaults to --out with dots)")
+    args = parser.parse_args(argv)
+
+    spec = CrudSpec(
+        model=load_object(args.model),
+        service=load_object(args.service),
+        input_schema=load_object(args.input),
+        update_schema=load_object(args.update),
+        output_schema=load_object(args.output),
+        paginated_input_schema=load_object(args.paginated),
+        prefix=args.prefix,
+        tags=args.tags,
+    )
+    for path in write(spec, args.out, args.package):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Admission control and load shedding in front of the DB pool.
+
+Every BaseRouter route passes through two limiters before `get_db` checks out a
+connection: an optional per-route concurrency limit and a global limit sized to
+the connection pool. Requests that cannot get a slot wait in a bounded queue;
+once the queue is full or the wait deadline passes they get a fast 503 with
+Retry-After instead of piling up on the pool.
+
+Priority classes: writes are woken before reads, and reads have a smaller queue
+and a shorter deadline, so under pressure reads are shed first.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+READ = "read"
+WRITE = "write"
+
+
+@dataclass(frozen=True)
+class PriorityPolicy:
+    max_queue: int
+    max_wait: float  # seconds
+
+
+class Shed(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {WRITE: deque(), READ: deque()}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(w) for w in self._waiters.values())
+
+    async def acquire(self, priority: str, policy: PriorityPolicy, deadline: float) -> None:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return
+        if self.queued >= policy.max_queue:
+            raise Shed(f"{self.name}: queue full")
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise Shed(f"{self.name}: deadline exceeded")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            # The slot is handed over by release(); active is not decremented in between
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._remove(priority, waiter)
+            raise Shed(f"{self.name}: wait exceeded {policy.max_wait:.2f}s")
+        except asyncio.CancelledError:
+            self._remove(priority, waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        for priority in (WRITE, READ):
+            waiters = self._waiters[priority]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.active -= 1
+
+    def _remove(self, priority: str, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters[priority].remove(waiter)
+        except ValueError:
+            pass
+
+
+class AdmissionController:
+    def __init__(self, db_concurrency: int, policies: Dict[str, PriorityPolicy], retry_after: int = 1,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.retry_after = retry_after
+        self.policies = policies
+        self.db_limiter = ConcurrencyLimiter("db", db_concurrency)
+        self.route_limiters: Dict[str, ConcurrencyLimiter] = {}
+        self.shed_total: Dict[str, int] = {}
+
+    def route_limiter(self, key: str, limit: int) -> ConcurrencyLimiter:
+        limiter = self.route_limiters.get(key)
+        if limiter is None:
+            limiter = self.route_limiters[key] = ConcurrencyLimiter(key, limit)
+        return limiter
+
+    def dependency(self, route_key: str, priority: str = READ, route_limit: Optional[int] = None):
+        """FastAPI dependency holding an admission slot for the whole request."""
+        route_limiter = self.route_limiter(route_key, route_limit) if route_limit else None
+
+        async def _admit():
+            if not self.enabled:
+                yield
+                return
+            policy = self.policies[priority]
+            deadline = time.monotonic() + policy.max_wait
+            acquired = []
+            try:
+                for limiter in (route_limiter, self.db_limiter):
+                    if limiter is not None:
+                        await limiter.acquire(priority, policy, deadline)
+                        acquired.append(limiter)
+            except Shed as e:
+                for limiter in reversed(acquired):
+                    limiter.release()
+                key = f"{route_key}:{priority}"
+                self.shed_total[key] = self.shed_total.get(key, 0) + 1
+                raise HTTPException(
+                    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                    detail=f"Server overloaded ({e.reason})",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            try:
+                yield
+            finally:
+                for limiter in reversed(acquired):
+                    limiter.release()
+
+        return _admit
+
+
+admission_controller = AdmissionController(
+    db_concurrency=settings.ADMISSION_DB_CONCURRENCY,
+    policies={
+        READ: PriorityPolicy(settings.ADMISSION_READ_MAX_QUEUE, settings.ADMISSION_READ_MAX_WAIT),
+        WRITE: PriorityPolicy(settings.ADMISSION_WRITE_MAX_QUEUE, settings.ADMISSION_WRITE_MAX_WAIT),
+    },
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+    enabled=settings.ADMISSION_ENABLED,
+)
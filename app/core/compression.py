@@ -0,0 +1,208 @@
+"""Negotiated response compression (zstd, br, gzip).
+
+brotli and zstandard are optional: an encoding is only offered when its
+package is installed. Bodies smaller than COMPRESSION_MIN_SIZE go out as-is,
+bodies above COMPRESSION_OFFLOAD_SIZE are compressed in a worker thread, and
+streamed responses (StreamingResponse) are compressed chunk by chunk with a
+flush after each one so clients keep receiving data as it is produced.
+
+Routes opt out with `Depends(disable_compression)` (BaseRouter: `uncompressed_routes`).
+"""
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip",
+                       "application/octet-stream", "text/event-stream")
+
+
+def _gzip_compressobj(level: int):
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self.level = level
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = _gzip_compressobj(self.level)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, data: bytes, final: bool) -> bytes:
+        if self._stream is None:
+            self._stream = _gzip_compressobj(self.level)
+        out = self._stream.compress(data)
+        return out + self._stream.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self.quality = quality
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self, data: bytes, final: bool) -> bytes:
+        if self._stream is None:
+            self._stream = brotli.Compressor(quality=self.quality)
+        out = self._stream.process(data)
+        return out + (self._stream.finish() if final else self._stream.flush())
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self.level = level
+        self._stream = None
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, data: bytes, final: bool) -> bytes:
+        if self._stream is None:
+            self._stream = zstandard.ZstdCompressor(level=self.level).compressobj()
+        out = self._stream.compress(data)
+        flag = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return out + self._stream.flush(flag)
+
+
+def available_encoders() -> Dict[str, Callable[[], object]]:
+    """Supported encodings in server preference order."""
+    encoders: Dict[str, Callable[[], object]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = lambda: _Zstd(settings.COMPRESSION_ZSTD_LEVEL)
+    if brotli is not None:
+        encoders["br"] = lambda: _Brotli(settings.COMPRESSION_BROTLI_QUALITY)
+    encoders["gzip"] = lambda: _Gzip(settings.COMPRESSION_GZIP_LEVEL)
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick the encoding with the highest q-value; ties go to server preference."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best: Optional[Tuple[float, int, str]] = None
+    for preference, encoding in enumerate(supported):
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q <= 0:
+            continue
+        candidate = (q, -preference, encoding)
+        if best is None or candidate > best:
+            best = candidate
+    return best[2] if best else None
+
+
+def disable_compression(request: Request) -> None:
+    """Route dependency: send this route's responses uncompressed."""
+    request.state.compress = False
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None, offload_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.offload_size = settings.COMPRESSION_OFFLOAD_SIZE if offload_size is None else offload_size
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.encoder = None
+        self.start_message = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if self.scope.get("state", {}).get("compress") is False:
+            return False
+        if self.start_message["status"] < 200 or self.start_message["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(_SKIP_CONTENT_TYPES)
+
+    async def _compress(self, body: bytes, final: bool, streaming: bool) -> bytes:
+        fn = (lambda: self.encoder.stream(body, final)) if streaming else (lambda: self.encoder.compress(body))
+        if len(body) >= self.middleware.offload_size:
+            return await to_thread.run_sync(fn)
+        return fn()
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            single_small = not more_body and len(body) < self.middleware.minimum_size
+            if single_small or not self._should_compress(headers):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.encoder = self.middleware.encoders[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                compressed = await self._compress(body, final=False, streaming=True)
+            else:
+                compressed = await self._compress(body, final=True, streaming=False)
+                headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = await self._compress(body, final=not more_body, streaming=True)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
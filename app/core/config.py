@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -18,6 +18,100 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Primary key generator for BaseEntity.id: "uuid7" (time-ordered) or "uuid4"
+    ID_GENERATOR: str = "uuid7"
+
+    # Partition maintenance (PartitionedEntity tables)
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_RETENTION_MONTHS: Optional[int] = None
+
+    # Cold start
+    STARTUP_WARMUP: bool = True
+    OPENAPI_WARMUP: bool = True
+    OPENAPI_SCHEMA_PATH: Optional[str] = None
+    DB_POOL_WARMUP_CONNECTIONS: int = 0
+    LAZY_ROUTER_PREFIXES: List[str] = []
+
+    # Cache invalidation bus: "local" | "file" | "postgres"
+    INVALIDATION_BUS_BACKEND: str = "local"
+    INVALIDATION_BUS_CHANNEL: str = "cache_invalidation"
+    INVALIDATION_BUS_FILE: str = "/tmp/cache_invalidation.log"
+
+    # Admission control in front of the DB pool (default pool: 5 + 10 overflow)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_DB_CONCURRENCY: int = 15
+    ADMISSION_READ_MAX_QUEUE: int = 50
+    ADMISSION_READ_MAX_WAIT: float = 0.5
+    ADMISSION_WRITE_MAX_QUEUE: int = 100
+    ADMISSION_WRITE_MAX_WAIT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # Response compression (br/zstd need the optional brotli/zstandard packages)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Query deadlines (ms): default per request, overridable per route and by X-Request-Timeout-Ms
+    QUERY_TIMEOUT_DEFAULT_MS: Optional[int] = 30000
+    QUERY_TIMEOUT_MAX_MS: int = 120000
+
+    # Pre-fork launcher (python -m app.core.prefork)
+    PREFORK_WORKERS: int = 2
+    PREFORK_GC_FREEZE: bool = True
+    GC_THRESHOLDS: List[int] = [50000, 20, 20]  # worker gc.set_threshold; gen0 sized for request churn
+
+    # Auth: bcrypt cost and size of the LRU of verified access tokens
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    AUTH_VERIFY_CACHE_SIZE: int = 10000
+    ADMIN_PERMISSION: str = "admin"  # required by the /admin endpoints
+
+    # Plan capture for slow or sampled queries (GET /admin/query-plans)
+    QUERY_PLAN_CAPTURE_ENABLED: bool = True
+    QUERY_PLAN_SLOW_MS: float = 500
+    QUERY_PLAN_SAMPLE_RATE: float = 0.0
+    QUERY_PLAN_BUFFER_SIZE: int = 200
+    QUERY_PLAN_ANALYZE: bool = True  # PostgreSQL: re-run SELECTs with EXPLAIN (ANALYZE, BUFFERS), read-only
+    QUERY_PLAN_TIMEOUT_MS: int = 5000
+
+    # Listing result cache (serialized pages), invalidated by per-model write generations
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    RESULT_CACHE_TTL: float = 300
+
+    # Per-request sampling profiler: signed X-Profile header, or admin toggle + sampling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = "/tmp/profiles"
+    PROFILING_MAX_FILES: int = 50
+
+    # Event loop stall detector (GET /admin/loop-stalls)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_THRESHOLD_MS: float = 100
+    LOOP_MONITOR_INTERVAL_MS: float = 50
+    LOOP_MONITOR_BUFFER_SIZE: int = 100
+    LOOP_MONITOR_FAIL_ON_STALL: bool = False  # test mode: raise LoopBlocked for requests that stalled the loop
+
+    # Bloom filter of user emails: skips the existence query for emails never stored
+    EMAIL_FILTER_ENABLED: bool = True
+    EMAIL_FILTER_FP_RATE: float = 0.01
+    EMAIL_FILTER_MIN_CAPACITY: int = 100_000
+    EMAIL_FILTER_REBUILD_SECONDS: float = 3600
+
+    # User stats rollups, upserted inside every user write: the hot rows serialize concurrent
+    # signups, so opt-in. Run UserRepository.rebuild_rollups() after turning it on.
+    USER_STATS_ROLLUPS: bool = False
+
+    # Server-sent change stream (GET /{prefix}/changes)
+    CHANGE_STREAM_BUFFER_SIZE: int = 10000  # events kept for Last-Event-ID resume
+    CHANGE_STREAM_CLIENT_QUEUE: int = 1000  # undelivered events before a slow client is disconnected
+    CHANGE_STREAM_KEEPALIVE_SECONDS: float = 15
+    CHANGE_STREAM_MAX_SECONDS: float = 300  # then the client reconnects with Last-Event-ID
+
     @property
     def full_database_url(self) -> str:
         if self.DATABASE_URL is None:
@@ -0,0 +1,169 @@
+"""Per-request query deadlines and cancellation on client disconnect.
+
+Each BaseRouter route gets a deadline from the X-Request-Timeout-Ms header
+(capped at QUERY_TIMEOUT_MAX_MS) or from its per-route default. The deadline
+follows the request through a context variable, so every Session the request
+uses picks it up:
+
+- on Postgres every transaction starts with `SET LOCAL statement_timeout` set
+  to the time left, so the server aborts the query itself;
+- before each statement the deadline is checked (this is what bounds SQLite);
+- a watcher waits for `http.disconnect` and cancels the statement in flight
+  through the driver (psycopg `connection.cancel()`, sqlite3
+  `connection.interrupt()`); later statements of the request are refused.
+
+Cancelled statements surface as QueryCancelled (504 on timeout, 499 when the
+client went away) and are counted in `db_query_cancellations_total`.
+
+The watcher runs on the event loop. BaseRepository runs its statements in the
+threadpool (run_off_loop), so the loop is free to see the disconnect and the
+statement is cancelled as soon as it arrives. A statement executed on the loop
+itself could only be stopped by statement_timeout.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Header, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+# Postgres SQLSTATE for "canceling statement due to statement timeout / user request"
+_QUERY_CANCELED = "57014"
+CLIENT_CLOSED_REQUEST = 499
+
+TIMEOUT = "timeout"
+DISCONNECT = "disconnect"
+
+cancellations = registry.counter(
+    "db_query_cancellations_total", "Statements cancelled by request deadline or client disconnect"
+)
+
+
+class QueryCancelled(Exception):
+    def __init__(self, reason: str, route: str):
+        super().__init__(f"Query cancelled ({reason}) on {route}")
+        self.reason = reason
+        self.route = route
+
+
+class RequestDeadline:
+    def __init__(self, route: str, timeout_ms: Optional[int]):
+        self.route = route
+        self.expires_at = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.disconnected = False
+        self.active_connection = None  # DBAPI connection running a statement, if any
+
+    def remaining_ms(self) -> Optional[int]:
+        if self.expires_at is None:
+            return None
+        return int((self.expires_at - time.monotonic()) * 1000)
+
+    def cancelled(self, reason: str) -> QueryCancelled:
+        cancellations.inc(reason=reason, route=self.route)
+        return QueryCancelled(reason, self.route)
+
+    def check(self) -> None:
+        if self.disconnected:
+            raise self.cancelled(DISCONNECT)
+        remaining = self.remaining_ms()
+        if remaining is not None and remaining <= 0:
+            raise self.cancelled(TIMEOUT)
+
+    def cancel_in_flight(self) -> None:
+        connection = self.active_connection
+        cancel = getattr(connection, "cancel", None) or getattr(connection, "interrupt", None)
+        if cancel is not None:
+            cancel()
+
+
+current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("current_deadline", default=None)
+
+
+def resolve_timeout(header_ms: Optional[int], default_ms: Optional[int]) -> Optional[int]:
+    timeout = header_ms if header_ms is not None else default_ms
+    if timeout is None:
+        return None
+    return min(timeout, settings.QUERY_TIMEOUT_MAX_MS)
+
+
+async def _watch_disconnect(request: Request, deadline: RequestDeadline) -> None:
+    # The body has already been read by the time route dependencies run
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            deadline.disconnected = True
+            deadline.cancel_in_flight()
+            return
+
+
+def request_deadline(route_key: str, default_ms: Optional[int]):
+    """Route dependency: bind a deadline to the request and watch for disconnects."""
+
+    async def _deadline(
+            request: Request,
+            timeout_ms: Optional[int] = Header(None, alias=DEADLINE_HEADER, gt=0,
+                                               description="Query deadline for this request in milliseconds"),
+    ):
+        deadline = RequestDeadline(route_key, resolve_timeout(timeout_ms, default_ms))
+        current_deadline.set(deadline)
+        watcher = asyncio.create_task(_watch_disconnect(request, deadline))
+        try:
+            yield deadline
+        finally:
+            watcher.cancel()
+            current_deadline.set(None)
+
+    return _deadline
+
+
+async def query_cancelled_handler(request: Request, exc: QueryCancelled) -> JSONResponse:
+    if exc.reason == TIMEOUT:
+        return JSONResponse(status_code=504, content={"detail": "Query deadline exceeded"})
+    return JSONResponse(status_code=CLIENT_CLOSED_REQUEST, content={"detail": "Client closed request"})
+
+
+# Session hooks ---------------------------------------------------------------
+
+def _set_statement_timeout(session: Session, transaction, connection) -> None:
+    deadline = current_deadline.get()
+    if deadline is None or connection.dialect.name != "postgresql":
+        return
+    remaining = deadline.remaining_ms()
+    if remaining is not None:
+        connection.execute(text(f"SET LOCAL statement_timeout = {max(remaining, 1)}"))
+
+
+def _is_cancellation(error: DBAPIError) -> bool:
+    if getattr(error.orig, "pgcode", None) == _QUERY_CANCELED:
+        return True
+    return isinstance(error, OperationalError) and str(error.orig) == "interrupted"  # sqlite3 interrupt()
+
+
+def _guard_statement(orm_execute_state):
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    connection = orm_execute_state.session.connection()
+    # Published before the check: a disconnect from here on either fails the check or cancels the statement
+    deadline.active_connection = connection.connection.driver_connection
+    try:
+        deadline.check()
+        return orm_execute_state.invoke_statement()
+    except DBAPIError as e:
+        if _is_cancellation(e):
+            raise deadline.cancelled(DISCONNECT if deadline.disconnected else TIMEOUT) from e
+        raise
+    finally:
+        deadline.active_connection = None
+
+
+event.listen(Session, "after_begin", _set_statement_timeout)
+event.listen(Session, "do_orm_execute", _guard_statement)
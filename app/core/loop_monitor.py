@@ -0,0 +1,176 @@
+"""Event loop stall detector (GET /admin/loop-stalls).
+
+`async def` routes share one loop thread per worker. BaseRepository methods
+are wrapped in run_off_loop and the services hash passwords with
+run_in_threadpool, so the known blocking calls run in the threadpool. Any
+synchronous call that remains in a route, dependency or middleware still
+blocks the loop, and while it runs every other request on the worker waits.
+
+A watchdog thread posts a no-op callback to the loop every
+LOOP_MONITOR_INTERVAL_MS. If the callback has not run after
+LOOP_MONITOR_THRESHOLD_MS, the loop is stalled. The watchdog then captures the
+loop thread's stack (the blocking call, not just the awaiting coroutine) and the
+task that is running, and it waits for the loop to come back so it can measure
+the stall. Stalls are attributed to the route of the running task. They are
+counted in `event_loop_stalls_total` / `event_loop_stall_seconds_total`, logged
+with their stack, and kept in a bounded ring buffer.
+
+Test mode (LOOP_MONITOR_FAIL_ON_STALL) makes LoopMonitorMiddleware raise
+LoopBlocked for any request whose task stalled the loop past the threshold,
+which fails the TestClient call. Detection granularity is the interval: a block
+between threshold and threshold + interval may go unnoticed.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_MAX_STACK_FRAMES = 40
+
+stalls_total = registry.counter("event_loop_stalls_total", "Event loop stalls longer than the threshold, by route")
+stall_seconds = registry.counter("event_loop_stall_seconds_total", "Time the event loop spent stalled, by route")
+
+
+class LoopBlocked(Exception):
+    def __init__(self, route: str, stalls: List["Stall"]):
+        worst = max(stall.duration_ms for stall in stalls)
+        super().__init__(f"{route} blocked the event loop for at least {worst:.0f} ms\n{stalls[0].stack}")
+        self.route = route
+        self.stalls = stalls
+
+
+@dataclass
+class Stall:
+    route: str
+    duration_ms: float
+    stack: str
+    detected_at: str
+
+
+def route_label(scope) -> str:
+    """Method and template of the matched route, e.g. "GET /users/{item_id}" (bounded metric labels)."""
+    path = getattr(scope.get("route"), "path_format", None) or "<unmatched>"
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class LoopMonitor:
+    def __init__(self, threshold_ms: float, interval_ms: float, buffer_size: int = 100,
+                 fail_on_stall: bool = False):
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.fail_on_stall = fail_on_stall
+        self.stalls: Deque[Stall] = deque(maxlen=buffer_size)
+        self._scopes: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._task_stalls: "weakref.WeakKeyDictionary[asyncio.Task, List[Stall]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start watching `loop`; call from the loop's own thread."""
+        self.stop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def track(self, task: asyncio.Task, scope) -> None:
+        self._scopes[task] = scope
+
+    def untrack(self, task: asyncio.Task) -> List[Stall]:
+        self._scopes.pop(task, None)
+        with self._lock:
+            return self._task_stalls.pop(task, [])
+
+    def recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [asdict(stall) for stall in reversed(self.stalls)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stalls.clear()
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        threshold = self.threshold_ms / 1000
+        while not self._stop.wait(interval):
+            alive = threading.Event()
+            posted = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(alive.set)
+            except RuntimeError:  # loop closed
+                return
+            if alive.wait(threshold):
+                continue
+            self._capture(alive, posted)
+
+    def _capture(self, alive: threading.Event, posted: float) -> None:
+        # The loop is blocked: whatever it is running now is the culprit
+        task = asyncio.current_task(self._loop)
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=_MAX_STACK_FRAMES)) if frame is not None else ""
+        scope = self._scopes.get(task) if task is not None else None
+        route = route_label(scope) if scope is not None else "-"
+        stall = Stall(route, self.threshold_ms, stack, datetime.now(timezone.utc).isoformat())
+        with self._lock:
+            # Attached now: the task may finish before the loop runs our callback
+            if scope is not None:
+                self._task_stalls.setdefault(task, []).append(stall)
+        while not alive.wait(self.interval_ms / 1000):
+            if self._stop.is_set():
+                break
+        duration_ms = (time.monotonic() - posted) * 1000
+        stall.duration_ms = round(duration_ms, 1)
+        with self._lock:
+            self.stalls.append(stall)
+        stalls_total.inc(route=route)
+        stall_seconds.inc(duration_ms / 1000, route=route)
+        logger.warning("Event loop blocked for %.0f ms by %s\n%s", duration_ms, route, stack)
+
+
+loop_monitor = LoopMonitor(
+    threshold_ms=settings.LOOP_MONITOR_THRESHOLD_MS,
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    buffer_size=settings.LOOP_MONITOR_BUFFER_SIZE,
+    fail_on_stall=settings.LOOP_MONITOR_FAIL_ON_STALL,
+)
+
+
+class LoopMonitorMiddleware:
+    def __init__(self, app, monitor: LoopMonitor = loop_monitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        task = asyncio.current_task() if scope["type"] == "http" else None
+        if task is None:
+            await self.app(scope, receive, send)
+            return
+        self.monitor.track(task, scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stalls = self.monitor.untrack(task)
+        if stalls and self.monitor.fail_on_stall:
+            raise LoopBlocked(route_label(scope), stalls)
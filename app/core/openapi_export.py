@@ -0,0 +1,28 @@
+"""Build-time OpenAPI export, loaded at runtime through settings.OPENAPI_SCHEMA_PATH.
+
+    python -m app.core.openapi_export openapi.json
+"""
+import argparse
+import json
+
+from app.main import app
+
+
+def export(path: str) -> None:
+    # Lazy routers must be part of the schema even if no request has loaded them yet
+    app.state.lazy_routers.load_all()
+    app.openapi_schema = None
+    with open(path, "w") as f:
+        json.dump(app.openapi(), f, separators=(",", ":"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default="openapi.json")
+    args = parser.parse_args()
+    export(args.path)
+    print(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Pre-fork launcher: load the app once in a master, fork workers that share its heap.
+
+    python -m app.core.prefork --host 0.0.0.0 --port 8000 --workers 4
+
+The master imports app.main, configures the mappers and builds the OpenAPI
+schema (startup.warm_up without touching the pool), binds the listening socket
+and forks. The GC stays disabled while the app loads and the resulting heap is
+moved to the permanent generation with gc.freeze() right before forking, so the
+collector never writes to those pages and they stay shared copy-on-write.
+
+Each worker starts with an empty DB pool (app.database.session disposes it
+after fork), enables the GC with settings.GC_THRESHOLDS and serves the
+inherited socket with uvicorn; the lifespan (invalidation bus, pool warm-up)
+runs per worker. Workers that exit are re-forked from the master's warm state.
+
+--no-preload imports the app in each worker after the fork instead (baseline
+for benchmarks.bench_prefork).
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from uvicorn.importer import import_from_string
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Minimum lifetime before a crashed worker is re-forked immediately
+_RESPAWN_BACKOFF = 1.0
+
+
+def load_app(app_path: str):
+    """Import and warm the app; safe to call before forking."""
+    from app.core.startup import warm_up
+
+    app = import_from_string(app_path)
+    timings = warm_up(app, warm_pool=False)
+    logger.info("Preloaded %s: %s", app_path, timings)
+    return app
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class _WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, forked_at: float):
+        super().__init__(config)
+        self.forked_at = forked_at
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets)
+        logger.info("Worker %d ready in %.1f ms", os.getpid(), (time.perf_counter() - self.forked_at) * 1000)
+
+
+class PreforkMaster:
+    def __init__(self, app_path: str, host: str, port: int, workers: int, preload: bool = True,
+                 log_level: str = "info", access_log: bool = True, backlog: int = 2048):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.preload = preload
+        self.log_level = log_level
+        self.access_log = access_log
+        self.backlog = backlog
+        self.app = None
+        self.sock: Optional[socket.socket] = None
+        self.workers: Dict[int, float] = {}  # pid -> forked at (monotonic)
+        self.stopping = False
+
+    def check_invalidation_bus(self) -> None:
+        if self.worker_count > 1 and settings.INVALIDATION_BUS_BACKEND == "local":
+            # Caches, the email existence filter and change streams only see this worker's writes
+            logger.warning("%d workers share the in-process invalidation bus: writes on one worker are not "
+                           "seen by the others. Set INVALIDATION_BUS_BACKEND=postgres (or file on one host).",
+                           self.worker_count)
+
+    def run(self) -> None:
+        self.check_invalidation_bus()
+        if self.preload:
+            gc.disable()
+            self.app = load_app(self.app_path)
+        self.sock = bind_socket(self.host, self.port, self.backlog)
+        if self.preload and settings.PREFORK_GC_FREEZE:
+            gc.freeze()
+            logger.info("Froze %d objects before fork", gc.get_freeze_count())
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.worker_count):
+            self.spawn()
+        self._supervise()
+
+    def spawn(self) -> int:
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(forked_at)
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        return pid
+
+    def _run_worker(self, forked_at: float) -> None:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        gc.set_threshold(*settings.GC_THRESHOLDS)
+        gc.enable()
+        app = self.app if self.app is not None else import_from_string(self.app_path)
+        config = uvicorn.Config(app, log_level=self.log_level, access_log=self.access_log, lifespan="on")
+        _WorkerServer(config, forked_at).run(sockets=[self.sock])
+
+    def _supervise(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.warning("Worker %d exited (status %d), re-forking", pid, status)
+            if time.monotonic() - started < _RESPAWN_BACKOFF:
+                time.sleep(_RESPAWN_BACKOFF)
+            if not self.stopping:
+                self.spawn()
+        if self.sock is not None:
+            self.sock.close()
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.PREFORK_WORKERS)
+    parser.add_argument("--no-preload", dest="preload", action="store_false")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr,
+                        format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    PreforkMaster(args.app, args.host, args.port, args.workers, args.preload, args.log_level, args.access_log).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""On-demand per-request sampling profiler.
+
+A request is profiled when it carries a valid signed `X-Profile` header (see
+`profile_token`, or POST /admin/profiling/token), or when profiling is toggled
+on (POST /admin/profiling; per worker process) and the request falls in the
+sampled fraction. Everything else pays one header lookup.
+
+A profiled request gets a sampler thread that reads the event loop thread's
+stack every PROFILING_INTERVAL_MS through sys._current_frames(). Unlike
+setprofile tracing, that costs nothing per call in the profiled code. Requests
+served concurrently on the same loop show up in the same samples. The
+aggregated stacks are written as a speedscope file (https://www.speedscope.app)
+to PROFILING_DIR, which keeps the newest PROFILING_MAX_FILES files. The file
+name is returned in the `X-Profile-File` response header.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+PROFILE_SUFFIX = ".speedscope.json"
+_MAX_DEPTH = 200
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+# Signed header -----------------------------------------------------------------
+
+def _signature(expires: int) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def profile_token(ttl_seconds: int = 600) -> str:
+    """Value for the X-Profile header, valid for ttl_seconds."""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+# Sampler -----------------------------------------------------------------------
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[Frame] = []
+            while frame is not None and len(stack) < _MAX_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+
+def speedscope(samples: Counter, interval_ms: float, name: str) -> Dict[str, Any]:
+    frames: List[Dict[str, Any]] = []
+    index: Dict[Frame, int] = {}
+    stacks, weights = [], []
+    for stack, count in samples.most_common():
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            ids.append(index[frame])
+        stacks.append(ids)
+        weights.append(count * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "app.core.profiling",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": sum(weights), "samples": stacks, "weights": weights,
+        }],
+    }
+
+
+# Storage -----------------------------------------------------------------------
+
+@dataclass
+class ProfileStore:
+    directory: str
+    max_files: int
+
+    def save(self, profile: Dict[str, Any], method: str, path: str, elapsed_ms: float) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        name = f"{stamp}-{method}-{slug[:60]}-{elapsed_ms:.0f}ms{PROFILE_SUFFIX}"
+        with open(os.path.join(self.directory, name), "w") as f:
+            json.dump(profile, f)
+        self._prune()
+        return name
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(PROFILE_SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            profiles.append({"name": name, "bytes": stat.st_size,
+                             "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()})
+        return profiles
+
+    def path(self, name: str) -> Optional[str]:
+        if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIX):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def _prune(self) -> None:
+        # Names start with a UTC timestamp: lexical order is age order
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(PROFILE_SUFFIX))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+@dataclass
+class ProfilingToggle:
+    enabled: bool
+    sample_rate: float
+
+    def sampled(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+profiling_toggle = ProfilingToggle(settings.PROFILING_ENABLED, settings.PROFILING_SAMPLE_RATE)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore = profile_store, toggle: ProfilingToggle = profiling_toggle,
+                 interval_ms: Optional[float] = None):
+        self.app = app
+        self.store = store
+        self.toggle = toggle
+        self.interval_ms = settings.PROFILING_INTERVAL_MS if interval_ms is None else interval_ms
+
+    def _wanted(self, scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token is not None and verify_profile_token(token):
+            return True
+        return self.toggle.sampled()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(threading.get_ident(), self.interval_ms / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held back until the profile is written so its name can go in a header
+                start_message = message
+                return
+            if start_message is not None:
+                # Profiled up to the first body chunk: streamed bodies are not included
+                await self._finish(scope, sampler, started, start_message, send)
+                start_message = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+
+    async def _finish(self, scope, sampler: StackSampler, started: float, start_message, send) -> None:
+        sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        name = f"{scope['method']} {scope['path']}"
+        profile = speedscope(sampler.samples, self.interval_ms, name)
+        filename = await to_thread.run_sync(self.store.save, profile, scope["method"], scope["path"], elapsed_ms)
+        MutableHeaders(scope=start_message).append(PROFILE_FILE_HEADER, filename)
+        await send(start_message)
@@ -0,0 +1,173 @@
+"""Stateless bearer tokens (HS256/384/512 JWT) with the permission set in the claims.
+
+Tokens are issued by POST /auth/login and carry `sub`, `role` and `permissions`,
+so `require_permission(...)` authorizes a request without touching the DB. The
+trade-off is that permission changes apply when the token is re-issued
+(ACCESS_TOKEN_EXPIRE_MINUTES bounds the staleness).
+
+Verified tokens are kept in a bounded LRU keyed by the token itself; a hit skips
+the base64/JSON/HMAC work and only re-checks `exp`. Only tokens whose signature
+verified are ever cached.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.config import settings
+
+_HASHES = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+Claims = Dict[str, Any]
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _sign(signing_input: bytes, algorithm: str, key: str) -> bytes:
+    digest = _HASHES.get(algorithm)
+    if digest is None:
+        raise ValueError(f"Unsupported token algorithm '{algorithm}' (supported: {', '.join(_HASHES)})")
+    return hmac.new(key.encode(), signing_input, digest).digest()
+
+
+def encode_token(claims: Claims, key: str, algorithm: str) -> str:
+    header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64encode(json.dumps(claims, separators=(",", ":"), default=str).encode())
+    signing_input = header + b"." + payload
+    return (signing_input + b"." + _b64encode(_sign(signing_input, algorithm, key))).decode()
+
+
+def decode_token(token: str, key: str, algorithm: str) -> Claims:
+    """Verify signature and algorithm; expiry is checked by the caller."""
+    try:
+        header_b64, payload_b64, signature_b64 = token.encode().split(b".")
+        header = json.loads(_b64decode(header_b64))
+        signature = _b64decode(signature_b64)
+    except (ValueError, TypeError):
+        raise InvalidToken("Malformed token")
+    # The algorithm is fixed by configuration, never taken from the token
+    if not isinstance(header, dict) or header.get("alg") != algorithm:
+        raise InvalidToken("Unexpected token algorithm")
+    if not hmac.compare_digest(signature, _sign(header_b64 + b"." + payload_b64, algorithm, key)):
+        raise InvalidToken("Invalid token signature")
+    try:
+        claims = json.loads(_b64decode(payload_b64))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if not isinstance(claims, dict) or not isinstance(claims.get("exp"), (int, float)):
+        raise InvalidToken("Token without expiry")
+    return claims
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Claims]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Claims]:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Claims) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+verified_tokens = VerifiedTokenCache(settings.AUTH_VERIFY_CACHE_SIZE)
+
+
+def create_access_token(subject: str, permissions: Iterable[str], role: Optional[str] = None,
+                        expires_delta: Optional[timedelta] = None) -> str:
+    now = int(time.time())
+    expires = expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {
+        "sub": subject,
+        "role": role,
+        "permissions": sorted(set(permissions)),
+        "iat": now,
+        "exp": now + int(expires.total_seconds()),
+    }
+    return encode_token(claims, settings.SECRET_KEY, settings.ALGORITHM)
+
+
+def verify_access_token(token: str) -> Claims:
+    claims = verified_tokens.get(token)
+    if claims is None:
+        claims = decode_token(token, settings.SECRET_KEY, settings.ALGORITHM)
+        verified_tokens.put(token, claims)
+    if claims["exp"] <= time.time():
+        verified_tokens.discard(token)
+        raise InvalidToken("Token expired")
+    return claims
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+async def get_current_claims(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> Claims:
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise _unauthorized("Not authenticated")
+    try:
+        return verify_access_token(credentials.credentials)
+    except InvalidToken as e:
+        raise _unauthorized(str(e))
+
+
+def require_permission(*permissions: str):
+    """Dependency: 401 without a valid token, 403 unless the token grants every permission."""
+    required = frozenset(permissions)
+
+    async def _require(claims: Claims = Depends(get_current_claims)) -> Claims:
+        missing = required.difference(claims.get("permissions") or ())
+        if missing:
+            raise HTTPException(
+                status_code=HTTPStatus.FORBIDDEN,
+                detail=f"Missing permissions: {', '.join(sorted(missing))}",
+            )
+        return claims
+
+    return _require
@@ -0,0 +1,155 @@
+import asyncio
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (prefix, module) of every resource router. Prefixes listed in
+# settings.LAZY_ROUTER_PREFIXES are imported on their first request instead of at startup.
+RouterSpec = Tuple[str, str]
+
+
+def _timed(timings: Dict[str, float], name: str, started: float) -> None:
+    timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def warm_up(app: FastAPI, warm_pool: bool = True) -> Dict[str, float]:
+    """Pay mapper configuration and connection setup before the first request does.
+
+    warm_pool=False skips opening connections (pre-fork master: they must not cross a fork).
+    """
+    timings: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    from sqlalchemy.orm import configure_mappers
+    importlib.import_module("app.database.base")  # registers every model
+    configure_mappers()
+    _timed(timings, "configure_mappers_ms", started)
+
+    if warm_pool and settings.DB_POOL_WARMUP_CONNECTIONS > 0:
+        started = time.perf_counter()
+        from sqlalchemy import text
+        from app.database.session import engine
+        connections = []
+        try:
+            for _ in range(settings.DB_POOL_WARMUP_CONNECTIONS):
+                connection = engine.connect()
+                connection.execute(text("SELECT 1"))
+                connections.append(connection)
+        except Exception as e:
+            logger.warning("Pool warm-up stopped after %d connections: %s", len(connections), e)
+        finally:
+            # Returned to the pool, not closed: they stay open for the first requests
+            for connection in connections:
+                connection.close()
+        _timed(timings, "pool_warmup_ms", started)
+
+    if app.openapi_schema is None and settings.OPENAPI_WARMUP:
+        started = time.perf_counter()
+        app.openapi()
+        _timed(timings, "openapi_ms", started)
+    return timings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    timings = warm_up(app) if settings.STARTUP_WARMUP else {}
+    _timed(timings, "lifespan_total_ms", started)
+    app.state.startup_timings = timings
+    logger.info("Startup timings: %s", timings)
+
+    from app.database.invalidation import invalidation_bus
+    invalidation_bus.start()
+    from app.core.loop_monitor import loop_monitor
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start(asyncio.get_running_loop())
+    from app.database.existence_filter import user_email_filter
+    if settings.EMAIL_FILTER_ENABLED and invalidation_bus.cross_process:
+        user_email_filter.start()  # on the local bus it would answer "maybe" anyway
+    try:
+        yield
+    finally:
+        user_email_filter.stop()
+        loop_monitor.stop()
+        invalidation_bus.stop()
+
+
+def load_precomputed_openapi(app: FastAPI, path: Optional[str]) -> bool:
+    """Serve the OpenAPI schema exported at build time instead of generating it."""
+    if not path or not os.path.exists(path):
+        return False
+    with open(path) as f:
+        app.openapi_schema = json.load(f)
+    return True
+
+
+class LazyRouters:
+    """Imports rarely used routers on the first request under their prefix."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def defer(self, prefix: str, module: str) -> None:
+        self.pending[prefix] = module
+
+    def load(self, prefix: str) -> None:
+        with self._lock:
+            module = self.pending.pop(prefix, None)
+            if module is None:
+                return
+            started = time.perf_counter()
+            self.app.include_router(importlib.import_module(module).router)
+            logger.info("Lazy router %s loaded in %.1f ms", module,
+                        (time.perf_counter() - started) * 1000)
+            if not settings.OPENAPI_SCHEMA_PATH:
+                # Regenerate the schema so it includes the new routes
+                self.app.openapi_schema = None
+
+    def load_all(self) -> None:
+        for prefix in list(self.pending):
+            self.load(prefix)
+
+    def match(self, path: str) -> Optional[str]:
+        for prefix in self.pending:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+
+class LazyRouterMiddleware:
+    def __init__(self, app, lazy_routers: LazyRouters):
+        self.app = app
+        self.lazy_routers = lazy_routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.lazy_routers.pending:
+            prefix = self.lazy_routers.match(scope["path"])
+            if prefix is not None:
+                self.lazy_routers.load(prefix)
+        await self.app(scope, receive, send)
+
+
+def include_routers(app: FastAPI, routers: List[RouterSpec]) -> LazyRouters:
+    lazy_routers = LazyRouters(app)
+    for prefix, module in routers:
+        if prefix in settings.LAZY_ROUTER_PREFIXES:
+            lazy_routers.defer(prefix, module)
+        else:
+            app.include_router(importlib.import_module(module).router)
+    app.state.lazy_routers = lazy_routers
+    if lazy_routers.pending:
+        app.add_middleware(LazyRouterMiddleware, lazy_routers=lazy_routers)
+    return lazy_routers
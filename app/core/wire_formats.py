@@ -0,0 +1,157 @@
+"""Binary wire formats negotiated per request (BaseRouter routes).
+
+Responses honor `Accept`:
+
+- application/json (default, and whenever nothing else matches)
+- application/msgpack: the validated output schema, dumped once to plain
+  values by pydantic-core and packed with msgpack
+- application/vnd.apache.arrow.stream on tabular routes (GET / and GET
+  /window): one Arrow IPC stream of the items, with the total or next cursor
+  in the X-Total-Count / X-Next-Cursor headers
+
+Request bodies sent as `Content-Type: application/msgpack` are unpacked by
+WireFormatRoute and validated exactly like JSON bodies.
+
+msgpack is in requirements.txt; pyarrow is an optional extra. A format is only
+offered when its package is installed. Clients asking only for a missing
+format get JSON. A msgpack body sent to a server without msgpack gets 415.
+"""
+import uuid
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+TOTAL_HEADER = "X-Total-Count"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def available_media_types(tabular: bool = False) -> List[str]:
+    """Supported response types in server preference order."""
+    media_types = [JSON]
+    if msgpack is not None:
+        media_types.append(MSGPACK)
+    if tabular and pyarrow is not None:
+        media_types.append(ARROW)
+    return media_types
+
+
+def negotiate_media_type(accept: Optional[str], supported: List[str]) -> str:
+    """Highest q-value wins; an exact type beats a wildcard at equal q; JSON when nothing matches."""
+    best = None
+    for part in (accept or "").split(","):
+        media_type, *params = [p.strip().lower() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+        for preference, candidate in enumerate(supported):
+            if media_type == candidate:
+                specificity = 1
+            elif media_type in ("*/*", "application/*"):
+                specificity = 0
+            else:
+                continue
+            key = (q, specificity, -preference)
+            if best is None or key > best[0]:
+                best = (key, candidate)
+    return best[1] if best else JSON
+
+
+def response_media_type(tabular: bool = False) -> Callable[[Request], str]:
+    """Route dependency: the media type to answer with."""
+    def _dependency(request: Request) -> str:
+        accept = request.headers.get("accept")
+        if not accept or accept == "*/*":
+            return JSON
+        return negotiate_media_type(accept, available_media_types(tabular))
+
+    return _dependency
+
+
+def _plain(value: Any) -> Any:
+    return value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+
+
+def encode_msgpack(content: Any) -> bytes:
+    return msgpack.packb(_plain(content), use_bin_type=True)
+
+
+def encode_arrow(items: List[Any]) -> bytes:
+    rows = []
+    for item in items:
+        row = item.model_dump() if isinstance(item, BaseModel) else dict(item)
+        rows.append({k: str(v) if isinstance(v, uuid.UUID) else v for k, v in row.items()})
+    table = pyarrow.Table.from_pylist(rows)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def wire_response(content: Any, media_type: str, status_code: int = HTTPStatus.OK,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """`content` (an output schema instance, or a page of them) encoded as `media_type` (not JSON)."""
+    headers = dict(headers or {})
+    if media_type == ARROW:
+        if getattr(content, "total", None) is not None:
+            headers[TOTAL_HEADER] = str(content.total)
+        if getattr(content, "next_cursor", None) is not None:
+            headers[NEXT_CURSOR_HEADER] = content.next_cursor
+        body = encode_arrow(content.items)
+    else:
+        body = encode_msgpack(content)
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+class WireFormatRoute(APIRoute):
+    """Accepts msgpack request bodies wherever a JSON body is accepted."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type != MSGPACK:
+                return await handler(request)
+            if msgpack is None:
+                raise HTTPException(status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                                    detail="msgpack bodies are not supported by this server")
+            body = await request.body()
+            try:
+                data = msgpack.unpackb(body, raw=False) if body else None
+            except (ValueError, msgpack.UnpackException):
+                raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="Invalid msgpack body")
+            # Present the unpacked value as the parsed JSON body: FastAPI validates it unchanged
+            scope = dict(request.scope)
+            scope["headers"] = [(k, v) for k, v in request.scope["headers"] if k != b"content-type"]
+            scope["headers"].append((b"content-type", JSON.encode()))
+            unpacked = Request(scope, request.receive)
+            unpacked._body = body
+            unpacked._json = data
+            return await handler(unpacked)
+
+        return route_handler
@@ -2,3 +2,4 @@ from app.models.abstractions.base_entity import BaseEntity
 
 # Import every model
 from app.models.user import User
+from app.models.stats_rollup import StatsRollup
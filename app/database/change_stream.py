@@ -0,0 +1,169 @@
+"""Server-sent change stream (GET /{prefix}/changes).
+
+Every committed insert/update/delete that reaches the invalidation bus (local
+writes at commit, other workers' writes through the bus backend) gets the next
+sequence number of this worker and is kept in a ring buffer of
+CHANGE_STREAM_BUFFER_SIZE events. Clients receive the events of their model as
+they happen:
+
+    id: 3f9c1a2b-42
+    data: {"model": "User", "id": "...", "op": "update"}
+
+The stream carries ids only. Clients fetch the rows they care about, with the
+same permissions as any other read.
+
+Resume: EventSource sends the last id it saw as Last-Event-ID when it
+reconnects, and the events after it are replayed from the buffer. Ids carry a
+per-process epoch. When the id comes from another worker or process, or
+predates the buffer, the stream starts with `event: reset`, meaning "re-list,
+then keep following". No change is ever silently skipped, as long as every
+worker publishes to a cross-process bus (INVALIDATION_BUS_BACKEND "postgres",
+or "file" on one host). With the default "local" bus a client only sees the
+writes handled by the worker it is connected to, so running several workers on
+it loses changes; the prefork launcher warns about that configuration.
+
+Backpressure: each client has a queue of at most CHANGE_STREAM_CLIENT_QUEUE
+undelivered events. A client that falls that far behind gets what is queued and
+is then disconnected, and it resumes from its Last-Event-ID. Streams are also
+closed after CHANGE_STREAM_MAX_SECONDS so reconnects spread clients across
+workers. Neither costs the client anything but a reconnect.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database.invalidation import ChangeEvent, invalidation_bus
+
+overflows = registry.counter("change_stream_overflows_total", "Change stream clients disconnected for falling behind")
+
+_RETRY_MS = 1000
+
+
+class ChangeStreamClient:
+    def __init__(self, model: str, max_queue: int):
+        self.model = model
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Tuple[int, ChangeEvent]]" = asyncio.Queue(max_queue)
+        self.reset_id: Optional[str] = None  # set when the stream must start with a reset
+        self.overflowed = False
+
+    def offer(self, batch: List[Tuple[int, ChangeEvent]]) -> None:
+        """Called from any thread; the queue is only touched on the client's loop."""
+        items = [item for item in batch if item[1].model == self.model]
+        if items and not self.overflowed:
+            try:
+                self.loop.call_soon_threadsafe(self._put, items)
+            except RuntimeError:  # loop closed
+                self.overflowed = True
+
+    def _put(self, items: List[Tuple[int, ChangeEvent]]) -> None:
+        for item in items:
+            if self.overflowed:
+                return
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                overflows.inc(model=self.model)
+
+
+class ChangeStream:
+    def __init__(self, buffer_size: int, client_queue: int, keepalive: float, max_seconds: float):
+        self.buffer_size = buffer_size
+        self.client_queue = client_queue
+        self.keepalive = keepalive
+        self.max_seconds = max_seconds
+        self.after_fork()
+
+    def after_fork(self) -> None:
+        """Start a new numbering: a worker forked from a preloaded parent must not share its epoch."""
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer: Deque[Tuple[int, ChangeEvent]] = deque(maxlen=self.buffer_size)
+        self._clients: Set[ChangeStreamClient] = set()
+        self._lock = threading.Lock()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def last_event_id(self) -> str:
+        return self.event_id(self._seq)
+
+    def on_events(self, events: List[ChangeEvent]) -> None:
+        with self._lock:
+            batch = []
+            for event in events:
+                self._seq += 1
+                batch.append((self._seq, event))
+            self._buffer.extend(batch)
+            clients = list(self._clients)
+        for client in clients:
+            client.offer(batch)
+
+    def subscribe(self, model: str, last_event_id: Optional[str] = None) -> ChangeStreamClient:
+        """Register a client on the running loop, queueing what it missed since last_event_id."""
+        client = ChangeStreamClient(model, self.client_queue)
+        with self._lock:
+            # Under the lock: no event can fall between the replay and the live feed
+            missed = self._since(last_event_id) if last_event_id else []
+            if missed is None:
+                client.reset_id = self.last_event_id()
+            else:
+                client._put([item for item in missed if item[1].model == model])
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client: ChangeStreamClient) -> None:
+        with self._lock:
+            self._clients.discard(client)
+
+    def _since(self, last_event_id: str) -> Optional[List[Tuple[int, ChangeEvent]]]:
+        """Buffered events after last_event_id, or None when they cannot all be replayed."""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        seq = int(seq)
+        if seq < self._seq and (not self._buffer or self._buffer[0][0] > seq + 1):
+            return None
+        return [item for item in self._buffer if item[0] > seq]
+
+    def format(self, seq: int, event: ChangeEvent) -> str:
+        data = json.dumps({"model": event.model, "id": event.id, "op": event.op})
+        return f"id: {self.event_id(seq)}\ndata: {data}\n\n"
+
+    async def stream(self, client: ChangeStreamClient) -> AsyncIterator[str]:
+        deadline = time.monotonic() + self.max_seconds
+        try:
+            yield f"retry: {_RETRY_MS}\n\n"
+            if client.reset_id:
+                yield f"id: {client.reset_id}\nevent: reset\ndata: {{}}\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (client.overflowed and client.queue.empty()):
+                    return
+                try:
+                    seq, event = await asyncio.wait_for(client.queue.get(), min(self.keepalive, remaining))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield self.format(seq, event)
+        finally:
+            self.unsubscribe(client)
+
+
+change_stream = ChangeStream(
+    buffer_size=settings.CHANGE_STREAM_BUFFER_SIZE,
+    client_queue=settings.CHANGE_STREAM_CLIENT_QUEUE,
+    keepalive=settings.CHANGE_STREAM_KEEPALIVE_SECONDS,
+    max_seconds=settings.CHANGE_STREAM_MAX_SECONDS,
+)
+invalidation_bus.subscribe("*", change_stream.on_events)
+# Workers count their own sequence numbers, so each needs its own epoch (see _since)
+os.register_at_fork(after_in_child=change_stream.after_fork)
@@ -0,0 +1,223 @@
+"""In-memory "definitely absent" checks for a unique column (GET /admin/existence-filters).
+
+`user_email_filter` keeps a Bloom filter of every User.email. UserService
+uses it to skip the duplicate-email query on signup, and to answer
+by-email lookups for emails that were never stored without a query. A Bloom
+filter has no false negatives, so "absent" is exact. "Maybe" falls through to
+the database as before.
+
+The filter is built by a background thread at startup. The thread streams the
+column with yield_per, sized for twice the current row count (at least
+EMAIL_FILTER_MIN_CAPACITY). It is rebuilt every EMAIL_FILTER_REBUILD_SECONDS,
+which drops deleted and changed values, and sooner once it holds more values
+than it was sized for. The new filter is swapped in atomically. Values added
+while it streams are replayed into it first.
+
+Writes keep it current:
+
+- UserService.create adds the email before inserting;
+- every committed insert/update reaching the invalidation bus, from this worker
+  or from another one, puts its id in `pending`. The thread then loads the
+  values of those ids and adds them.
+
+While ids are pending, or before the first build, every check answers "maybe",
+so a value written anywhere is never reported absent. The only window left is
+the bus latency between another worker's commit and this worker receiving the
+event. A duplicate signup in that window is still refused by the unique
+constraint (409).
+
+All of this relies on a cross-process bus (INVALIDATION_BUS_BACKEND "postgres",
+or "file" on one host). With the default "local" bus another worker's inserts
+would only show up at the next rebuild, so every check answers "maybe" and the
+filter is not built at startup.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, select
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database.invalidation import ChangeEvent, invalidation_bus
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_STREAM_BATCH = 10_000
+_RESOLVE_BATCH = 500
+_RETRY_SECONDS = 30
+
+checks = registry.counter("existence_filter_checks_total", "Existence filter checks by result (absent skips a query)")
+
+
+class ExistenceFilter:
+    def __init__(self, model: type, column: str, fp_rate: float, min_capacity: int, rebuild_interval: float,
+                 session_factory: Optional[Callable[[], Any]] = None):
+        self.model = model
+        self.column = column
+        self.name = f"{model.__name__}.{column}"
+        self.fp_rate = fp_rate
+        self.min_capacity = min_capacity
+        self.rebuild_interval = rebuild_interval
+        self.session_factory = session_factory
+        self.pending: Set[str] = set()
+        self.last_rebuild: Optional[Dict[str, Any]] = None
+        self._filter: Optional[BloomFilter] = None
+        self._rebuild_log: Optional[List[str]] = None
+        self._rebuild_requested = False
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_contain(self, value: str) -> bool:
+        bloom = self._filter
+        if not invalidation_bus.cross_process:
+            result = "local_bus"
+        elif bloom is None:
+            result = "not_ready"
+        elif self.pending:
+            result = "pending"
+        elif value in bloom:
+            result = "maybe"
+        else:
+            result = "absent"
+        checks.inc(filter=self.name, result=result)
+        return result != "absent"
+
+    def add(self, value: str) -> None:
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(value)
+            if self._filter is not None:
+                self._filter.add(value)
+                if self._filter.count > self._filter.capacity and not self._rebuild_requested:
+                    self._rebuild_requested = True
+                    self._wake.set()
+
+    def on_events(self, events: List[ChangeEvent]) -> None:
+        ids = {e.id for e in events if e.op != "delete"}
+        if ids:
+            with self._lock:
+                self.pending |= ids
+            self._wake.set()
+
+    # background work -------------------------------------------------------
+
+    def _session(self):
+        if self.session_factory is None:
+            from app.database.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def rebuild(self) -> None:
+        with self._rebuild_lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        started = time.perf_counter()
+        column = getattr(self.model, self.column)
+        with self._lock:
+            self._rebuild_log = []
+        try:
+            with self._session() as session:
+                count = session.execute(select(func.count()).select_from(self.model)).scalar_one()
+                bloom = BloomFilter(max(self.min_capacity, count * 2), self.fp_rate)
+                rows = session.execute(select(column).execution_options(yield_per=_STREAM_BATCH))
+                for (value,) in rows:
+                    bloom.add(value)
+            with self._lock:
+                for value in self._rebuild_log:
+                    bloom.add(value)
+                self._filter = bloom
+                self._rebuild_requested = False
+        finally:
+            with self._lock:
+                self._rebuild_log = None
+        self.last_rebuild = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "rows": count,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def resolve_pending(self) -> None:
+        with self._lock:
+            ids = list(self.pending)
+        if not ids:
+            return
+        id_type = self.model.__table__.c.id.type.python_type
+        column = getattr(self.model, self.column)
+        with self._session() as session:
+            values = []
+            for i in range(0, len(ids), _RESOLVE_BATCH):
+                chunk = [id_type(id) for id in ids[i:i + _RESOLVE_BATCH]]
+                values += session.execute(select(column).where(self.model.id.in_(chunk))).scalars().all()
+        for value in values:
+            self.add(value)
+        with self._lock:
+            self.pending -= set(ids)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"existence-filter-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        next_rebuild = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                if self._rebuild_requested or time.monotonic() >= next_rebuild:
+                    self.rebuild()
+                    next_rebuild = time.monotonic() + self.rebuild_interval
+                self.resolve_pending()
+                wait = next_rebuild - time.monotonic()
+            except Exception as e:
+                # Whatever could not be loaded keeps answering "maybe" until the retry
+                logger.warning("Existence filter %s refresh failed: %s", self.name, e)
+                wait = _RETRY_SECONDS
+            self._wake.wait(max(0.0, wait))
+
+    def stats(self) -> Dict[str, Any]:
+        bloom = self._filter
+        stats: Dict[str, Any] = {"name": self.name, "ready": bloom is not None, "pending": len(self.pending),
+                                 "cross_process_bus": invalidation_bus.cross_process,
+                                 "last_rebuild": self.last_rebuild}
+        if bloom is not None:
+            stats.update({
+                "items": bloom.count,
+                "capacity": bloom.capacity,
+                "bits": bloom.size,
+                "hashes": bloom.hashes,
+                "memory_bytes": bloom.memory_bytes,
+                "target_fp_rate": bloom.fp_rate,
+                "estimated_fp_rate": round(bloom.estimated_fp_rate(), 6),
+            })
+        return stats
+
+
+user_email_filter = ExistenceFilter(
+    User, "email",
+    fp_rate=settings.EMAIL_FILTER_FP_RATE,
+    min_capacity=settings.EMAIL_FILTER_MIN_CAPACITY,
+    rebuild_interval=settings.EMAIL_FILTER_REBUILD_SECONDS,
+)
+invalidation_bus.subscribe(User.__name__, user_email_filter.on_events)
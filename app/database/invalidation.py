@@ -0,0 +1,241 @@
+"""Cross-worker cache invalidation bus.
+
+Every committed insert/update/delete of a BaseEntity is collected per session
+and published once per transaction, after commit, as a batch of (model, id)
+events. The publishing worker dispatches to its own subscribers immediately;
+other workers receive the batch through the configured backend:
+
+- "local":    in-process only (single worker, default)
+- "file":     append-only JSON lines file tailed by every worker (tests, one host)
+- "postgres": LISTEN/NOTIFY on INVALIDATION_BUS_CHANNEL
+
+Subscribers run on the listener thread, so caches they touch must be thread-safe.
+"""
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.abstractions.base_entity import BaseEntity
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_invalidations"
+# NOTIFY payloads must stay below 8000 bytes
+_MAX_PAYLOAD_BYTES = 7500
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    model: str
+    id: str
+    op: str  # "insert" | "update" | "delete"
+
+
+Subscriber = Callable[[List[ChangeEvent]], None]
+
+
+class LocalBackend:
+    def publish(self, payload: str) -> None:
+        pass
+
+    def listen(self, handler: Callable[[str], None], stop: threading.Event) -> None:
+        stop.wait()
+
+
+class FileBackend:
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        open(self.path, "a").close()
+
+    def publish(self, payload: str) -> None:
+        # O_APPEND writes of one line are not interleaved between processes
+        with open(self.path, "a") as f:
+            f.write(payload + "\n")
+
+    def listen(self, handler: Callable[[str], None], stop: threading.Event) -> None:
+        with open(self.path) as f:
+            f.seek(0, os.SEEK_END)
+            buffer = ""
+            while not stop.is_set():
+                chunk = f.readline()
+                if not chunk:
+                    stop.wait(self.poll_interval)
+                    continue
+                buffer += chunk
+                if buffer.endswith("\n"):
+                    handler(buffer.rstrip("\n"))
+                    buffer = ""
+
+
+class PostgresNotifyBackend:
+    def __init__(self, engine, channel: str):
+        self.engine = engine
+        self.channel = channel
+
+    def publish(self, payload: str) -> None:
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"),
+                               {"channel": self.channel, "payload": payload})
+            connection.commit()
+
+    def listen(self, handler: Callable[[str], None], stop: threading.Event) -> None:
+        raw = self.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not stop.is_set():
+                if select.select([connection], [], [], 1.0) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    handler(connection.notifies.pop(0).payload)
+        finally:
+            raw.close()
+
+
+class InvalidationBus:
+    def __init__(self, backend):
+        self.backend = backend
+        # False for "local": other workers' writes are never seen here
+        self.cross_process = not isinstance(backend, LocalBackend)
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, model_name: str, callback: Subscriber) -> None:
+        """Register callback(events) for a model name, or "*" for every model."""
+        self._subscribers.setdefault(model_name, []).append(callback)
+
+    def unsubscribe(self, model_name: str, callback: Subscriber) -> None:
+        self._subscribers.get(model_name, []).remove(callback)
+
+    def publish(self, events: List[ChangeEvent]) -> None:
+        if not events:
+            return
+        self._dispatch(events)
+        for payload in self._encode(events):
+            try:
+                self.backend.publish(payload)
+            except Exception:
+                logger.exception("Failed to publish %d invalidation events", len(events))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self) -> None:
+        try:
+            self.backend.listen(self._on_message, self._stop)
+        except Exception:
+            logger.exception("Invalidation bus listener stopped")
+
+    def _on_message(self, payload: str) -> None:
+        # Anything raised here would end the listener thread: skip the message instead
+        try:
+            message = json.loads(payload)
+            if message["origin"] == self.origin:
+                return  # already dispatched locally at commit time
+            events = [ChangeEvent(*e) for e in message["events"]]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed invalidation message: %.200r", payload)
+            return
+        self._dispatch(events)
+
+    def _dispatch(self, events: List[ChangeEvent]) -> None:
+        by_model: Dict[str, List[ChangeEvent]] = {}
+        for e in events:
+            by_model.setdefault(e.model, []).append(e)
+        for model_name, model_events in by_model.items():
+            for callback in self._subscribers.get(model_name, []) + self._subscribers.get("*", []):
+                try:
+                    callback(model_events)
+                except Exception:
+                    logger.exception("Invalidation subscriber failed for %s", model_name)
+
+    def _encode(self, events: List[ChangeEvent]) -> List[str]:
+        payloads, chunk, size = [], [], 0
+        for e in events:
+            item = [e.model, e.id, e.op]
+            item_size = len(json.dumps(item)) + 1
+            if chunk and size + item_size > _MAX_PAYLOAD_BYTES:
+                payloads.append(json.dumps({"origin": self.origin, "events": chunk}))
+                chunk, size = [], 0
+            chunk.append(item)
+            size += item_size
+        if chunk:
+            payloads.append(json.dumps({"origin": self.origin, "events": chunk}))
+        return payloads
+
+
+def build_backend(name: str):
+    if name == "local":
+        return LocalBackend()
+    if name == "file":
+        return FileBackend(settings.INVALIDATION_BUS_FILE)
+    if name == "postgres":
+        from app.database.session import engine
+        return PostgresNotifyBackend(engine, settings.INVALIDATION_BUS_CHANNEL)
+    raise ValueError(f"Unknown invalidation bus backend '{name}'")
+
+
+invalidation_bus = InvalidationBus(build_backend(settings.INVALIDATION_BUS_BACKEND))
+
+
+# Session hooks: collect per flush, publish per transaction ---------------------
+
+def record_change(session: Session, model_name: str, id: Any, op: str) -> None:
+    """Queue an event for publishing at commit; for writes that bypass the flush (UPDATE ... RETURNING)."""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    key = (model_name, str(id))
+    # An insert followed by updates in the same transaction stays an insert
+    if pending.get(key) != "insert" or op == "delete":
+        pending[key] = op
+
+
+def _collect(session: Session, flush_context) -> None:
+    for op, instances in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for instance in instances:
+            if not isinstance(instance, BaseEntity):
+                continue
+            if op == "update" and instance.is_deleted:
+                op_name = "delete"
+            else:
+                op_name = op
+            record_change(session, type(instance).__name__, instance.id, op_name)
+
+
+def _publish(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidation_bus.publish([ChangeEvent(model, id, op) for (model, id), op in pending.items()])
+
+
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_flush", _collect)
+event.listen(Session, "after_commit", _publish)
+event.listen(Session, "after_rollback", _discard)
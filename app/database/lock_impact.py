@@ -0,0 +1,126 @@
+"""Estimate the PostgreSQL lock impact of a migration from the SQL it emits.
+
+    alembic upgrade <from>:<to> --sql -x lock_report=true
+
+Alembic renders the migrations offline and alembic/env.py prints one line per
+statement instead of the SQL:
+
+- online:   SHARE UPDATE EXCLUSIVE or weaker; reads and writes keep running
+- brief:    ACCESS EXCLUSIVE (or similar) held only for a catalog change; still
+            queues behind long transactions, so run with a lock_timeout
+- blocking: writes (often reads too) wait for a scan or rewrite of the table
+
+The rules are text heuristics for the statements Alembic generates; anything
+unrecognised is reported as blocking. Statements on a table created earlier in
+the same migration are online (the table is empty and not yet in use).
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+ONLINE = "online"
+BRIEF = "brief"
+BLOCKING = "blocking"
+
+_SEVERITY_ORDER = {ONLINE: 0, BRIEF: 1, BLOCKING: 2}
+_RUNNING = re.compile(r"^-- Running (?:upgrade|downgrade) (.*)$", re.MULTILINE)
+_CREATE_TABLE = re.compile(r'^CREATE TABLE (?:IF NOT EXISTS )?"?([\w.]+)"?', re.IGNORECASE)
+_TARGET_TABLE = re.compile(r'^(?:ALTER TABLE (?:ONLY )?|CREATE (?:UNIQUE )?INDEX .*? ON (?:ONLY )?)"?([\w.]+)"?',
+                           re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class LockImpact:
+    statement: str
+    lock: str
+    severity: str
+    note: str
+
+
+# (pattern, lock, severity, note) — first match wins
+_RULES = [
+    (r"^/\* batched_update \*/", "ROW EXCLUSIVE", ONLINE, "keyset batches online; single statement offline"),
+    (r"^CREATE (UNIQUE )?INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", ONLINE, "index build does not block writes"),
+    (r"^CREATE (UNIQUE )?INDEX", "SHARE", BLOCKING, "writes blocked for the whole index build"),
+    (r"^DROP INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", ONLINE, ""),
+    (r"^DROP INDEX", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^CREATE TABLE", "-", ONLINE, "new table"),
+    (r"^DROP TABLE", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* VALIDATE CONSTRAINT", "SHARE UPDATE EXCLUSIVE", ONLINE, "scans the table without blocking writes"),
+    (r"^ALTER TABLE .* FOREIGN KEY .* NOT VALID", "SHARE ROW EXCLUSIVE", BRIEF, "both tables; existing rows not checked"),
+    (r"^ALTER TABLE .* FOREIGN KEY", "SHARE ROW EXCLUSIVE", BLOCKING,
+     "writes to both tables blocked while existing rows are checked; use add_foreign_key_not_valid"),
+    (r"^ALTER TABLE .* ADD CONSTRAINT .* CHECK .* NOT VALID", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* ADD CONSTRAINT .* (UNIQUE|PRIMARY KEY) USING INDEX", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* ADD CONSTRAINT", "ACCESS EXCLUSIVE", BLOCKING, "validates or indexes existing rows"),
+    (r"^ALTER TABLE .* ADD (COLUMN )?.* DEFAULT .*\(", "ACCESS EXCLUSIVE", BLOCKING,
+     "volatile default rewrites the table"),
+    (r"^ALTER TABLE (?!.* DEFAULT ).* ADD (COLUMN )?.* NOT NULL", "ACCESS EXCLUSIVE", BLOCKING,
+     "fails or scans on a non-empty table"),
+    (r"^ALTER TABLE .* ADD ", "ACCESS EXCLUSIVE", BRIEF, "catalog-only column add"),
+    (r"^ALTER TABLE .* ALTER COLUMN .* TYPE", "ACCESS EXCLUSIVE", BLOCKING, "type change usually rewrites the table"),
+    (r"^ALTER TABLE .* ALTER COLUMN .* SET NOT NULL", "ACCESS EXCLUSIVE", BLOCKING,
+     "full scan unless a validated CHECK (col IS NOT NULL) exists"),
+    (r"^ALTER TABLE .* ALTER COLUMN .* (SET|DROP) DEFAULT", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* ALTER COLUMN .* DROP NOT NULL", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* DROP (COLUMN|CONSTRAINT)", "ACCESS EXCLUSIVE", BRIEF, ""),
+    (r"^ALTER TABLE .* DETACH PARTITION .* CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", ONLINE, ""),
+    (r"^UPDATE .* WHERE .* IN \(SELECT .* LIMIT", "ROW EXCLUSIVE", ONLINE, "batched"),
+    (r"^(UPDATE|DELETE)", "ROW EXCLUSIVE", BLOCKING,
+     "locks every matched row in one transaction; use batched_update"),
+    (r"^INSERT", "ROW EXCLUSIVE", ONLINE, ""),
+    (r"^(SELECT|COMMIT|BEGIN|SET)", "-", ONLINE, ""),
+]
+_COMPILED = [(re.compile(pattern, re.IGNORECASE | re.DOTALL), lock, severity, note)
+             for pattern, lock, severity, note in _RULES]
+
+
+def classify(statement: str) -> LockImpact:
+    normalized = " ".join(statement.split())
+    for pattern, lock, severity, note in _COMPILED:
+        if pattern.search(normalized):
+            return LockImpact(normalized, lock, severity, note)
+    return LockImpact(normalized, "ACCESS EXCLUSIVE", BLOCKING, "unrecognised statement")
+
+
+def _statements(sql: str) -> List[str]:
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith("--")]
+    return [s.strip() for s in re.split(r";\s*$", "\n".join(lines), flags=re.MULTILINE) if s.strip()]
+
+
+def analyze_script(sql: str) -> Dict[str, List[LockImpact]]:
+    """Split an offline migration script by revision and classify each statement."""
+    report: Dict[str, List[LockImpact]] = {}
+    parts = _RUNNING.split(sql)
+    # parts: [preamble, revision, body, revision, body, ...]
+    for revision, body in zip(parts[1::2], parts[2::2]):
+        created = set()
+        impacts = []
+        for statement in _statements(body):
+            if "alembic_version" in statement:
+                continue
+            impact = classify(statement)
+            target = _TARGET_TABLE.match(impact.statement)
+            if target and target.group(1) in created:
+                impact = LockImpact(impact.statement, impact.lock, ONLINE, "table created in this migration")
+            table = _CREATE_TABLE.match(impact.statement)
+            if table:
+                created.add(table.group(1))
+            impacts.append(impact)
+        report[revision.strip()] = impacts
+    return report
+
+
+def worst(impacts: List[LockImpact]) -> str:
+    return max((i.severity for i in impacts), key=_SEVERITY_ORDER.__getitem__, default=ONLINE)
+
+
+def format_report(report: Dict[str, List[LockImpact]], width: int = 100) -> str:
+    lines = []
+    for revision, impacts in report.items():
+        lines.append(f"{revision}  [{worst(impacts)}]")
+        for impact in impacts:
+            statement = impact.statement if len(impact.statement) <= width else impact.statement[:width - 3] + "..."
+            note = f"  -- {impact.note}" if impact.note else ""
+            lines.append(f"  {impact.severity:<8} {impact.lock:<22} {statement}{note}")
+    return "\n".join(lines)
@@ -0,0 +1,271 @@
+"""Zero-downtime Alembic operations for large tables (PostgreSQL).
+
+Importing this module (alembic/env.py does) registers:
+
+    op.create_index_concurrently("ix_user_role_id", "user", ["role_id"])
+    op.drop_index_concurrently("ix_user_role_id", "user")
+    op.add_foreign_key_not_valid("fk_user_role_id_role", "user", "role", ["role_id"], ["id"])
+    op.validate_constraint("fk_user_role_id_role", "user")
+    op.batched_update("user", "is_deleted = false", where="is_deleted IS NULL", batch_size=5000)
+
+CONCURRENTLY and VALIDATE run in an autocommit block, outside the migration
+transaction, so they only take SHARE UPDATE EXCLUSIVE and never block writes.
+A foreign key added NOT VALID only takes a brief lock and skips the scan;
+validate it in a later migration. batched_update walks the table in primary-key
+order, commits every batch, sleeps `pause` seconds between batches and records
+its position in `migration_backfill_progress`, so an interrupted run resumes
+where it stopped. Its SET expression must be idempotent and `where` must
+exclude rows already updated.
+
+On other dialects the operations fall back to their plain equivalents. Run with
+`alembic -x zero_downtime=true upgrade head` (see alembic/env.py) and check a
+migration first with `alembic upgrade head --sql -x lock_report=true`.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, Sequence
+
+from alembic.operations import MigrateOperation, Operations
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TABLE = "migration_backfill_progress"
+BATCHED_MARKER = "/* batched_update */"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _is_postgresql(operations) -> bool:
+    return operations.get_context().dialect.name == "postgresql"
+
+
+# Keyset backfill -------------------------------------------------------------
+
+def ensure_progress_table(connection: Connection) -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        "name VARCHAR(200) PRIMARY KEY, last_key VARCHAR(200), rows_done BIGINT NOT NULL DEFAULT 0, "
+        "done BOOLEAN NOT NULL DEFAULT FALSE, updated_at TIMESTAMP)"
+    ))
+
+
+def _load_progress(connection: Connection, name: str):
+    return connection.execute(
+        text(f"SELECT last_key, rows_done, done FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+    ).first()
+
+
+def _save_progress(connection: Connection, name: str, last_key: Optional[str], rows_done: int, done: bool) -> None:
+    connection.execute(text(
+        f"INSERT INTO {PROGRESS_TABLE} (name, last_key, rows_done, done, updated_at) "
+        "VALUES (:name, :last_key, :rows_done, :done, :updated_at) "
+        "ON CONFLICT (name) DO UPDATE SET last_key = excluded.last_key, rows_done = excluded.rows_done, "
+        "done = excluded.done, updated_at = excluded.updated_at"
+    ), {"name": name, "last_key": last_key, "rows_done": rows_done, "done": done,
+        "updated_at": datetime.now(timezone.utc).replace(tzinfo=None)})
+
+
+def batched_update_sql(table: str, set_sql: str, where: Optional[str], key: str, resume: bool) -> str:
+    conditions = [f"({where})"] if where else []
+    if resume:
+        conditions.append(f"{_quote(key)} > :last_key")
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return (
+        f"UPDATE {_quote(table)} SET {set_sql} WHERE {_quote(key)} IN ("
+        f"SELECT {_quote(key)} FROM {_quote(table)}{where_clause} ORDER BY {_quote(key)} LIMIT :batch_size"
+        f") RETURNING {_quote(key)}"
+    )
+
+
+def run_batched_update(connection: Connection, table: str, set_sql: str, where: Optional[str] = None, *,
+                       key: str = "id", batch_size: int = 1000, pause: float = 0.1, name: Optional[str] = None,
+                       commit: bool = True, max_batches: Optional[int] = None,
+                       sleep: Callable[[float], None] = time.sleep) -> int:
+    """Run the update batch by batch; returns the number of rows updated by this call.
+
+    commit=True commits after every batch (plain connection); pass False when the
+    connection autocommits or is owned by an outer transaction.
+    """
+    name = name or f"{table}:{set_sql}"
+    ensure_progress_table(connection)
+    progress = _load_progress(connection, name)
+    if progress is not None and progress.done:
+        logger.info("Backfill %s already finished (%d rows)", name, progress.rows_done)
+        return 0
+    last_key = progress.last_key if progress is not None else None
+    rows_done = progress.rows_done if progress is not None else 0
+    if commit:
+        connection.commit()
+
+    updated = batches = 0
+    while max_batches is None or batches < max_batches:
+        if batches and pause:
+            sleep(pause)
+        statement = text(batched_update_sql(table, set_sql, where, key, last_key is not None))
+        params = {"batch_size": batch_size}
+        if last_key is not None:
+            params["last_key"] = last_key
+        keys = [str(row[0]) for row in connection.execute(statement, params)]
+        if keys:
+            last_key = max(keys)
+            rows_done += len(keys)
+            updated += len(keys)
+        done = len(keys) < batch_size
+        # Saved with the batch: on restart the batch is either fully applied and recorded or redone
+        _save_progress(connection, name, last_key, rows_done, done)
+        if commit:
+            connection.commit()
+        batches += 1
+        logger.info("Backfill %s: %d rows (batch %d, last key %s)", name, rows_done, batches, last_key)
+        if done:
+            break
+    return updated
+
+
+# Alembic operations ----------------------------------------------------------
+
+@Operations.register_operation("create_index_concurrently")
+class CreateIndexConcurrentlyOp(MigrateOperation):
+    def __init__(self, index_name: str, table_name: str, columns: Sequence[str], unique: bool = False, **kw):
+        self.index_name = index_name
+        self.table_name = table_name
+        self.columns = list(columns)
+        self.unique = unique
+        self.kw = kw
+
+    @classmethod
+    def create_index_concurrently(cls, operations, index_name, table_name, columns, unique=False, **kw):
+        return operations.invoke(cls(index_name, table_name, columns, unique, **kw))
+
+    def reverse(self):
+        return DropIndexConcurrentlyOp(self.index_name, self.table_name)
+
+
+@Operations.register_operation("drop_index_concurrently")
+class DropIndexConcurrentlyOp(MigrateOperation):
+    def __init__(self, index_name: str, table_name: str):
+        self.index_name = index_name
+        self.table_name = table_name
+
+    @classmethod
+    def drop_index_concurrently(cls, operations, index_name, table_name):
+        return operations.invoke(cls(index_name, table_name))
+
+
+@Operations.register_operation("add_foreign_key_not_valid")
+class AddForeignKeyNotValidOp(MigrateOperation):
+    def __init__(self, constraint_name: str, source_table: str, referent_table: str,
+                 local_cols: List[str], remote_cols: List[str], ondelete: Optional[str] = None):
+        self.constraint_name = constraint_name
+        self.source_table = source_table
+        self.referent_table = referent_table
+        self.local_cols = local_cols
+        self.remote_cols = remote_cols
+        self.ondelete = ondelete
+
+    @classmethod
+    def add_foreign_key_not_valid(cls, operations, constraint_name, source_table, referent_table,
+                                  local_cols, remote_cols, ondelete=None):
+        return operations.invoke(cls(constraint_name, source_table, referent_table, local_cols, remote_cols,
+                                     ondelete))
+
+
+@Operations.register_operation("validate_constraint")
+class ValidateConstraintOp(MigrateOperation):
+    def __init__(self, constraint_name: str, table_name: str):
+        self.constraint_name = constraint_name
+        self.table_name = table_name
+
+    @classmethod
+    def validate_constraint(cls, operations, constraint_name, table_name):
+        return operations.invoke(cls(constraint_name, table_name))
+
+
+@Operations.register_operation("batched_update")
+class BatchedUpdateOp(MigrateOperation):
+    def __init__(self, table_name: str, set_sql: str, where: Optional[str] = None, **kw: Any):
+        self.table_name = table_name
+        self.set_sql = set_sql
+        self.where = where
+        self.kw = kw
+
+    @classmethod
+    def batched_update(cls, operations, table_name, set_sql, where=None, **kw):
+        return operations.invoke(cls(table_name, set_sql, where, **kw))
+
+
+@Operations.implementation_for(CreateIndexConcurrentlyOp)
+def create_index_concurrently(operations, operation: CreateIndexConcurrentlyOp):
+    if not _is_postgresql(operations):
+        operations.create_index(operation.index_name, operation.table_name, operation.columns,
+                                unique=operation.unique, **operation.kw)
+        return
+    context = operations.get_context()
+    with context.autocommit_block():
+        # A failed CONCURRENTLY build leaves an INVALID index behind that IF NOT EXISTS would keep
+        if not context.as_sql and operations.get_bind().execute(text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ), {"name": operation.index_name}).first():
+            operations.execute(f"DROP INDEX CONCURRENTLY {_quote(operation.index_name)}")
+        operations.create_index(operation.index_name, operation.table_name, operation.columns,
+                                unique=operation.unique, postgresql_concurrently=True, if_not_exists=True,
+                                **operation.kw)
+
+
+@Operations.implementation_for(DropIndexConcurrentlyOp)
+def drop_index_concurrently(operations, operation: DropIndexConcurrentlyOp):
+    if not _is_postgresql(operations):
+        operations.drop_index(operation.index_name, table_name=operation.table_name)
+        return
+    with operations.get_context().autocommit_block():
+        operations.drop_index(operation.index_name, table_name=operation.table_name,
+                              postgresql_concurrently=True, if_exists=True)
+
+
+@Operations.implementation_for(AddForeignKeyNotValidOp)
+def add_foreign_key_not_valid(operations, operation: AddForeignKeyNotValidOp):
+    if not _is_postgresql(operations):
+        operations.create_foreign_key(operation.constraint_name, operation.source_table, operation.referent_table,
+                                      operation.local_cols, operation.remote_cols, ondelete=operation.ondelete)
+        return
+    ondelete = f" ON DELETE {operation.ondelete}" if operation.ondelete else ""
+    operations.execute(
+        f"ALTER TABLE {_quote(operation.source_table)} ADD CONSTRAINT {_quote(operation.constraint_name)} "
+        f"FOREIGN KEY ({', '.join(map(_quote, operation.local_cols))}) "
+        f"REFERENCES {_quote(operation.referent_table)} ({', '.join(map(_quote, operation.remote_cols))})"
+        f"{ondelete} NOT VALID"
+    )
+
+
+@Operations.implementation_for(ValidateConstraintOp)
+def validate_constraint(operations, operation: ValidateConstraintOp):
+    if not _is_postgresql(operations):
+        return
+    with operations.get_context().autocommit_block():
+        operations.execute(
+            f"ALTER TABLE {_quote(operation.table_name)} VALIDATE CONSTRAINT {_quote(operation.constraint_name)}"
+        )
+
+
+@Operations.implementation_for(BatchedUpdateOp)
+def batched_update(operations, operation: BatchedUpdateOp):
+    context = operations.get_context()
+    if context.as_sql:
+        # Offline scripts cannot loop: emit the equivalent single statement, tagged for lock_impact
+        where = f" WHERE {operation.where}" if operation.where else ""
+        operations.execute(f"{BATCHED_MARKER} UPDATE {_quote(operation.table_name)} SET {operation.set_sql}{where}")
+        return
+    if not _is_postgresql(operations):
+        run_batched_update(operations.get_bind(), operation.table_name, operation.set_sql, operation.where,
+                           commit=False, **operation.kw)
+        return
+    # Every statement commits on its own in the autocommit block
+    with context.autocommit_block():
+        run_batched_update(operations.get_bind(), operation.table_name, operation.set_sql, operation.where,
+                           commit=False, **operation.kw)
@@ -0,0 +1,100 @@
+"""Partition maintenance for PartitionedEntity tables.
+
+Run periodically (cron / k8s CronJob):
+
+    python -m app.database.partition_maintenance --ahead 3 --retain 12
+"""
+import argparse
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.database.partitioning import (
+    add_months, create_partition_sql, detach_partition_sql, drop_partition_sql, has_default_partition_sql,
+    list_partitions_sql, month_range, month_start, parse_partition_month,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def partitioned_tables(metadata=SQLModel.metadata) -> List[str]:
+    return [
+        table.name for table in metadata.sorted_tables
+        if table.dialect_options["postgresql"].get("partition_by")
+    ]
+
+
+def existing_partitions(connection: Connection, table_name: str) -> List[date]:
+    rows = connection.execute(text(list_partitions_sql()), {"table_name": table_name}).scalars().all()
+    months = [parse_partition_month(table_name, name) for name in rows]
+    return sorted(m for m in months if m is not None)
+
+
+def has_default_partition(connection: Connection, table_name: str) -> bool:
+    return bool(connection.execute(text(has_default_partition_sql()), {"table_name": table_name}).scalar())
+
+
+def plan_maintenance(existing: List[date], today: date, ahead: int,
+                     retain: Optional[int]) -> Dict[str, List[date]]:
+    """Return the months to create and to detach for a single table."""
+    current = month_start(today)
+    wanted = month_range(current, ahead + 1)
+    create = [m for m in wanted if m not in existing]
+    detach: List[date] = []
+    if retain is not None:
+        oldest_kept = add_months(current, -retain)
+        detach = [m for m in existing if m < oldest_kept]
+    return {"create": create, "detach": detach}
+
+
+def run_maintenance(connection: Connection, ahead: int, retain: Optional[int], drop: bool = False,
+                    today: Optional[date] = None, tables: Optional[List[str]] = None) -> Dict[str, Dict]:
+    today = today or datetime.now(timezone.utc).date()
+    report = {}
+    for table_name in tables or partitioned_tables():
+        plan = plan_maintenance(existing_partitions(connection, table_name), today, ahead, retain)
+        for month in plan["create"]:
+            logger.info("Creating partition %s for %s", month, table_name)
+            connection.execute(text(create_partition_sql(table_name, month)))
+        # CONCURRENTLY avoids an ACCESS EXCLUSIVE lock on the parent (needs autocommit), but
+        # PostgreSQL rejects it when the table has a DEFAULT partition (the default layout)
+        concurrently = bool(plan["detach"]) and not has_default_partition(connection, table_name)
+        for month in plan["detach"]:
+            logger.info("Detaching partition %s from %s%s", month, table_name,
+                        " concurrently" if concurrently else "")
+            connection.execute(text(detach_partition_sql(table_name, month, concurrently=concurrently)))
+            if drop:
+                connection.execute(text(drop_partition_sql(table_name, month)))
+        report[table_name] = plan
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-create and detach date_created partitions")
+    parser.add_argument("--ahead", type=int, default=settings.PARTITION_PREMAKE_MONTHS,
+                        help="Months to pre-create after the current one")
+    parser.add_argument("--retain", type=int, default=settings.PARTITION_RETENTION_MONTHS,
+                        help="Months to keep attached before the current one")
+    parser.add_argument("--drop", action="store_true", help="Drop partitions after detaching them")
+    parser.add_argument("--table", action="append", dest="tables", help="Limit to these tables")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Register every model so SQLModel.metadata knows the partitioned tables
+    import app.database.base  # noqa: F401
+    from app.database.session import engine
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        report = run_maintenance(connection, args.ahead, args.retain, drop=args.drop, tables=args.tables)
+    for table_name, plan in report.items():
+        logger.info("%s: created=%d detached=%d", table_name, len(plan["create"]), len(plan["detach"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from alembic.operations import MigrateOperation, Operations
+
+from app.models.abstractions.partitioned_entity import PARTITION_COLUMN
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start: date, months: int) -> List[date]:
+    first = month_start(start)
+    return [add_months(first, i) for i in range(months)]
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month.year:04d}_{month.month:02d}"
+
+
+def parse_partition_month(table_name: str, name: str) -> Optional[date]:
+    if not name.startswith(f"{table_name}_p"):
+        return None
+    match = _PARTITION_SUFFIX.search(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def create_partition_sql(table_name: str, month: date) -> str:
+    lower = month_start(month)
+    upper = add_months(lower, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_quote(partition_name(table_name, lower))} "
+        f"PARTITION OF {_quote(table_name)} "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def create_default_partition_sql(table_name: str) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_quote(table_name + '_default')} "
+        f"PARTITION OF {_quote(table_name)} DEFAULT"
+    )
+
+
+def detach_partition_sql(table_name: str, month: date, concurrently: bool = False) -> str:
+    mode = " CONCURRENTLY" if concurrently else ""
+    return (
+        f"ALTER TABLE {_quote(table_name)} "
+        f"DETACH PARTITION {_quote(partition_name(table_name, month))}{mode}"
+    )
+
+
+def drop_partition_sql(table_name: str, month: date) -> str:
+    return f"DROP TABLE IF EXISTS {_quote(partition_name(table_name, month))}"
+
+
+def has_default_partition_sql() -> str:
+    return (
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "JOIN pg_class parent ON parent.oid = pg_partitioned_table.partrelid "
+        "WHERE parent.relname = :table_name AND pg_partitioned_table.partdefid <> 0)"
+    )
+
+
+def list_partitions_sql() -> str:
+    return (
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table_name"
+    )
+
+
+# Alembic operations ----------------------------------------------------------
+# Importing this module registers:
+#   op.create_partitioned_table("event", *columns, start=date(2026, 1, 1), months=12)
+#   op.create_monthly_partitions("event", start=date(2026, 1, 1), months=3)
+#   op.detach_monthly_partitions("event", start=date(2025, 1, 1), months=1)
+
+
+@Operations.register_operation("create_partitioned_table")
+class CreatePartitionedTableOp(MigrateOperation):
+    def __init__(self, table_name: str, columns, start: date, months: int, default_partition: bool = True,
+                 **kw):
+        self.table_name = table_name
+        self.columns = columns
+        self.start = start
+        self.months = months
+        self.default_partition = default_partition
+        self.kw = kw
+
+    @classmethod
+    def create_partitioned_table(cls, operations, table_name, *columns, start: date, months: int = 12,
+                                 default_partition: bool = True, **kw):
+        return operations.invoke(cls(table_name, columns, start, months, default_partition, **kw))
+
+    def reverse(self):
+        return DropPartitionedTableOp(self.table_name)
+
+
+@Operations.register_operation("drop_partitioned_table")
+class DropPartitionedTableOp(MigrateOperation):
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+
+    @classmethod
+    def drop_partitioned_table(cls, operations, table_name):
+        return operations.invoke(cls(table_name))
+
+
+@Operations.register_operation("create_monthly_partitions")
+class CreateMonthlyPartitionsOp(MigrateOperation):
+    def __init__(self, table_name: str, start: date, months: int):
+        self.table_name = table_name
+        self.start = start
+        self.months = months
+
+    @classmethod
+    def create_monthly_partitions(cls, operations, table_name, *, start: date, months: int = 1):
+        return operations.invoke(cls(table_name, start, months))
+
+    def reverse(self):
+        return DetachMonthlyPartitionsOp(self.table_name, self.start, self.months, drop=True)
+
+
+@Operations.register_operation("detach_monthly_partitions")
+class DetachMonthlyPartitionsOp(MigrateOperation):
+    def __init__(self, table_name: str, start: date, months: int, drop: bool = False):
+        self.table_name = table_name
+        self.start = start
+        self.months = months
+        self.drop = drop
+
+    @classmethod
+    def detach_monthly_partitions(cls, operations, table_name, *, start: date, months: int = 1,
+                                  drop: bool = False):
+        return operations.invoke(cls(table_name, start, months, drop))
+
+    def reverse(self):
+        return CreateMonthlyPartitionsOp(self.table_name, self.start, self.months)
+
+
+@Operations.implementation_for(CreatePartitionedTableOp)
+def create_partitioned_table(operations, operation: CreatePartitionedTableOp):
+    operations.create_table(
+        operation.table_name,
+        *operation.columns,
+        postgresql_partition_by=f"RANGE ({PARTITION_COLUMN})",
+        **operation.kw,
+    )
+    if operations.get_context().dialect.name != "postgresql":
+        return
+    for month in month_range(operation.start, operation.months):
+        operations.execute(create_partition_sql(operation.table_name, month))
+    if operation.default_partition:
+        operations.execute(create_default_partition_sql(operation.table_name))
+
+
+@Operations.implementation_for(DropPartitionedTableOp)
+def drop_partitioned_table(operations, operation: DropPartitionedTableOp):
+    # Dropping the parent drops every attached partition as well
+    operations.drop_table(operation.table_name)
+
+
+@Operations.implementation_for(CreateMonthlyPartitionsOp)
+def create_monthly_partitions(operations, operation: CreateMonthlyPartitionsOp):
+    if operations.get_context().dialect.name != "postgresql":
+        return
+    for month in month_range(operation.start, operation.months):
+        operations.execute(create_partition_sql(operation.table_name, month))
+
+
+@Operations.implementation_for(DetachMonthlyPartitionsOp)
+def detach_monthly_partitions(operations, operation: DetachMonthlyPartitionsOp):
+    if operations.get_context().dialect.name != "postgresql":
+        return
+    for month in month_range(operation.start, operation.months):
+        operations.execute(detach_partition_sql(operation.table_name, month))
+        if operation.drop:
+            operations.execute(drop_partition_sql(operation.table_name, month))
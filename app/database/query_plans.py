@@ -0,0 +1,248 @@
+"""Sampled plan capture for slow queries (GET /admin/query-plans).
+
+Every statement is timed with engine events. Statements slower than
+QUERY_PLAN_SLOW_MS, plus a QUERY_PLAN_SAMPLE_RATE fraction of all statements,
+get their plan captured and stored in a bounded ring buffer together with a
+normalized fingerprint and the repository method that issued them (found by
+walking the stack, only when a statement is captured).
+
+On PostgreSQL the plan is taken off the request path: a background thread
+re-runs the statement with EXPLAIN (ANALYZE, BUFFERS) on its own connection, in
+a READ ONLY transaction with a statement_timeout, and rolls back. SET
+TRANSACTION READ ONLY is the first statement of that transaction (the driver
+opens it implicitly), and the capture is abandoned unless the server then
+reports transaction_read_only = on. ANALYZE is only used for SELECTs, and for
+WITH queries whose CTEs do not write; other statements get a plain EXPLAIN. Captures are
+dropped when the worker queue is full. Other dialects (SQLite in tests) get an
+inline EXPLAIN QUERY PLAN for SELECTs.
+"""
+import hashlib
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+
+
+def normalize(statement: str) -> str:
+    normalized = _COMMENTS.sub(" ", statement)
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PARAMS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _LISTS.sub("(...)", normalized)
+    return " ".join(normalized.split())
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize(statement).encode()).hexdigest()[:16]
+
+
+@dataclass
+class CapturedPlan:
+    fingerprint: str
+    statement: str
+    method: Optional[str]
+    duration_ms: float
+    reason: str  # "slow" | "sampled"
+    plan: str
+    captured_at: str
+
+
+def _calling_repository_method() -> Optional[str]:
+    from app.repositories.abstractions.base_repository import BaseRepository
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        owner = frame.f_locals.get("self")
+        if isinstance(owner, BaseRepository):
+            return f"{type(owner).__name__}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+_WRITES = re.compile(r"\b(insert|update|delete|merge)\b")
+
+
+def _is_select(statement: str) -> bool:
+    """A read-only query: SELECT, or WITH ... without data-modifying CTEs (SELECT ... FOR UPDATE aside)."""
+    text = _STRINGS.sub("''", _COMMENTS.sub(" ", statement)).lstrip().lower()
+    if text.startswith("select"):
+        return True
+    return text.startswith("with") and not _WRITES.search(text)
+
+
+class PlanCapture:
+    def __init__(self, enabled: bool, slow_ms: float, sample_rate: float, buffer_size: int,
+                 analyze: bool = True, timeout_ms: int = 5000, queue_size: int = 100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.analyze = analyze
+        self.timeout_ms = timeout_ms
+        self.plans: Deque[CapturedPlan] = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def reason(self, duration_ms: float) -> Optional[str]:
+        if duration_ms >= self.slow_ms:
+            return "slow"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def record(self, plan: CapturedPlan) -> None:
+        with self._lock:
+            self.plans.append(plan)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.plans.clear()
+
+    def grouped(self) -> List[Dict[str, Any]]:
+        """Captured plans grouped by fingerprint, slowest group first."""
+        with self._lock:
+            plans = list(self.plans)
+        groups: Dict[str, Dict[str, Any]] = {}
+        for plan in plans:
+            group = groups.setdefault(plan.fingerprint, {
+                "fingerprint": plan.fingerprint,
+                "statement": normalize(plan.statement),
+                "methods": [],
+                "count": 0,
+                "max_ms": 0.0,
+                "total_ms": 0.0,
+                "plans": [],
+            })
+            if plan.method and plan.method not in group["methods"]:
+                group["methods"].append(plan.method)
+            group["count"] += 1
+            group["max_ms"] = max(group["max_ms"], plan.duration_ms)
+            group["total_ms"] += plan.duration_ms
+            group["plans"].append(asdict(plan))
+        result = []
+        for group in groups.values():
+            total = group.pop("total_ms")
+            group["avg_ms"] = round(total / group["count"], 3)
+            group["plans"].sort(key=lambda p: p["captured_at"], reverse=True)
+            result.append(group)
+        return sorted(result, key=lambda g: g["max_ms"], reverse=True)
+
+    # capture paths ---------------------------------------------------------
+
+    def submit(self, engine: Engine, statement: str, parameters, duration_ms: float, reason: str,
+               method: Optional[str]) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((engine, statement, parameters, duration_ms, reason, method))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="query-plan-capture", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                self.explain_postgresql(*item)
+            except Exception as e:
+                logger.warning("Plan capture failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def join(self) -> None:
+        self._queue.join()
+
+    def explain_postgresql(self, engine: Engine, statement: str, parameters, duration_ms: float, reason: str,
+                           method: Optional[str]) -> None:
+        analyze = self.analyze and _is_select(statement)
+        options = "ANALYZE, BUFFERS, FORMAT TEXT" if analyze else "FORMAT TEXT"
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            # First statement of the transaction the driver begins implicitly (an explicit
+            # BEGIN would only warn "already a transaction in progress" and stay read-write)
+            cursor.execute("SET TRANSACTION READ ONLY")
+            cursor.execute("SHOW transaction_read_only")
+            if cursor.fetchone()[0] != "on":
+                raise RuntimeError("could not start a read-only transaction, not running EXPLAIN")
+            cursor.execute(f"SET LOCAL statement_timeout = {int(self.timeout_ms)}")
+            cursor.execute(f"EXPLAIN ({options}) {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.close()
+        finally:
+            raw.rollback()
+            raw.close()
+        self.record(CapturedPlan(fingerprint(statement), statement, method, round(duration_ms, 3), reason, plan,
+                                 datetime.now(timezone.utc).isoformat()))
+
+    def explain_inline(self, dbapi_connection, statement: str, parameters, duration_ms: float, reason: str,
+                       method: Optional[str]) -> None:
+        if not _is_select(statement):
+            return
+        rows = dbapi_connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plan = "\n".join(str(row[-1]) for row in rows)
+        self.record(CapturedPlan(fingerprint(statement), statement, method, round(duration_ms, 3), reason, plan,
+                                 datetime.now(timezone.utc).isoformat()))
+
+
+plan_capture = PlanCapture(
+    enabled=settings.QUERY_PLAN_CAPTURE_ENABLED,
+    slow_ms=settings.QUERY_PLAN_SLOW_MS,
+    sample_rate=settings.QUERY_PLAN_SAMPLE_RATE,
+    buffer_size=settings.QUERY_PLAN_BUFFER_SIZE,
+    analyze=settings.QUERY_PLAN_ANALYZE,
+    timeout_ms=settings.QUERY_PLAN_TIMEOUT_MS,
+)
+
+
+# Engine hooks ----------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    if not plan_capture.enabled or executemany or statement.lstrip().upper().startswith("EXPLAIN"):
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    reason = plan_capture.reason(duration_ms)
+    if reason is None:
+        return
+    method = _calling_repository_method()
+    try:
+        if conn.dialect.name == "postgresql":
+            plan_capture.submit(conn.engine, statement, parameters, duration_ms, reason, method)
+        else:
+            plan_capture.explain_inline(conn.connection.driver_connection, statement, parameters, duration_ms,
+                                        reason, method)
+    except Exception as e:
+        logger.warning("Plan capture failed: %s", e)
+
+
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,121 @@
+"""Cache of serialized listing pages (GET /{prefix}/), invalidated by generation.
+
+Each model has a generation counter. Every committed write of a BaseEntity
+reaches the invalidation bus, which is dispatched locally at commit and from
+other workers through the bus backend, and bumps that model's generation. An
+entry stores the generation it was computed under and is a miss once the
+counter has moved on, so invalidation is O(1). The generation is read *before*
+the queries run. A write that commits while a page is being computed therefore
+makes that page stale immediately.
+
+Writes from other workers only bump the generation over a cross-process bus
+(INVALIDATION_BUS_BACKEND "postgres", or "file" on one host). With the default
+"local" bus and several workers, a worker keeps serving pages that another
+worker's writes made stale for up to RESULT_CACHE_TTL.
+
+Entries hold the response body (JSON bytes of the page and total) and are
+bounded by RESULT_CACHE_MAX_BYTES, evicted least recently used first by byte
+size. Bodies larger than RESULT_CACHE_MAX_ENTRY_BYTES are not cached, so one
+big page cannot flush many small hot ones. RESULT_CACHE_TTL also bounds
+staleness for writes made outside the application (migrations, SQL consoles).
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database.invalidation import ChangeEvent, invalidation_bus
+
+cache_requests = registry.counter("result_cache_requests_total", "Listing cache lookups by model and result")
+cache_evictions = registry.counter("result_cache_evictions_total", "Listing cache entries evicted to stay in budget")
+
+
+def cache_key(*parts: Any) -> str:
+    """Normalized key: JSON with sorted keys, so equivalent inputs map to the same entry."""
+    return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+
+@dataclass
+class _Entry:
+    model: str
+    generation: int
+    expires_at: float
+    body: bytes
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl: float, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, model: str) -> int:
+        return self._generations.get(model, 0)
+
+    def bump(self, model: str) -> None:
+        with self._lock:
+            self._generations[model] = self._generations.get(model, 0) + 1
+
+    def on_events(self, events: List[ChangeEvent]) -> None:
+        for model in {e.model for e in events}:
+            self.bump(model)
+
+    def get(self, model: str, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.generation != self._generations.get(model, 0)
+                                      or entry.expires_at <= self.clock()):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        cache_requests.inc(model=model, result="hit" if entry is not None else "miss")
+        return entry.body if entry is not None else None
+
+    def put(self, model: str, key: Hashable, generation: int, body: bytes) -> bool:
+        size = len(body)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+        with self._lock:
+            if generation != self._generations.get(model, 0):
+                return False  # written while the page was being computed
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(model, generation, self.clock() + self.ttl, body)
+            self.bytes += size
+            evicted = 0
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            cache_evictions.inc(evicted)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "generations": dict(self._generations)}
+
+    def _remove(self, key: Hashable) -> None:
+        self.bytes -= len(self._entries.pop(key).body)
+
+
+result_cache = ResultCache(
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.RESULT_CACHE_MAX_ENTRY_BYTES,
+    ttl=settings.RESULT_CACHE_TTL,
+)
+invalidation_bus.subscribe("*", result_cache.on_events)
@@ -1,3 +1,5 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -6,6 +8,10 @@ database_url = settings.full_database_url
 engine = create_engine(database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# A forked worker must not reuse the parent's pooled connections (shared sockets):
+# start it with an empty pool and leave the parent's connections to the parent.
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 
 def get_db():
     db = SessionLocal()
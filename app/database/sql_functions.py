@@ -0,0 +1,39 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import String
+
+BUCKETS = ("day", "week", "month")
+
+
+class date_bucket(FunctionElement):
+    """Truncate a timestamp to a bucket label: day/week -> YYYY-MM-DD (week starts Monday), month -> YYYY-MM."""
+    type = String()
+    inherit_cache = True
+    name = "date_bucket"
+    # unit is rendered inline, so it must be part of the statement cache key
+    _traverse_internals = FunctionElement._traverse_internals + [("unit", InternalTraversal.dp_string)]
+
+    def __init__(self, unit: str, expr):
+        if unit not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{unit}'")
+        self.unit = unit
+        super().__init__(expr)
+
+
+@compiles(date_bucket, "postgresql")
+def _date_bucket_postgresql(element, compiler, **kw):
+    column = compiler.process(list(element.clauses)[0], **kw)
+    pattern = "YYYY-MM" if element.unit == "month" else "YYYY-MM-DD"
+    return f"to_char(date_trunc('{element.unit}', {column}), '{pattern}')"
+
+
+@compiles(date_bucket)
+def _date_bucket_default(element, compiler, **kw):
+    # SQLite
+    column = compiler.process(list(element.clauses)[0], **kw)
+    if element.unit == "month":
+        return f"strftime('%Y-%m', {column})"
+    if element.unit == "week":
+        return f"date({column}, '-6 days', 'weekday 1')"
+    return f"date({column})"
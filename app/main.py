@@ -1,13 +1,38 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
-from app.api.routers.user_router import router as user_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.deadlines import QueryCancelled, query_cancelled_handler
+from app.core.loop_monitor import LoopMonitorMiddleware
+from app.core.metrics import registry
+from app.core.profiling import ProfilingMiddleware
+from app.core.startup import include_routers, lifespan, load_precomputed_openapi
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(QueryCancelled, query_cancelled_handler)
 
-# routers
-app.include_router(user_router)
+# routers: (prefix, module); prefixes in settings.LAZY_ROUTER_PREFIXES are imported on first use
+include_routers(app, [
+    ("/admin", "app.api.routers.admin_router"),
+    ("/auth", "app.api.routers.auth_router"),
+    ("/users", "app.api.routers.user_router"),
+])
+
+load_precomputed_openapi(app, settings.OPENAPI_SCHEMA_PATH)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+if settings.LOOP_MONITOR_ENABLED:
+    app.add_middleware(LoopMonitorMiddleware)
 
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return registry.render()
@@ -5,9 +5,15 @@ import uuid
 from sqlalchemy import null
 from sqlmodel import Field, SQLModel
 
+from app.core.config import settings
+from app.models.abstractions.id_generators import get_id_generator
+
+# uuid7 by default: time-ordered keys append to the right edge of the PK index
+generate_id = get_id_generator(settings.ID_GENERATOR)
+
 
 class BaseEntity(SQLModel):
-    id: uuid.UUID = Field(default_factory=lambda: uuid.uuid4(), primary_key=True, nullable=False, index=True)
+    id: uuid.UUID = Field(default_factory=lambda: generate_id(), primary_key=True, nullable=False, index=True)
     date_created: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
     date_updated: Optional[datetime] = Field(default_factory=lambda: None, nullable=True)
     is_deleted: Optional[bool] = Field(default_factory=lambda: False, nullable=True)
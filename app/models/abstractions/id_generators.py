@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562, version 7).
+
+    48-bit unix milliseconds, then a 12-bit counter (random start, incremented
+    inside the same millisecond) so ids generated by one process stay strictly
+    increasing, then 62 random bits.
+    """
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF  # leave room to increment
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_datetime(value: uuid.UUID) -> datetime:
+    """Creation time encoded in a UUIDv7."""
+    if value.version != 7:
+        raise ValueError(f"{value} is not a UUIDv7")
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
+
+
+def uuid7_floor(moment: datetime) -> uuid.UUID:
+    """Smallest UUIDv7 for a given instant; usable as a keyset bound on id."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    ms = int(moment.timestamp() * 1000)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (0b10 << 62))
+
+
+ID_GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+def get_id_generator(name: str) -> Callable[[], uuid.UUID]:
+    try:
+        return ID_GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown id generator '{name}'. Options: {', '.join(ID_GENERATORS)}")
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+from sqlmodel import Field
+
+from app.models.abstractions.base_entity import BaseEntity
+
+PARTITION_COLUMN = "date_created"
+
+
+class PartitionedEntity(BaseEntity):
+    """Opt-in base for tables range-partitioned (monthly) by date_created.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes (id, date_created). Other dialects (SQLite in tests)
+    ignore the partitioning option and create a single table.
+    """
+    date_created: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), primary_key=True,
+                                   nullable=False)
+
+    __table_args__ = {"postgresql_partition_by": f"RANGE ({PARTITION_COLUMN})"}
+
+
+def is_partitioned(model) -> bool:
+    table = getattr(model, "__table__", None)
+    if table is None:
+        return False
+    return bool(table.dialect_options["postgresql"].get("partition_by"))
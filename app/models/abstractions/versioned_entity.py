@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from sqlmodel import Field
+
+from app.models.abstractions.base_entity import BaseEntity
+
+VERSION_COLUMN = "version"
+
+
+class VersionedEntity(BaseEntity):
+    """Opt-in base adding an optimistic-concurrency `version` column.
+
+    BaseRepository.update_returning/remove_returning bump it inside the UPDATE and
+    match an expected version (If-Match); ORM flushes of a modified entity bump it
+    in before_update.
+    """
+    version: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": "1"})
+
+
+def is_versioned(model) -> bool:
+    return isinstance(model, type) and issubclass(model, VersionedEntity)
+
+
+@event.listens_for(VersionedEntity, "before_update", propagate=True)
+def _bump_version(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version = (target.version or 0) + 1
@@ -1,11 +1,16 @@
 from typing import Optional, List
 
-from pydantic import Field
-from sqlmodel import Relationship
+from sqlmodel import Field, Relationship
 
 from app.models.abstractions.base_entity import BaseEntity
+from app.models.auth.role_permission import RolePermission
 
 
 class Permission(BaseEntity, table=True):
     name: str = Field(unique=True, nullable=False)
     description: Optional[str] = Field(default_factory=lambda: None, nullable=True)
+
+    roles: List["Role"] = Relationship(
+        back_populates="permissions",
+        link_model=RolePermission
+    )
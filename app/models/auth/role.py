@@ -1,7 +1,6 @@
 from typing import Optional, List
 
-from pydantic import Field
-from sqlmodel import Relationship
+from sqlmodel import Field, Relationship
 
 from app.models.abstractions.base_entity import BaseEntity
 from app.models.auth.permission import Permission
@@ -16,5 +15,6 @@ class Role(BaseEntity, table=True):
         back_populates="roles",
         link_model=RolePermission
     )
+    users: List["User"] = Relationship(back_populates="role")
 
 
@@ -1,11 +1,12 @@
+import uuid
 from typing import Optional
 
-from pydantic import Field
+from sqlmodel import Field
 
 from app.models.abstractions.base_entity import BaseEntity
 
 
 class RolePermission(BaseEntity, table=True):
-    role_id: Optional[int] = Field(foreign_key="role.id", primary_key=True, nullable=False)
-    permission_id: Optional[int] = Field(foreign_key="permission.id", primary_key=True, nullable=False)
+    role_id: Optional[uuid.UUID] = Field(default=None, foreign_key="role.id", nullable=True)
+    permission_id: Optional[uuid.UUID] = Field(default=None, foreign_key="permission.id", nullable=True)
 
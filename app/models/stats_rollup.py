@@ -0,0 +1,15 @@
+from sqlmodel import Field, SQLModel
+
+
+class StatsRollup(SQLModel, table=True):
+    """Incrementally maintained group-by counts, one row per (model, dimension, value).
+
+    Kept up to date by BaseRepository writes for repositories declaring
+    `rollup_dimensions`; date dimensions are stored per day (YYYY-MM-DD).
+    """
+    __tablename__ = "stats_rollup"
+
+    model_name: str = Field(primary_key=True, max_length=64)
+    dimension: str = Field(primary_key=True, max_length=64)
+    value: str = Field(primary_key=True, max_length=64)
+    count: int = Field(default=0, nullable=False)
@@ -1,22 +1,36 @@
+import uuid
 from typing import Optional, List
 
-from app.models.abstractions.base_entity import BaseEntity
+from app.models.abstractions.versioned_entity import VersionedEntity
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship
 from pydantic import EmailStr
 
 from app.models.auth.role import Role
 
 
-class User(BaseEntity, table=True):
+class User(VersionedEntity, table=True):
     email: EmailStr = Field(index=True, nullable=False, unique=True)
     password: str = Field(nullable=False)
     name: str = Field(nullable=False)
     last_name: str = Field(nullable=False)
 
     # Relación 1:1 con Role (un usuario un rol)
-    role_id: Optional[int] = Field(default=None, foreign_key="role.id")
+    role_id: Optional[uuid.UUID] = Field(default=None, foreign_key="role.id")
     role: Optional[Role] = Relationship(back_populates="users")
 
+    # Access paths for the listing filters (UserPaginatedInput.filters)
+    __table_args__ = (
+        Index("ix_user_date_created", "date_created"),
+        # Rows are appended in date_created order: a BRIN index of a few pages serves wide windows
+        Index("ix_user_date_created_brin", "date_created", postgresql_using="brin"),
+        Index("ix_user_last_name_name", "last_name", "name"),
+        # LIKE 'abc%' (the __prefix filters) cannot use the btrees above under a non-C collation
+        Index("ix_user_email_prefix", "email", postgresql_ops={"email": "varchar_pattern_ops"}),
+        Index("ix_user_last_name_prefix", "last_name", postgresql_ops={"last_name": "varchar_pattern_ops"}),
+        Index("ix_user_role_id", "role_id"),
+    )
+
     @property
     def permissions(self) -> List[str]:
         """Permisos calculados del rol del usuario"""
@@ -1,56 +1,122 @@
-from typing import Generic, TypeVar, Optional, List, Any, Callable, Sequence, Tuple
+import functools
+from datetime import datetime
+from typing import Generic, TypeVar, Optional, List, Any, Callable, Dict, Sequence, Tuple
 from abc import ABC, abstractmethod
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc, Row, RowMapping
+from sqlalchemy import func, and_, or_, desc, asc, tuple_, update, Row, RowMapping
 from sqlmodel import SQLModel, select
+from starlette.concurrency import run_in_threadpool
 from typing import Protocol
 
+# Publishes committed writes to other workers' caches
+from app.database.invalidation import record_change
+from app.database.sql_functions import date_bucket
+from app.models.abstractions.versioned_entity import VERSION_COLUMN, is_versioned
+from app.repositories.abstractions import rollups
+
 T = TypeVar("T", bound=SQLModel)
 
 
+def run_off_loop(method):
+    """Make a blocking repository method awaitable by running it in the threadpool.
+
+    The statement then never blocks the event loop, which stays free to notice a
+    client disconnect and cancel it (app.core.deadlines).
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        return await run_in_threadpool(method, *args, **kwargs)
+
+    return wrapper
+
+
 class IncludesQuery(Protocol):
     def __call__(self, query) -> Any: ...
 
 
 class BaseRepository(Generic[T], ABC):
+    # Dimensions whose group-by counts are kept in StatsRollup by add/update/remove
+    rollup_dimensions: Tuple[str, ...] = ()
+
     def __init__(self, db: Session):
         self.db = db
 
+    def _update_rollups(self, deltas: rollups.Deltas) -> None:
+        if self.rollup_dimensions:
+            rollups.apply_deltas(self.db, self.model.__name__, deltas)
+
     @staticmethod
     def _apply_includes(query: Any, include: Optional[Callable[[Any], Any]] = None) -> Any:
         if include:
             return include(query)
         return query
 
-    async def get_by_id(self, id: Any, include: Optional[Callable[[Any], Any]] = None) -> Optional[T]:
+    def _created_window(self, created_from: Optional[datetime] = None,
+                        created_to: Optional[datetime] = None) -> List[Any]:
+        """Half-open [created_from, created_to) predicate on date_created.
+
+        On partitioned tables this lets Postgres prune partitions outside the window.
+        """
+        conditions = []
+        if created_from is not None:
+            conditions.append(self.model.date_created >= created_from)
+        if created_to is not None:
+            conditions.append(self.model.date_created < created_to)
+        return conditions
+
+    def _select(self, columns: Optional[Sequence[str]] = None) -> Any:
+        """select(model), or a column-only select when a projection is requested."""
+        if columns:
+            return select(*(getattr(self.model, c) for c in columns))
+        return select(self.model)
+
+    def _read_select(self, columns: Optional[Sequence[str]] = None, disable_tracking: bool = True,
+                     include: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, bool]:
+        """(statement, returns_rows) for a read.
+
+        Without tracking (or with a projection) the table columns are selected and the
+        result is plain Row tuples built straight from the cursor: no ORM instances,
+        identity map entries or instrumented attributes, and attribute access still works
+        for output_schema.model_validate(from_attributes=True). `include` applies loader
+        options, which need entities, so it keeps select(model).
+        """
+        if columns or (disable_tracking and include is None):
+            names = columns or self.model.__table__.columns.keys()
+            return select(*(getattr(self.model, c) for c in names)), True
+        return select(self.model), False
+
+    @run_off_loop
+    def get_by_id(self, id: Any, include: Optional[Callable[[Any], Any]] = None,
+                        columns: Optional[Sequence[str]] = None) -> Optional[T] | RowMapping:
         base_condition = self.model.is_deleted.is_(False)
-        statement = select(self.model).where(and_(base_condition, self.model.id == id))
+        statement = self._select(columns).where(and_(base_condition, self.model.id == id))
         statement = self._apply_includes(statement, include)
         result = self.db.execute(statement)
+        if columns:
+            return result.mappings().one_or_none()
         return result.scalar_one_or_none()
 
-    async def get_all(self, include: Optional[Callable[[Any], Any]] = None, disable_tracking: bool = True) -> Sequence[
+    @run_off_loop
+    def get_all(self, include: Optional[Callable[[Any], Any]] = None, disable_tracking: bool = True) -> Sequence[
         Row[Any] | RowMapping | Any]:
         base_condition = self.model.is_deleted.is_(False)
-        statement = select(self.model).where(base_condition)
-        if disable_tracking:
-            statement = statement.execution_options(populate_existing=False)
-        statement = self._apply_includes(statement, include)
+        statement, rows = self._read_select(None, disable_tracking, include)
+        statement = self._apply_includes(statement.where(base_condition), include)
         result = self.db.execute(statement)
-        return result.scalars().all()
+        return result.all() if rows else result.scalars().all()
 
-    async def find(self, predicate: Callable[[T], Any], include: Optional[Callable[[Any], Any]] = None,
+    @run_off_loop
+    def find(self, predicate: Callable[[T], Any], include: Optional[Callable[[Any], Any]] = None,
                    disable_tracking: bool = True) -> Sequence[Row[Any] | RowMapping | Any]:
         base_condition = self.model.is_deleted.is_(False)
-        statement = select(self.model).where(and_(base_condition, predicate(self.model)))
-        if disable_tracking:
-            statement = statement.execution_options(populate_existing=False)
-        statement = self._apply_includes(statement, include)
+        statement, rows = self._read_select(None, disable_tracking, include)
+        statement = self._apply_includes(statement.where(and_(base_condition, predicate(self.model))), include)
         result = self.db.execute(statement)
-        return result.scalars().all()
+        return result.all() if rows else result.scalars().all()
 
-    async def first_or_default(self, predicate: Callable[[T], Any],
+    @run_off_loop
+    def first_or_default(self, predicate: Callable[[T], Any],
                                include: Optional[Callable[[Any], Any]] = None,
                                disable_tracking: bool = True) -> Optional[T]:
         base_condition = self.model.is_deleted.is_(False)
@@ -62,7 +128,8 @@ class BaseRepository(Generic[T], ABC):
         result = self.db.execute(statement)
         return result.scalar_one_or_none()
 
-    async def single_or_default(self, predicate: Callable[[T], Any],
+    @run_off_loop
+    def single_or_default(self, predicate: Callable[[T], Any],
                                 include: Optional[Callable[[Any], Any]] = None,
                                 disable_tracking: bool = True) -> Optional[T]:
         base_condition = self.model.is_deleted.is_(False)
@@ -73,23 +140,30 @@ class BaseRepository(Generic[T], ABC):
         result = self.db.execute(statement)
         return result.scalar_one_or_none()
 
-    async def count(self, predicate: Optional[Callable[[T], Any]] = None) -> int:
+    @run_off_loop
+    def count(self, predicate: Optional[Callable[[T], Any]] = None,
+                    created_from: Optional[datetime] = None,
+                    created_to: Optional[datetime] = None) -> int:
         base_condition = self.model.is_deleted.is_(False)
-        statement = select(func.count()).select_from(self.model).where(base_condition)
+        statement = select(func.count()).select_from(self.model).where(
+            base_condition, *self._created_window(created_from, created_to))
         if predicate:
             statement = statement.where(predicate(self.model))
         result = self.db.execute(statement)
         return result.scalar() or 0
 
-    async def any(self, predicate: Callable[[T], Any]) -> bool:
+    @run_off_loop
+    def any(self, predicate: Callable[[T], Any]) -> bool:
         base_condition = self.model.is_deleted.is_(False)
         statement = select(self.model).where(and_(base_condition, predicate(self.model))).limit(1)
         result = self.db.execute(statement)
         return result.first() is not None
 
-    async def add(self, entity: T) -> Tuple[Optional[T], Optional[str]]:
+    @run_off_loop
+    def add(self, entity: T) -> Tuple[Optional[T], Optional[str]]:
         try:
             self.db.add(entity)
+            self._update_rollups(rollups.add_deltas(entity, self.rollup_dimensions))
             self.db.commit()
             self.db.refresh(entity)
             return entity, None
@@ -98,9 +172,11 @@ class BaseRepository(Generic[T], ABC):
             error_msg = str(e.orig)
             return None, error_msg
 
-    async def add_range(self, entities: List[T]) -> tuple[list[T], None] | tuple[None, str]:
+    @run_off_loop
+    def add_range(self, entities: List[T]) -> tuple[list[T], None] | tuple[None, str]:
         try:
             self.db.add_all(entities)
+            self._update_rollups(rollups.merge(rollups.add_deltas(e, self.rollup_dimensions) for e in entities))
             self.db.commit()
             for entity in entities:
                 self.db.refresh(entity)
@@ -110,8 +186,10 @@ class BaseRepository(Generic[T], ABC):
             error_msg = str(e.orig)
             return None, error_msg
 
-    async def update(self, entity: T) -> Tuple[Optional[T], Optional[str]]:
+    @run_off_loop
+    def update(self, entity: T) -> Tuple[Optional[T], Optional[str]]:
         try:
+            self._update_rollups(rollups.update_deltas(entity, self.rollup_dimensions))
             self.db.add(entity)
             self.db.commit()
             self.db.refresh(entity)
@@ -121,8 +199,10 @@ class BaseRepository(Generic[T], ABC):
             error_msg = str(e.orig)
             return None, error_msg
 
-    async def update_range(self, entities: List[T]) -> Tuple[Optional[List[T]] , Optional[str]]:
+    @run_off_loop
+    def update_range(self, entities: List[T]) -> Tuple[Optional[List[T]] , Optional[str]]:
         try:
+            self._update_rollups(rollups.merge(rollups.update_deltas(e, self.rollup_dimensions) for e in entities))
             self.db.add_all(entities)
             self.db.commit()
             for entity in entities:
@@ -133,16 +213,20 @@ class BaseRepository(Generic[T], ABC):
             error_msg = str(e.orig)
             return None, error_msg
 
-    async def remove(self, entity: T) -> Tuple[bool, Optional[str]]:
+    @run_off_loop
+    def remove(self, entity: T) -> Tuple[bool, Optional[str]]:
         try:
+            self._update_rollups(rollups.remove_deltas(entity, self.rollup_dimensions))
             entity.is_deleted = True
             self.db.commit()
             return True, None
         except IntegrityError as e:
             return False, str(e.orig)
 
-    async def remove_range(self, entities: List[T]) -> Tuple[bool, Optional[str]]:
+    @run_off_loop
+    def remove_range(self, entities: List[T]) -> Tuple[bool, Optional[str]]:
         try:
+            self._update_rollups(rollups.merge(rollups.remove_deltas(e, self.rollup_dimensions) for e in entities))
             for entity in entities:
                 entity.is_deleted = True
                 # self.db.delete(entity)
@@ -151,14 +235,77 @@ class BaseRepository(Generic[T], ABC):
         except IntegrityError as e:
             return False, str(e.orig)
 
-    async def get_paged(self, page_number: int = 1, page_size: int = 10,
+    def _returning_update(self, id: Any, values: Dict[str, Any], expected_version: Optional[int] = None) -> Any:
+        """UPDATE ... WHERE id AND is_deleted IS false [AND version = :v] RETURNING *, bumping version."""
+        statement = update(self.model).where(self.model.id == id, self.model.is_deleted.is_(False))
+        if is_versioned(self.model):
+            version = getattr(self.model, VERSION_COLUMN)
+            if expected_version is not None:
+                statement = statement.where(version == expected_version)
+            values = {**values, VERSION_COLUMN: version + 1}
+        return (statement.values(**values)
+                .returning(*self.model.__table__.columns)
+                .execution_options(synchronize_session=False))
+
+    @run_off_loop
+    def update_returning(self, id: Any, values: Dict[str, Any],
+                               expected_version: Optional[int] = None) -> Tuple[Optional[RowMapping], Optional[str]]:
+        """Update in one round trip and commit; returns the new row.
+
+        (None, None) when no live row matches the id (and expected_version). The
+        identity map is not synchronized: use the returned row, not loaded entities.
+        """
+        try:
+            tracked = [d for d in self.rollup_dimensions if d in values and d != rollups.DELETED_DIMENSION]
+            old = None
+            if tracked:
+                # Rollups need the previous values, which RETURNING cannot give
+                old = self.db.execute(
+                    select(*(getattr(self.model, d) for d in tracked)).where(self.model.id == id).with_for_update()
+                ).mappings().one_or_none()
+            row = self.db.execute(self._returning_update(id, values, expected_version)).mappings().one_or_none()
+            if row is None:
+                self.db.rollback()
+                return None, None
+            if old is not None:
+                self._update_rollups(rollups.changed_row_deltas(old, row, tracked))
+            record_change(self.db, self.model.__name__, row["id"], "update")
+            self.db.commit()
+            return row, None
+        except IntegrityError as e:
+            self.db.rollback()
+            return None, str(e.orig)
+
+    @run_off_loop
+    def remove_returning(self, id: Any,
+                               expected_version: Optional[int] = None) -> Tuple[Optional[RowMapping], Optional[str]]:
+        """Soft delete in one round trip and commit; (None, None) when no live row matches."""
+        try:
+            statement = self._returning_update(id, {"is_deleted": True}, expected_version)
+            row = self.db.execute(statement).mappings().one_or_none()
+            if row is None:
+                self.db.rollback()
+                return None, None
+            self._update_rollups(rollups.removed_row_deltas(row, self.rollup_dimensions))
+            record_change(self.db, self.model.__name__, row["id"], "delete")
+            self.db.commit()
+            return row, None
+        except IntegrityError as e:
+            self.db.rollback()
+            return None, str(e.orig)
+
+    @run_off_loop
+    def get_paged(self, page_number: int = 1, page_size: int = 10,
                         predicate: Optional[Callable[[T], Any]] = None,
                         include: Optional[Callable[[Any], Any]] = None,
                         order_by: Optional[Callable[[T], Any]] = None,
                         ascending: bool = True,
-                        disable_tracking: bool = True) -> tuple[Sequence[Row[Any] | RowMapping | Any], int | None | Any]:
+                        disable_tracking: bool = True,
+                        created_from: Optional[datetime] = None,
+                        created_to: Optional[datetime] = None,
+                        columns: Optional[Sequence[str]] = None) -> tuple[Sequence[Row[Any] | RowMapping | Any], int | None | Any]:
         offset = (page_number - 1) * page_size
-        base_condition = self.model.is_deleted.is_(False)
+        base_condition = and_(self.model.is_deleted.is_(False), *self._created_window(created_from, created_to))
 
         # Count total
         count_stmt = select(func.count()).select_from(self.model).where(base_condition)
@@ -167,15 +314,14 @@ class BaseRepository(Generic[T], ABC):
         total_count = self.db.execute(count_stmt)
         total_count = total_count.scalar() or 0
 
-        # Paged query
-        statement = select(self.model).offset(offset).limit(page_size)
+        # Paged query (plain rows unless tracking or includes are requested: no ORM hydration)
+        statement, rows = self._read_select(columns, disable_tracking, include)
+        statement = statement.offset(offset).limit(page_size)
         if predicate:
             statement = statement.where(and_(base_condition, predicate(self.model)))
         else:
             statement = statement.where(base_condition)
 
-        if disable_tracking:
-            statement = statement.execution_options(populate_existing=False)
         statement = self._apply_includes(statement, include)
 
         if order_by:
@@ -184,13 +330,94 @@ class BaseRepository(Generic[T], ABC):
             else:
                 statement = statement.order_by(desc(order_by(self.model)))
 
-        print(statement)
-
         result = self.db.execute(statement)
-        items = result.scalars().all()
+        items = result.all() if rows else result.scalars().all()
 
         return items, total_count
 
+    @run_off_loop
+    def get_keyset_page(self, after: Optional[Any] = None, limit: int = 10,
+                              predicate: Optional[Callable[[T], Any]] = None,
+                              include: Optional[Callable[[Any], Any]] = None,
+                              ascending: bool = False) -> Sequence[Row[Any] | RowMapping | Any]:
+        """Keyset (seek) pagination on id.
+
+        With time-ordered (uuid7) ids, ordering by id is ordering by recency, so
+        ascending=False returns newest first and `after` is the last id of the
+        previous page. No OFFSET: every page is an index range scan.
+        """
+        base_condition = self.model.is_deleted.is_(False)
+        statement = select(self.model).where(base_condition)
+        if predicate:
+            statement = statement.where(predicate(self.model))
+        if after is not None:
+            statement = statement.where(self.model.id > after if ascending else self.model.id < after)
+        statement = statement.order_by(asc(self.model.id) if ascending else desc(self.model.id)).limit(limit)
+        statement = self._apply_includes(statement, include)
+        result = self.db.execute(statement)
+        return result.scalars().all()
+
+    @run_off_loop
+    def get_window_page(self, created_from: Optional[datetime] = None,
+                              created_to: Optional[datetime] = None,
+                              after: Optional[Tuple[datetime, Any]] = None, limit: int = 10,
+                              predicate: Optional[Callable[[T], Any]] = None,
+                              columns: Optional[Sequence[str]] = None) -> Sequence[Row[Any] | Any]:
+        """Keyset pagination through a date_created window, oldest first.
+
+        `after` is the (date_created, id) of the last row of the previous page.
+        Each page restarts the window at that timestamp, so it is a range scan on
+        the date_created index (btree or BRIN) with no OFFSET; id breaks ties
+        between rows created at the same instant.
+        """
+        conditions = [self.model.is_deleted.is_(False), *self._created_window(created_from, created_to)]
+        if after is not None:
+            after_date, after_id = after
+            conditions += [self.model.date_created >= after_date,
+                           tuple_(self.model.date_created, self.model.id) > tuple_(after_date, after_id)]
+        if predicate:
+            conditions.append(predicate(self.model))
+        if columns:
+            columns = list(dict.fromkeys([*columns, "date_created", "id"]))  # the cursor needs both
+        statement, rows = self._read_select(columns)
+        statement = (statement.where(*conditions)
+                     .order_by(asc(self.model.date_created), asc(self.model.id))
+                     .limit(limit))
+        result = self.db.execute(statement)
+        return result.all() if rows else result.scalars().all()
+
+    @run_off_loop
+    def stats(self, group_by: Sequence[str], bucket: str = "day",
+                    created_from: Optional[datetime] = None,
+                    created_to: Optional[datetime] = None) -> Tuple[List[dict], str]:
+        """Group-by counts computed in SQL; returns (groups, source).
+
+        Single-dimension queries on a rollup dimension are answered from StatsRollup
+        without touching the base table. Grouping by is_deleted includes deleted rows.
+        """
+        if len(group_by) == 1 and group_by[0] in self.rollup_dimensions:
+            groups = rollups.read_rollup(self.db, self.model, group_by[0], bucket, created_from, created_to)
+            if groups is not None:
+                return groups, "rollup"
+
+        labels = []
+        for dimension in group_by:
+            column = getattr(self.model, dimension)
+            if dimension == rollups.DATE_DIMENSION:
+                column = date_bucket(bucket, column)
+            labels.append(column.label(dimension))
+        statement = select(*labels, func.count().label("count")).select_from(self.model)
+        conditions = self._created_window(created_from, created_to)
+        if rollups.DELETED_DIMENSION not in group_by:
+            conditions.append(self.model.is_deleted.is_(False))
+        statement = statement.where(*conditions).group_by(*labels).order_by(*labels)
+        result = self.db.execute(statement)
+        return [dict(row) for row in result.mappings().all()], "table"
+
+    @run_off_loop
+    def rebuild_rollups(self) -> None:
+        rollups.rebuild_rollups(self.db, self.model, self.rollup_dimensions)
+
     @property
     @abstractmethod
     def model(self) -> type[T]:
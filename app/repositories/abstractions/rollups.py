@@ -0,0 +1,176 @@
+from collections import Counter
+from datetime import datetime, time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import Boolean, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.database.sql_functions import date_bucket
+from app.models.stats_rollup import StatsRollup
+
+DATE_DIMENSION = "date_created"
+DELETED_DIMENSION = "is_deleted"
+_NULL = "null"
+
+Deltas = Counter  # {(dimension, value): +/-n}
+
+
+def merge(deltas: Iterable[Deltas]) -> Deltas:
+    # Counter.update keeps negative counts; Counter addition would drop them
+    merged = Counter()
+    for d in deltas:
+        merged.update(d)
+    return merged
+
+
+def encode_value(dimension: str, value: Any) -> str:
+    if value is None:
+        return _NULL
+    if dimension == DATE_DIMENSION:
+        return value.date().isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def decode_value(model, dimension: str, value: str) -> Any:
+    if value == _NULL:
+        return None
+    if isinstance(model.__table__.columns[dimension].type, Boolean):
+        return value == "true"
+    return value
+
+
+def add_deltas(entity, dimensions: Iterable[str]) -> Deltas:
+    deltas = Counter()
+    for dimension in dimensions:
+        value = False if dimension == DELETED_DIMENSION else getattr(entity, dimension)
+        deltas[(dimension, encode_value(dimension, value))] += 1
+    return deltas
+
+
+def remove_deltas(entity, dimensions: Iterable[str]) -> Deltas:
+    deltas = Counter()
+    if entity.is_deleted:
+        return deltas
+    for dimension in dimensions:
+        if dimension == DELETED_DIMENSION:
+            deltas[(dimension, encode_value(dimension, False))] -= 1
+            deltas[(dimension, encode_value(dimension, True))] += 1
+        else:
+            deltas[(dimension, encode_value(dimension, getattr(entity, dimension)))] -= 1
+    return deltas
+
+
+def update_deltas(entity, dimensions: Iterable[str]) -> Deltas:
+    """Move counts for dimensions whose value changed since the entity was loaded."""
+    deltas = Counter()
+    state = inspect(entity)
+    if state.transient or state.pending or entity.is_deleted:
+        return deltas
+    for dimension in dimensions:
+        if dimension == DELETED_DIMENSION:
+            continue
+        history = state.attrs[dimension].history
+        if not history.has_changes() or not history.deleted:
+            continue
+        deltas[(dimension, encode_value(dimension, history.deleted[0]))] -= 1
+        deltas[(dimension, encode_value(dimension, getattr(entity, dimension)))] += 1
+    return deltas
+
+
+def removed_row_deltas(row: Mapping[str, Any], dimensions: Iterable[str]) -> Deltas:
+    """remove_deltas for a row soft-deleted by UPDATE ... RETURNING (row holds the new values)."""
+    deltas = Counter()
+    for dimension in dimensions:
+        if dimension == DELETED_DIMENSION:
+            deltas[(dimension, encode_value(dimension, False))] -= 1
+            deltas[(dimension, encode_value(dimension, True))] += 1
+        else:
+            deltas[(dimension, encode_value(dimension, row[dimension]))] -= 1
+    return deltas
+
+
+def changed_row_deltas(old: Mapping[str, Any], new: Mapping[str, Any], dimensions: Iterable[str]) -> Deltas:
+    """update_deltas for an UPDATE ... RETURNING, given the dimension values read before it."""
+    deltas = Counter()
+    for dimension in dimensions:
+        if dimension == DELETED_DIMENSION or dimension not in old or old[dimension] == new[dimension]:
+            continue
+        deltas[(dimension, encode_value(dimension, old[dimension]))] -= 1
+        deltas[(dimension, encode_value(dimension, new[dimension]))] += 1
+    return deltas
+
+
+def apply_deltas(db: Session, model_name: str, deltas: Deltas) -> None:
+    """Upsert count += delta in the caller's transaction."""
+    rows = [
+        {"model_name": model_name, "dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(StatsRollup).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["model_name", "dimension", "value"],
+        set_={"count": StatsRollup.count + statement.excluded.count},
+    )
+    db.execute(statement)
+
+
+def _is_midnight(value: Optional[datetime]) -> bool:
+    return value is None or value.time() == time(0)
+
+
+def read_rollup(db: Session, model, dimension: str, bucket: str, created_from: Optional[datetime],
+                created_to: Optional[datetime]) -> Optional[List[Dict[str, Any]]]:
+    """Answer a single-dimension stats query from the rollup table, or None if it cannot."""
+    if dimension == DATE_DIMENSION:
+        if bucket not in ("day", "month") or not (_is_midnight(created_from) and _is_midnight(created_to)):
+            return None
+    elif created_from is not None or created_to is not None:
+        return None
+
+    label = func.substr(StatsRollup.value, 1, 7) if dimension == DATE_DIMENSION and bucket == "month" \
+        else StatsRollup.value
+    statement = (
+        select(label.label("value"), func.sum(StatsRollup.count).label("count"))
+        .where(StatsRollup.model_name == model.__name__, StatsRollup.dimension == dimension)
+        .group_by(label)
+        .having(func.sum(StatsRollup.count) > 0)
+        .order_by(label)
+    )
+    if created_from is not None:
+        statement = statement.where(StatsRollup.value >= created_from.date().isoformat())
+    if created_to is not None:
+        statement = statement.where(StatsRollup.value < created_to.date().isoformat())
+    return [
+        {dimension: decode_value(model, dimension, value), "count": count}
+        for value, count in db.execute(statement).all()
+    ]
+
+
+def rebuild_rollups(db: Session, model, dimensions: Tuple[str, ...]) -> None:
+    """Recompute the rollup rows of a model from its table (initial backfill / repair)."""
+    db.query(StatsRollup).filter(StatsRollup.model_name == model.__name__).delete()
+    deltas = Counter()
+    for dimension in dimensions:
+        column = getattr(model, dimension)
+        if dimension == DATE_DIMENSION:
+            column = date_bucket("day", column)
+        statement = select(column, func.count()).group_by(column)
+        if dimension != DELETED_DIMENSION:
+            statement = statement.where(model.is_deleted.is_(False))
+        for value, count in db.execute(statement).all():
+            if dimension == DATE_DIMENSION:
+                key = value
+            elif dimension == DELETED_DIMENSION:
+                key = encode_value(dimension, bool(value))
+            else:
+                key = encode_value(dimension, value)
+            deltas[(dimension, key)] += count
+    apply_deltas(db, model.__name__, deltas)
+    db.commit()
@@ -1,11 +1,15 @@
 from typing import Optional
 
+from app.core.config import settings
+from app.models.auth.role import Role
 from app.models.user import User
 from app.repositories.abstractions.base_repository import BaseRepository
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 
 class UserRepository(BaseRepository[User]):
+    rollup_dimensions = ("date_created", "role_id", "is_deleted") if settings.USER_STATS_ROLLUPS else ()
+
     @property
     def model(self) -> type[User]:
         return User
@@ -13,3 +17,9 @@ class UserRepository(BaseRepository[User]):
     # Custom functions
     async def get_by_email(self, email: str) -> Optional[User]:
         return await self.first_or_default(lambda u: u.email == email)
+
+    async def get_by_email_with_permissions(self, email: str) -> Optional[User]:
+        return await self.first_or_default(
+            lambda u: u.email == email,
+            include=lambda q: q.options(selectinload(User.role).selectinload(Role.permissions)),
+        )
@@ -0,0 +1,183 @@
+"""Declarative, index-aware filters for listing endpoints.
+
+A paginated input schema declares which fields can be filtered and how:
+
+    class UserPaginatedInput(PaginatedInput):
+        filters: ClassVar[Dict[str, FilterField]] = {
+            "email": FilterField(EmailStr, EQ, IN, PREFIX),
+            "date_created": FilterField(datetime, RANGE),
+        }
+
+BaseRouter turns the declaration into query parameters (`email`, `email__in`,
+`email__prefix`, `date_created__gte`, `date_created__lt`) and BaseService
+compiles them into SQL predicates on the model.
+
+Before any query runs, `check_index_support` rejects with 422 any request that
+no index on the table can serve. At least one filter must constrain the
+leading column of an index. A PREFIX filter (LIKE 'abc%') only counts when
+that index uses varchar_pattern_ops/text_pattern_ops on the column: under any
+collation other than C, PostgreSQL cannot run LIKE through a plain btree. An
+unfiltered listing can only be sorted by the leading column of an index. Any
+other filter is applied to the rows the index returns, so a request never
+needs a full scan.
+"""
+import inspect
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from fastapi import HTTPException, Query
+
+EQ = "eq"
+IN = "in"
+PREFIX = "prefix"
+RANGE = "range"
+
+GTE = "gte"
+LT = "lt"
+
+MAX_IN_VALUES = 100
+
+
+class FilterField:
+    def __init__(self, type_: Any, *operators: str):
+        unknown = set(operators) - {EQ, IN, PREFIX, RANGE}
+        if unknown:
+            raise ValueError(f"Unknown filter operators: {', '.join(sorted(unknown))}")
+        self.type = type_
+        self.operators = operators
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    operator: str  # eq | in | prefix | gte | lt
+    value: Any
+
+
+def _parameters(filters: Dict[str, FilterField]):
+    """(query name, field, operator, annotation, Query default) for every declared operator."""
+    for field, spec in filters.items():
+        for operator in spec.operators:
+            if operator == EQ:
+                yield field, field, EQ, Optional[spec.type], Query(None, description=f"{field} equals")
+            elif operator == IN:
+                yield (f"{field}__in", field, IN, Optional[List[spec.type]],
+                       Query(None, description=f"{field} is one of (repeat the parameter)"))
+            elif operator == PREFIX:
+                yield (f"{field}__prefix", field, PREFIX, Optional[str],
+                       Query(None, min_length=1, description=f"{field} starts with"))
+            else:
+                yield f"{field}__gte", field, GTE, Optional[spec.type], Query(None, description=f"{field} >= value")
+                yield f"{field}__lt", field, LT, Optional[spec.type], Query(None, description=f"{field} < value")
+
+
+def filter_dependency(filters: Dict[str, FilterField]) -> Callable[..., List[Condition]]:
+    """Dependency exposing the declared filters as query parameters; returns the conditions given."""
+    parameters = list(_parameters(filters))
+
+    def _dependency(**values: Any) -> List[Condition]:
+        conditions = []
+        for name, field, operator, _, _ in parameters:
+            value = values.get(name)
+            if value is None or (operator == IN and not value):
+                continue
+            if operator == IN and len(value) > MAX_IN_VALUES:
+                raise HTTPException(
+                    status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                    detail=f"{name} accepts at most {MAX_IN_VALUES} values",
+                )
+            conditions.append(Condition(field, operator, value))
+        return conditions
+
+    _dependency.__signature__ = inspect.Signature([
+        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=default, annotation=annotation)
+        for name, _, _, annotation, default in parameters
+    ])
+    return _dependency
+
+
+def created_window(
+        created_from: Optional[datetime] = Query(None, description="date_created >= created_from"),
+        created_to: Optional[datetime] = Query(None, description="date_created < created_to"),
+) -> List[Condition]:
+    """Half-open [created_from, created_to) window on date_created, accepted by every listing."""
+    if created_from is not None and created_to is not None and created_from >= created_to:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="created_from must be earlier than created_to",
+        )
+    conditions = []
+    if created_from is not None:
+        conditions.append(Condition("date_created", GTE, created_from))
+    if created_to is not None:
+        conditions.append(Condition("date_created", LT, created_to))
+    return conditions
+
+
+def compile_conditions(model: type, conditions: List[Condition]) -> List[Any]:
+    clauses = []
+    for condition in conditions:
+        column = getattr(model, condition.field)
+        if condition.operator == EQ:
+            clauses.append(column == condition.value)
+        elif condition.operator == IN:
+            clauses.append(column.in_(condition.value))
+        elif condition.operator == PREFIX:
+            # LIKE 'abc%': served by a *_pattern_ops btree (see prefix_index_columns)
+            clauses.append(column.startswith(condition.value, autoescape=True))
+        elif condition.operator == GTE:
+            clauses.append(column >= condition.value)
+        else:
+            clauses.append(column < condition.value)
+    return clauses
+
+
+@lru_cache(maxsize=None)
+def leading_index_columns(model: type) -> FrozenSet[str]:
+    """Columns that lead some index of the model's table (primary key and unique constraints included)."""
+    table = model.__table__
+    leading = set()
+    for columns in [table.primary_key.columns, *(index.columns for index in table.indexes),
+                    *(getattr(c, "columns", None) for c in table.constraints)]:
+        if columns is not None and len(columns):
+            leading.add(list(columns)[0].name)
+    return frozenset(leading)
+
+
+@lru_cache(maxsize=None)
+def prefix_index_columns(model: type) -> FrozenSet[str]:
+    """Columns leading an index built with a pattern operator class, which serves LIKE 'abc%'."""
+    leading = set()
+    for index in model.__table__.indexes:
+        columns = list(index.columns)
+        ops = index.dialect_options["postgresql"].get("ops") or {}
+        if columns and ops.get(columns[0].name, "").endswith("_pattern_ops"):
+            leading.add(columns[0].name)
+    return frozenset(leading)
+
+
+def _index_served(model: type, condition: Condition) -> bool:
+    if condition.operator == PREFIX:
+        return condition.field in prefix_index_columns(model)
+    return condition.field in leading_index_columns(model)
+
+
+def check_index_support(model: type, conditions: List[Condition], order_field: Optional[str] = None) -> None:
+    leading = leading_index_columns(model)
+    if conditions:
+        if not any(_index_served(model, c) for c in conditions):
+            fields = sorted({c.field for c in conditions})
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=f"No index supports filtering by {', '.join(fields)} alone; "
+                       f"also filter by one of: {', '.join(sorted(leading))}",
+            )
+    elif order_field and order_field not in leading:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"No index supports sorting by {order_field} without a filter; "
+                   f"sort by one of: {', '.join(sorted(leading))} or add an indexed filter",
+        )
@@ -1,12 +1,19 @@
+from typing import ClassVar, Dict
+
 from fastapi.params import Query
 from pydantic import BaseModel, ConfigDict
 
+from app.schemas.abstractions.filters import FilterField
+
 
 class PaginatedInput(BaseModel):
     page: int = Query(1, ge=1, description='Page number')
     size: int = Query(10, ge=1, le=100, description='Size of the page')
     ascending: bool = Query(True, description='Ascending')
 
+    # Filterable fields and their operators, exposed as query parameters by BaseRouter
+    filters: ClassVar[Dict[str, FilterField]] = {}
+
     model_config = ConfigDict(extra='ignore')
 
     def get_offset_field(self) -> str:
@@ -0,0 +1,25 @@
+from copy import copy
+from functools import lru_cache
+from typing import Type
+
+from pydantic import BaseModel, create_model
+
+
+@lru_cache(maxsize=64)
+def partial_update_schema(update_schema: Type[BaseModel]) -> Type[BaseModel]:
+    """PATCH body for an update schema: every field may be omitted.
+
+    Omitted fields stay out of model_dump(exclude_unset=True). Types are kept, so an
+    explicit null is still rejected for a non-nullable field.
+    """
+    definitions = {}
+    for name, field in update_schema.model_fields.items():
+        optional = copy(field)
+        optional.default = None
+        optional.default_factory = None
+        definitions[name] = (field.annotation, optional)
+    return create_model(
+        f"{update_schema.__name__}Patch",
+        __config__=update_schema.model_config,
+        **definitions,
+    )
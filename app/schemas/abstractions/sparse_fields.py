@@ -0,0 +1,46 @@
+from functools import lru_cache
+from http import HTTPStatus
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+def parse_fields(fields: Optional[str], output_schema: Type[BaseModel], model: type) -> Optional[List[str]]:
+    """Parse `?fields=id,email` and validate it against the output schema.
+
+    Only fields that are also table columns can be projected in SQL.
+    """
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    columns = model.__table__.columns
+    invalid = [f for f in requested if f not in output_schema.model_fields or f not in columns]
+    if invalid:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(invalid)}. Allowed: {', '.join(selectable_fields(output_schema, model))}",
+        )
+    return requested
+
+
+def selectable_fields(output_schema: Type[BaseModel], model: type) -> List[str]:
+    columns = model.__table__.columns
+    return [f for f in output_schema.model_fields if f in columns]
+
+
+def partial_schema(output_schema: Type[BaseModel], fields: List[str]) -> Type[BaseModel]:
+    return _partial_schema(output_schema, tuple(fields))
+
+
+@lru_cache(maxsize=256)
+def _partial_schema(output_schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {
+        name: (output_schema.model_fields[name].annotation, output_schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{output_schema.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
@@ -0,0 +1,10 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+
+class StatsOutput(BaseModel):
+    group_by: List[str]
+    bucket: str
+    groups: List[Dict[str, Any]]
+    source: str  # "rollup" | "table"
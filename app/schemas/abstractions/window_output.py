@@ -0,0 +1,25 @@
+import base64
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+class WindowOutput(BaseModel):
+    items: List[Any]
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the next page; None on the last one
+
+
+def encode_cursor(date_created: datetime, id: Any) -> str:
+    """Opaque position (date_created, id) of the last row of a page."""
+    return base64.urlsafe_b64encode(f"{date_created.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str, id_type: Callable[[str], Any] = str) -> Tuple[datetime, Any]:
+    try:
+        date_created, _, id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(date_created), id_type(id)
+    except ValueError:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="Invalid cursor")
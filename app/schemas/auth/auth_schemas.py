@@ -0,0 +1,16 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, EmailStr
+
+
+class LoginInput(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class TokenOutput(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int  # seconds
+    permissions: List[str]
+    role: Optional[str] = None
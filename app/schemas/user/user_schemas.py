@@ -1,13 +1,18 @@
 import uuid
 from datetime import datetime
-from typing import Optional, Literal
+from typing import ClassVar, Dict, Optional, Literal
 
 from fastapi.params import Query
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
 
+from app.schemas.abstractions.filters import EQ, IN, PREFIX, RANGE, FilterField
 from app.schemas.abstractions.paginated_input import PaginatedInput
 
 
+# bcrypt only hashes the first 72 bytes and bcrypt >= 5 rejects longer input
+PASSWORD_MAX_BYTES = 72
+
+
 class UserInput(BaseModel):
     email: EmailStr
     password: str
@@ -16,6 +21,13 @@ class UserInput(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("password")
+    @classmethod
+    def password_fits_bcrypt(cls, value: str) -> str:
+        if len(value.encode()) > PASSWORD_MAX_BYTES:
+            raise ValueError(f"Password must be at most {PASSWORD_MAX_BYTES} bytes")
+        return value
+
 
 class UserUpdateInput(BaseModel):
     name: str
@@ -31,6 +43,7 @@ class UserOutput(BaseModel):
     last_name: str
     date_created: datetime
     date_updated: Optional[datetime] = None
+    version: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -42,17 +55,22 @@ class UserCreated(BaseModel):
     last_name: str
     date_created: datetime
     date_updated: Optional[datetime] = None
+    version: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class UserPaginatedInput(PaginatedInput):
-    email: Optional[EmailStr] = Query(None, description="Filter by email")
-    name: Optional[str] = Query(None, description="Filter by name")
-    last_name: Optional[str] = Query(None, description="Filter by last name")
-    date_created: Optional[datetime] = Query(None, description="Filter by date_created")
-
-    offset_field: Literal["id", "email", "date_created", "name", "last_name"] = Query(
+    filters: ClassVar[Dict[str, FilterField]] = {
+        "email": FilterField(EmailStr, EQ, IN, PREFIX),
+        "name": FilterField(str, EQ, PREFIX),
+        "last_name": FilterField(str, EQ, IN, PREFIX),
+        "date_created": FilterField(datetime, RANGE),
+        "role_id": FilterField(uuid.UUID, EQ, IN),
+    }
+
+    # Only fields that lead an index (name only follows last_name in ix_user_last_name_name)
+    offset_field: Literal["id", "email", "date_created", "last_name"] = Query(
         "id",
         description="Offset Field of the page (Ordering by Field)",
     )
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from http import HTTPStatus
 from typing import Any, Generic, TypeVar, List, Optional, Callable, Tuple, Sequence, Type
 from app.database.session import get_db
@@ -8,6 +9,10 @@ from sqlalchemy import and_
 from sqlmodel import SQLModel
 
 from app.repositories.abstractions.base_repository import BaseRepository
+from app.schemas.abstractions.filters import Condition, check_index_support, compile_conditions
+from app.schemas.abstractions.sparse_fields import partial_schema
+from app.schemas.abstractions.stats_output import StatsOutput
+from app.schemas.abstractions.window_output import WindowOutput, decode_cursor, encode_cursor
 
 T = TypeVar("T", bound=SQLModel)
 TInput = TypeVar("TInput")
@@ -50,20 +55,40 @@ class BaseService(Generic[T, TInput, TUpdate, TOutput, TPaginatedInput], ABC):
         """Return created output model -output schema- (ex: UserCreated)."""
         return None
 
-    async def get_by_id(self, entity_id: Any):
-        entity = await self.repository.get_by_id(entity_id)
+    def _output_schema_for(self, fields: Optional[List[str]] = None) -> type:
+        return partial_schema(self.output_schema, fields) if fields else self.output_schema
+
+    async def get_by_id(self, entity_id: Any, fields: Optional[List[str]] = None):
+        entity = await self.repository.get_by_id(entity_id, columns=fields)
         if not entity:
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"{self.model.__name__} not found")
 
-        return self.output_schema.model_validate(entity, from_attributes=True, extra="ignore")
+        return self._output_schema_for(fields).model_validate(entity, from_attributes=True, extra="ignore")
 
     async def get_paged(
             self,
             params: TPaginatedInput,
             predicate_fn: Optional[Callable[[Any], Any]] = None,
             order_by_fn: Optional[Callable[[Any], Any]] = None,
+            fields: Optional[List[str]] = None,
+            filters: Optional[List[Condition]] = None,
     ) -> Tuple[List[TOutput], int]:
-        """ Return paginated output with personalized query params """
+        """ Return paginated output with personalized query params
+
+        `filters` (from the schema's filter declaration) are rejected with 422 when no index serves them.
+        """
+        order_field = getattr(params, "offset_field", None)
+        if filters is not None:
+            check_index_support(self.model, filters, None if order_by_fn else order_field)
+            clauses = compile_conditions(self.model, filters)
+            if clauses:
+                custom_predicate = predicate_fn
+
+                def predicate_fn(model):
+                    return and_(*clauses, custom_predicate(model)) if custom_predicate else and_(*clauses)
+        if order_by_fn is None and order_field:
+            def order_by_fn(model):
+                return getattr(model, order_field)
         predicate = predicate_fn or (lambda m: True)
         entities, total = await self.repository.get_paged(
             page_number=params.page,
@@ -71,14 +96,76 @@ class BaseService(Generic[T, TInput, TUpdate, TOutput, TPaginatedInput], ABC):
             predicate=predicate,
             order_by=order_by_fn,
             ascending=params.ascending if hasattr(params, "ascending") else True,
+            columns=fields,
         )
 
+        output_schema = self._output_schema_for(fields)
         outputs = [
-            self.output_schema.model_validate(e, from_attributes=True, extra="ignore")
+            output_schema.model_validate(e, from_attributes=True, extra="ignore")
             for e in entities
         ]
         return outputs, total
 
+    async def get_keyset(
+            self,
+            after: Optional[Any] = None,
+            size: int = 10,
+            ascending: bool = False,
+            predicate_fn: Optional[Callable[[Any], Any]] = None,
+    ) -> Tuple[List[TOutput], Optional[Any]]:
+        """ Return a page ordered by id plus the cursor for the next page """
+        entities = await self.repository.get_keyset_page(
+            after=after,
+            limit=size,
+            predicate=predicate_fn,
+            ascending=ascending,
+        )
+        outputs = [
+            self.output_schema.model_validate(e, from_attributes=True, extra="ignore")
+            for e in entities
+        ]
+        next_cursor = entities[-1].id if len(entities) == size else None
+        return outputs, next_cursor
+
+    async def count(self, filters: Optional[List[Condition]] = None) -> int:
+        filters = filters or []
+        check_index_support(self.model, filters)
+        clauses = compile_conditions(self.model, filters)
+        return await self.repository.count((lambda m: and_(*clauses)) if clauses else None)
+
+    async def get_window(
+            self,
+            size: int = 10,
+            cursor: Optional[str] = None,
+            filters: Optional[List[Condition]] = None,
+            fields: Optional[List[str]] = None,
+            id_type: Callable[[str], Any] = str,
+    ) -> WindowOutput:
+        """ Walk rows oldest first by date_created with an opaque cursor (no OFFSET) """
+        filters = filters or []
+        check_index_support(self.model, filters, "date_created")
+        clauses = compile_conditions(self.model, filters)
+        rows = await self.repository.get_window_page(
+            after=decode_cursor(cursor, id_type) if cursor else None,
+            limit=size,
+            predicate=(lambda m: and_(*clauses)) if clauses else None,
+            columns=fields,
+        )
+        output_schema = self._output_schema_for(fields)
+        items = [output_schema.model_validate(r, from_attributes=True, extra="ignore") for r in rows]
+        next_cursor = encode_cursor(rows[-1].date_created, rows[-1].id) if len(rows) == size else None
+        return WindowOutput(items=items, next_cursor=next_cursor)
+
+    async def get_stats(
+            self,
+            group_by: List[str],
+            bucket: str = "day",
+            created_from: Optional[datetime] = None,
+            created_to: Optional[datetime] = None,
+    ) -> StatsOutput:
+        groups, source = await self.repository.stats(group_by, bucket, created_from, created_to)
+        return StatsOutput(group_by=group_by, bucket=bucket, groups=groups, source=source)
+
     async def create(self, entity_input: TInput, conflict_predicate: Optional[Callable[[T], Any]] = None):
         if conflict_predicate:
             existing = await self.repository.first_or_default(conflict_predicate)
@@ -114,12 +201,55 @@ class BaseService(Generic[T, TInput, TUpdate, TOutput, TPaginatedInput], ABC):
 
         return self.output_schema.model_validate(result, from_attributes=True, extra="ignore")
 
-    async def delete(self, entity_id: Any):
-        entity = await self.repository.first_or_default(lambda m: m.id == entity_id)
-        if not entity:
+    async def update_item(self, entity_id: Any, update_data: TUpdate, expected_version: Optional[int] = None):
+        """Update the payload's fields in a single UPDATE ... RETURNING (412 on a stale expected_version)."""
+        values = update_data.model_dump()
+        values["date_updated"] = datetime.now(timezone.utc)
+        result, error = await self.repository.update_returning(entity_id, values, expected_version)
+        if error:
+            raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=error)
+        if result is None:
+            await self._raise_missing_or_stale(entity_id, expected_version)
+        return self.output_schema.model_validate(result, from_attributes=True, extra="ignore")
+
+    async def patch_item(self, entity_id: Any, patch_data: Any, expected_version: Optional[int] = None):
+        """Write only the columns the patch actually changes; a no-op patch writes nothing."""
+        current = await self.repository.get_by_id(entity_id)
+        if current is None:
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"{self.model.__name__} not found")
+        if expected_version is not None and getattr(current, "version", expected_version) != expected_version:
+            raise HTTPException(
+                status_code=HTTPStatus.PRECONDITION_FAILED,
+                detail=f"{self.model.__name__} was modified by another request",
+            )
+        changes = {
+            name: value for name, value in patch_data.model_dump(exclude_unset=True).items()
+            if getattr(current, name) != value
+        }
+        if not changes:
+            return self.output_schema.model_validate(current, from_attributes=True, extra="ignore")
+
+        changes["date_updated"] = datetime.now(timezone.utc)
+        result, error = await self.repository.update_returning(entity_id, changes, expected_version)
+        if error:
+            raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=error)
+        if result is None:
+            await self._raise_missing_or_stale(entity_id, expected_version)
+        return self.output_schema.model_validate(result, from_attributes=True, extra="ignore")
 
-        success, error = await self.repository.remove(entity)
-        if not success:
+    async def delete(self, entity_id: Any, expected_version: Optional[int] = None):
+        result, error = await self.repository.remove_returning(entity_id, expected_version)
+        if error:
             raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=error)
+        if result is None:
+            await self._raise_missing_or_stale(entity_id, expected_version)
         return True
+
+    async def _raise_missing_or_stale(self, entity_id: Any, expected_version: Optional[int]):
+        # Only on the failure path: tell a stale version apart from a missing row
+        if expected_version is not None and await self.repository.any(lambda m: m.id == entity_id):
+            raise HTTPException(
+                status_code=HTTPStatus.PRECONDITION_FAILED,
+                detail=f"{self.model.__name__} was modified by another request",
+            )
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"{self.model.__name__} not found")
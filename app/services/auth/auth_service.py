@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.repositories.user_repository import UserRepository
+from app.schemas.auth.auth_schemas import LoginInput, TokenOutput
+from app.services.auth.hashing_password_service import verify_password, verify_unknown_user_password
+
+
+class AuthService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = UserRepository(db)
+
+    async def login(self, credentials: LoginInput) -> TokenOutput:
+        # Role and permissions are loaded once here and embedded in the token
+        user = await self.repository.get_by_email_with_permissions(credentials.email)
+        # bcrypt runs off the event loop; unknown emails pay the same hash cost
+        if user:
+            valid = await run_in_threadpool(verify_password, credentials.password, user.password)
+        else:
+            valid = await run_in_threadpool(verify_unknown_user_password, credentials.password)
+        if not valid:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED,
+                detail="Invalid email or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        permissions = sorted(user.permissions)
+        role = user.role.name if user.role else None
+        return TokenOutput(
+            access_token=create_access_token(str(user.id), permissions, role=role),
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            permissions=permissions,
+            role=role,
+        )
@@ -1,11 +1,29 @@
-from passlib.context import CryptContext
+from functools import lru_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
+
+from app.core.config import settings
+
+# bcrypt is used directly: passlib 1.7's bcrypt backend breaks with bcrypt >= 4.1
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:  # not a bcrypt hash
+        return False
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(settings.PASSWORD_BCRYPT_ROUNDS)).decode()
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash():
+    return get_password_hash("not-a-user-password")
+
+
+def verify_unknown_user_password(plain_password):
+    """Costs as much as verify_password, so login timing does not reveal which emails exist."""
+    verify_password(plain_password, _dummy_hash())
+    return False
@@ -1,14 +1,14 @@
-from datetime import datetime, timezone
-import uuid
-from typing import Optional
 
-from sqlalchemy import and_
+from starlette.concurrency import run_in_threadpool
+
+from app.database.existence_filter import user_email_filter
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.schemas.user.user_schemas import (
     UserInput, UserCreated, UserOutput, UserUpdateInput, UserPaginatedInput
 )
 from app.services.abstractions.base_service import BaseService
+from app.services.auth.hashing_password_service import get_password_hash
 
 
 class UserService(BaseService[User, UserInput, UserUpdateInput, UserOutput, UserPaginatedInput]):
@@ -29,41 +29,23 @@ class UserService(BaseService[User, UserInput, UserUpdateInput, UserOutput, User
     def created_schema(self):
         return UserCreated
 
-    async def get_users_paged(self, params: UserPaginatedInput):
-        def predicate(model):
-            conditions = []
-            if params.email:
-                conditions.append(model.email.ilike(f"%{params.email}%"))
-            if params.name:
-                conditions.append(model.name.ilike(f"%{params.name}%"))
-            if params.last_name:
-                conditions.append(model.last_name.ilike(f"%{params.last_name}%"))
-            return and_(*conditions) if conditions else True
-
-        def order_by(model):
-            return getattr(model, params.get_offset_field() or "date_created")
-
-        users, total = await self.get_paged(params, predicate_fn=predicate, order_by_fn=order_by)
-
-        return [
-            UserOutput.model_validate(u, from_attributes=True, extra='ignore')
-            for u in users
-        ], total
+    async def create(self, entity_input: UserInput, conflict_predicate=None):
+        password = await run_in_threadpool(get_password_hash, entity_input.password)
+        hashed = entity_input.model_copy(update={"password": password})
+        # Before the insert: from its commit on, the email must never be reported absent
+        user_email_filter.add(entity_input.email)
+        return await super().create(hashed, conflict_predicate)
 
     async def create_user(self, user_input: UserInput):
+        if not user_email_filter.might_contain(user_input.email):
+            return await self.create(user_input)  # never stored: the unique constraint still guards races
         return await self.create(user_input, conflict_predicate=lambda u: u.email == user_input.email)
 
-    async def update_item(self, user_id: uuid.UUID, user_input: UserUpdateInput):
-        def updater(entity: User, data: UserUpdateInput):
-            entity.name = data.name
-            entity.last_name = data.last_name
-            entity.date_updated = datetime.now(timezone.utc)
-
-        return await self.update(user_id, user_input, updater)
-
     # Custom methods
 
     async def get_user_by_email(self, email: str):
+        if not user_email_filter.might_contain(email):
+            return None
         user = await self.repository.get_by_email(email)
         if not user:
             return None
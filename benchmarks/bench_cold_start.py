@@ -0,0 +1,83 @@
+"""Cold start profile: import, lifespan and time-to-first-byte of a fresh process.
+
+    python -m benchmarks.bench_cold_start --runs 5 --budget-ms 1500
+    OPENAPI_SCHEMA_PATH=openapi.json LAZY_ROUTER_PREFIXES='["/users"]' python -m benchmarks.bench_cold_start
+
+Each run is a new interpreter, as on a freshly scheduled pod. Exits non-zero when
+the median time-to-first-byte exceeds --budget-ms. For a per-module import
+breakdown use `python -X importtime -c "import app.main"`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = r'''
+import json, time
+t0 = time.perf_counter()
+from app.main import app
+t_import = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from app.database.session import get_db
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+Session = sessionmaker(bind=engine)
+
+def override_get_db():
+    db = Session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+t_setup = time.perf_counter()
+with TestClient(app) as client:
+    t_lifespan = time.perf_counter()
+    SQLModel.metadata.create_all(engine)
+    t_db = time.perf_counter()
+    client.get("/users/?page=1&size=10")
+    t_first = time.perf_counter()
+    client.get("/openapi.json")
+    t_openapi = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "lifespan_ms": (t_lifespan - t_setup) * 1000,
+    "first_request_ms": (t_first - t_db) * 1000,
+    "openapi_ms": (t_openapi - t_first) * 1000,
+    "ttfb_ms": (t_first - t0 - (t_db - t_lifespan) - (t_setup - t_import)) * 1000,
+}))
+'''
+
+
+def run_once() -> dict:
+    output = subprocess.run([sys.executable, "-c", _CHILD], capture_output=True, text=True, check=True,
+                            env=os.environ.copy()).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if median TTFB exceeds this")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    for key in runs[0]:
+        values = [r[key] for r in runs]
+        print(f"{key:<20}median {statistics.median(values):>8.1f} ms   max {max(values):>8.1f} ms")
+
+    ttfb = statistics.median(r["ttfb_ms"] for r in runs)
+    if args.budget_ms is not None and ttfb > args.budget_ms:
+        print(f"TTFB {ttfb:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Tracked (ORM entities) vs untracked (plain rows) reads on large pages.
+
+    python -m benchmarks.bench_no_tracking --rows 20000 --sizes 100 1000 10000
+
+Each run reads one page through UserRepository.get_paged and validates it into
+UserOutput, like BaseService.get_paged does, in a fresh session. Reports the mean
+time per page and the peak memory allocated (tracemalloc) while the page and its
+session are alive.
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.schemas.user.user_schemas import UserOutput
+
+
+def _read_page(Session, size: int, disable_tracking: bool) -> int:
+    with Session() as db:
+        items, _ = asyncio.run(UserRepository(db).get_paged(page_size=size, disable_tracking=disable_tracking))
+        outputs = [UserOutput.model_validate(i, from_attributes=True) for i in items]
+        return len(outputs)
+
+
+def _measure(Session, size: int, disable_tracking: bool, repeat: int):
+    _read_page(Session, size, disable_tracking)  # warm-up
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        _read_page(Session, size, disable_tracking)
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+
+    gc.collect()
+    tracemalloc.start()
+    _read_page(Session, size, disable_tracking)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add_all([User(email=f"bench{i}@example.com", password="x", name=f"N{i}", last_name="L")
+                    for i in range(args.rows)])
+        db.commit()
+
+    print(f"{'page size':>10}{'mode':>12}{'ms/page':>12}{'peak KiB':>12}")
+    for size in args.sizes:
+        for label, disable_tracking in (("tracked", False), ("untracked", True)):
+            elapsed_ms, peak_kib = _measure(Session, size, disable_tracking, args.repeat)
+            print(f"{size:>10}{label:>12}{elapsed_ms:>12.2f}{peak_kib:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-worker RSS and startup time: pre-fork launcher with and without preload.
+
+    python -m benchmarks.bench_prefork --workers 4 --requests 200
+
+Starts `python -m app.core.prefork` twice (preloaded + gc.freeze, then
+--no-preload), waits for every worker to report ready, sends some traffic to
+"/" and "/openapi.json", and reads /proc/<pid>/smaps_rollup of each worker.
+Pss (proportional set size) is the number to compare: pages still shared
+copy-on-write with the master are split between the processes sharing them.
+Linux only.
+"""
+import argparse
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+_READY = re.compile(r"Worker (\d+) ready in ([\d.]+) ms")
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Dirty")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in _FIELDS:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def run(workers: int, requests: int, preload: bool, timeout: float) -> dict:
+    port = free_port()
+    command = [sys.executable, "-m", "app.core.prefork", "--port", str(port), "--workers", str(workers),
+               "--no-access-log"]
+    if not preload:
+        command.append("--no-preload")
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True, env=env)
+    ready = {}
+    try:
+        deadline = time.monotonic() + timeout
+        while len(ready) < workers:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"only {len(ready)}/{workers} workers became ready")
+            line = process.stderr.readline()
+            if not line:
+                raise RuntimeError(f"launcher exited with {process.wait()}")
+            match = _READY.search(line)
+            if match:
+                ready[int(match.group(1))] = float(match.group(2))
+        all_ready_ms = (time.perf_counter() - started) * 1000
+        # Keep draining the log so the launcher never blocks on a full pipe
+        threading.Thread(target=process.stderr.read, daemon=True).start()
+
+        for i in range(requests):
+            path = "/openapi.json" if i % 2 else "/"
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{path}").read()
+        memory = {pid: memory_kb(pid) for pid in ready}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout)
+
+    return {
+        "workers": len(ready),
+        "all_ready_ms": all_ready_ms,
+        "worker_startup_ms": statistics.median(ready.values()),
+        **{f"{field.lower()}_kb": statistics.median(m.get(field, 0) for m in memory.values()) for field in _FIELDS},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    results = {
+        "preload+freeze": run(args.workers, args.requests, True, args.timeout),
+        "no-preload": run(args.workers, args.requests, False, args.timeout),
+    }
+    columns = list(next(iter(results.values())))
+    print(f"{'mode':<16}" + "".join(f"{c:>20}" for c in columns))
+    for mode, result in results.items():
+        print(f"{mode:<16}" + "".join(f"{result[c]:>20.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Insert throughput and PK index size: uuid4 vs uuid7 primary keys.
+
+    python -m benchmarks.bench_uuid_keys --url postgresql+psycopg2://... --rows 1000000
+
+Index size is only reported on PostgreSQL (pg_relation_size); on SQLite only
+throughput is measured.
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Uuid, create_engine, text
+
+from app.models.abstractions.id_generators import get_id_generator
+
+
+def _table(metadata: MetaData, name: str) -> Table:
+    return Table(
+        name, metadata,
+        Column("id", Uuid(), primary_key=True),
+        Column("date_created", DateTime(), nullable=False),
+        Column("payload", String(64), nullable=False),
+    )
+
+
+def run(url: str, rows: int, batch: int) -> None:
+    engine = create_engine(url)
+    metadata = MetaData()
+    tables = {name: _table(metadata, f"bench_pk_{name}") for name in ("uuid4", "uuid7")}
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    print(f"{'generator':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'pk index':>14}{'table':>14}")
+    for name, table in tables.items():
+        generate = get_id_generator(name)
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            for offset in range(0, rows, batch):
+                now = datetime.now(timezone.utc)
+                connection.execute(table.insert(), [
+                    {"id": generate(), "date_created": now, "payload": "x" * 32}
+                    for _ in range(min(batch, rows - offset))
+                ])
+        elapsed = time.perf_counter() - started
+
+        index_size = table_size = "-"
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as connection:
+                index_size, table_size = connection.execute(text(
+                    "SELECT pg_size_pretty(pg_relation_size(:index)), pg_size_pretty(pg_relation_size(:table))"
+                ), {"index": f"{table.name}_pkey", "table": table.name}).one()
+        print(f"{name:<10}{rows:>10}{elapsed:>10.2f}{rows / elapsed:>12.0f}{index_size:>14}{table_size:>14}")
+
+    metadata.drop_all(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=None, help="Database URL (defaults to settings.full_database_url)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        from app.core.config import settings
+        url = settings.full_database_url
+    run(url, args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""JSON vs msgpack vs Arrow IPC for listing pages: payload size, encode and decode time.
+
+    python -m benchmarks.bench_wire_formats --sizes 100 1000 10000
+
+Encodes a PaginatedOutput of UserOutput items the way BaseRouter does for each
+media type (app.core.wire_formats), then decodes it the way a Python client
+would (Arrow: into a columnar Table, not Python dicts). Formats whose optional
+package is missing are skipped.
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core import wire_formats
+from app.core.wire_formats import encode_arrow, encode_msgpack
+from app.schemas.abstractions.paginated_output import PaginatedOutput
+from app.schemas.user.user_schemas import UserOutput
+
+
+def _page(size: int) -> PaginatedOutput:
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = [
+        UserOutput(id=uuid.uuid4(), email=f"user{i}@example.com", name=f"Name{i}", last_name=f"Last{i}",
+                   date_created=started + timedelta(seconds=i), version=1)
+        for i in range(size)
+    ]
+    return PaginatedOutput(items=items, total=size * 10)
+
+
+def _formats():
+    formats = {"json": (lambda page: page.model_dump_json().encode(), json.loads)}
+    if wire_formats.msgpack is not None:
+        formats["msgpack"] = (encode_msgpack, wire_formats.msgpack.unpackb)
+    if wire_formats.pyarrow is not None:
+        ipc = wire_formats.pyarrow.ipc
+        formats["arrow"] = (lambda page: encode_arrow(page.items),
+                            lambda body: ipc.open_stream(body).read_all())  # columnar consumer
+    return formats
+
+
+def _time(fn, arg, repeat: int) -> float:
+    fn(arg)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page size':>10}{'format':>10}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}")
+    for size in args.sizes:
+        page = _page(size)
+        for name, (encode, decode) in _formats().items():
+            body = encode(page)
+            print(f"{size:>10}{name:>10}{len(body):>12}{_time(encode, page, args.repeat):>12.2f}"
+                  f"{_time(decode, body, args.repeat):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import os
+
+# Cheap bcrypt in tests; must be set before Settings is instantiated
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
 import pytest
 from typing import Generator
 from unittest.mock import MagicMock
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers.abstractions.base_router import BaseRouter
+from app.api.routers.user_router import user_service_factory
+from app.core.admission import READ, WRITE, AdmissionController, ConcurrencyLimiter, PriorityPolicy, Shed
+from app.database.session import get_db
+from app.schemas.user.user_schemas import UserInput, UserOutput, UserPaginatedInput, UserUpdateInput
+from tests.conftest import override_get_db
+
+READ_POLICY = PriorityPolicy(max_queue=1, max_wait=0.5)
+WRITE_POLICY = PriorityPolicy(max_queue=3, max_wait=0.5)
+
+
+def test_reads_are_shed_before_writes():
+    async def scenario():
+        limiter = ConcurrencyLimiter("db", 1)
+        deadline = time.monotonic() + 0.5
+        await limiter.acquire(WRITE, WRITE_POLICY, deadline)  # holds the only slot
+
+        queued_read = asyncio.create_task(limiter.acquire(READ, READ_POLICY, deadline))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed):
+            await limiter.acquire(READ, READ_POLICY, deadline)  # read queue (1) is full
+        queued_write = asyncio.create_task(limiter.acquire(WRITE, WRITE_POLICY, deadline))
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await queued_write  # writes are woken first
+        assert not queued_read.done()
+        limiter.release()
+        await queued_read
+        limiter.release()
+        assert limiter.active == 0 and limiter.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_wait_deadline_sheds():
+    async def scenario():
+        limiter = ConcurrencyLimiter("db", 1)
+        await limiter.acquire(READ, READ_POLICY, time.monotonic() + 1)
+        with pytest.raises(Shed):
+            await limiter.acquire(READ, READ_POLICY, time.monotonic() + 0.01)
+        assert limiter.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_base_router_returns_503_with_retry_after():
+    controller = AdmissionController(
+        db_concurrency=0,
+        policies={READ: PriorityPolicy(10, 0.01), WRITE: PriorityPolicy(10, 0.01)},
+        retry_after=3,
+    )
+    users = BaseRouter(
+        service_factory=user_service_factory,
+        input_schema=UserInput,
+        update_schema=UserUpdateInput,
+        output_schema=UserOutput,
+        paginated_input_schema=UserPaginatedInput,
+        prefix="/shed-users",
+        resource_name="user",
+        admission=controller,
+    )
+    app = FastAPI()
+    app.include_router(users.router)
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        r = c.get("/shed-users/?page=1&size=10")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "3"
+    assert controller.shed_total == {"/shed-users:get_paged:read": 1}
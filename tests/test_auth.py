@@ -0,0 +1,163 @@
+import asyncio
+import base64
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api.routers.abstractions.base_router import BaseRouter
+from app.api.routers.user_router import user_service_factory
+from app.core.config import settings
+from app.core.security import (
+    InvalidToken, create_access_token, decode_token, verified_tokens, verify_access_token,
+)
+from app.database.session import get_db
+from app.models.auth.permission import Permission
+from app.models.auth.role import Role
+from app.models.auth.role_permission import RolePermission
+from app.models.user import User
+from app.schemas.user.user_schemas import UserInput, UserOutput, UserPaginatedInput, UserUpdateInput
+from app.services.auth import auth_service, hashing_password_service
+from tests.conftest import engine, override_get_db
+
+
+@pytest.fixture
+def reader(client, db):
+    suffix = uuid.uuid4().hex[:8]
+    r = client.post("/users/", json={"email": f"reader-{suffix}@example.com", "password": "Secret123!",
+                                     "name": "Read", "last_name": "Er"})
+    user = db.get(User, uuid.UUID(r.json()["id"]))
+    permission = Permission(name=f"users:read:{suffix}")
+    role = Role(name=f"reader-{suffix}")
+    db.add_all([permission, role])
+    db.flush()
+    link = RolePermission(role_id=role.id, permission_id=permission.id)
+    user.role_id = role.id
+    db.add(link)
+    db.commit()
+    yield user, permission.name
+    db.delete(link)
+    db.commit()
+    db.delete(user)
+    db.delete(role)
+    db.delete(permission)
+    db.commit()
+
+
+def test_password_is_stored_hashed(reader):
+    user, _ = reader
+    assert user.password.startswith("$2")
+
+
+def test_login_embeds_permissions(client, reader):
+    user, permission = reader
+    r = client.post("/auth/login", json={"email": user.email, "password": "Secret123!"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["permissions"] == [permission]
+    assert body["role"] == user.role.name
+
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.json() == {"id": str(user.id), "role": user.role.name, "permissions": [permission]}
+
+    assert client.post("/auth/login", json={"email": user.email, "password": "wrong"}).status_code == 401
+
+
+def test_require_permission_authorizes_without_db(reader):
+    user, permission = reader
+    users = BaseRouter(
+        service_factory=user_service_factory,
+        input_schema=UserInput,
+        update_schema=UserUpdateInput,
+        output_schema=UserOutput,
+        paginated_input_schema=UserPaginatedInput,
+        prefix="/secure-users",
+        resource_name="user",
+        route_permissions={"get_paged": [permission]},
+    )
+    app = FastAPI()
+    app.include_router(users.router)
+    app.dependency_overrides[get_db] = override_get_db
+
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    allowed = create_access_token(str(user.id), [permission])
+    denied = create_access_token(str(user.id), ["something:else"])
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with TestClient(app) as c:
+            assert c.get("/secure-users/?page=1&size=10").status_code == 401
+            assert c.get("/secure-users/?page=1&size=10",
+                         headers={"Authorization": f"Bearer {denied}"}).status_code == 403
+            assert statements == []
+            r = c.get("/secure-users/?page=1&size=10", headers={"Authorization": f"Bearer {allowed}"})
+            assert r.status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def test_verified_tokens_are_cached_and_expire():
+    token = create_access_token("subject", ["a"])
+    verify_access_token(token)
+    hits = verified_tokens.hits
+    assert verify_access_token(token)["permissions"] == ["a"]
+    assert verified_tokens.hits == hits + 1
+
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+    with pytest.raises(InvalidToken):
+        verify_access_token(tampered)
+    assert verified_tokens.get(tampered) is None
+
+    expired = create_access_token("subject", [], expires_delta=timedelta(seconds=-1))
+    with pytest.raises(InvalidToken):
+        verify_access_token(expired)
+    assert decode_token(expired, settings.SECRET_KEY, settings.ALGORITHM)["exp"] < time.time()
+
+
+@pytest.mark.parametrize("header", [b"[]", b'"x"', b"1", b"null"])
+def test_token_with_non_object_header_is_invalid(client, header):
+    _, payload, signature = create_access_token("subject", ["a"]).split(".")
+    forged = ".".join([base64.urlsafe_b64encode(header).decode().rstrip("="), payload, signature])
+    with pytest.raises(InvalidToken):
+        decode_token(forged, settings.SECRET_KEY, settings.ALGORITHM)
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+
+
+def test_password_hashing_runs_off_the_event_loop(client, reader, monkeypatch):
+    calls = []
+
+    def off_loop(fn):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                calls.append((fn.__name__, "loop"))
+            except RuntimeError:
+                calls.append((fn.__name__, "thread"))
+            return fn(*args)
+        return wrapper
+
+    monkeypatch.setattr(auth_service, "verify_password", off_loop(hashing_password_service.verify_password))
+    monkeypatch.setattr(auth_service, "verify_unknown_user_password",
+                        off_loop(hashing_password_service.verify_unknown_user_password))
+    user, _ = reader
+    assert client.post("/auth/login", json={"email": user.email, "password": "Secret123!"}).status_code == 200
+    r = client.post("/auth/login", json={"email": "nobody-here@example.com", "password": "Secret123!"})
+    assert r.status_code == 401
+    assert calls == [("verify_password", "thread"), ("verify_unknown_user_password", "thread")]
+
+
+def test_password_longer_than_bcrypt_limit_is_rejected(client):
+    payload = {"email": "long-password@example.com", "name": "Long", "last_name": "Pass"}
+    r = client.post("/users/", json={**payload, "password": "x" * 100})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"] == ["body", "password"]
+    # 72 bytes counted in UTF-8, not characters
+    assert client.post("/users/", json={**payload, "password": "ñ" * 37}).status_code == 422
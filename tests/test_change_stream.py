@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+
+import pytest
+from sqlalchemy import delete
+
+from app.database.change_stream import ChangeStream, change_stream
+from app.database.invalidation import ChangeEvent
+from app.models.user import User
+
+
+def _events(body):
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "id" in fields:
+            events.append(fields)
+    return events
+
+
+@pytest.fixture
+def short_streams(monkeypatch):
+    monkeypatch.setattr(change_stream, "max_seconds", 0.2)
+    monkeypatch.setattr(change_stream, "keepalive", 0.05)
+
+
+@pytest.fixture
+def stream_users(db):
+    yield
+    db.execute(delete(User).where(User.email.like("stream%@example.com")))
+    db.commit()
+
+
+def test_changes_replay_after_last_event_id(client, short_streams, stream_users):
+    start = change_stream.last_event_id()
+    ids = []
+    for i in range(3):
+        r = client.post("/users/", json={"email": f"stream{i}@example.com", "password": "secret",
+                                         "name": "S", "last_name": f"L{i}"})
+        assert r.status_code == 201
+        ids.append(r.json()["id"])
+
+    r = client.get("/users/changes", headers={"Last-Event-ID": start})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text.startswith("retry: ")
+    events = _events(r.text)
+    assert [json.loads(e["data"]) for e in events] == [{"model": "User", "id": id, "op": "insert"} for id in ids]
+    assert all(e["id"].startswith(change_stream.epoch + "-") for e in events)
+
+    # Resuming from the last one: nothing left to replay
+    r = client.get(f"/users/changes?since={events[-1]['id']}")
+    assert _events(r.text) == []
+
+
+def test_unknown_event_id_starts_with_reset(client, short_streams):
+    r = client.get("/users/changes", headers={"Last-Event-ID": "otherworker-12"})
+    events = _events(r.text)
+    assert events[0]["event"] == "reset"
+    assert events[0]["id"] == change_stream.last_event_id()
+
+
+def test_live_delivery_filters_by_model():
+    async def scenario():
+        stream = ChangeStream(buffer_size=10, client_queue=10, keepalive=0.05, max_seconds=0.3)
+        client = stream.subscribe("User")
+        stream.on_events([ChangeEvent("Other", "1", "insert"), ChangeEvent("User", "2", "update")])
+        chunks = [chunk async for chunk in stream.stream(client)]
+        assert not stream._clients
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0] == "retry: 1000\n\n"
+    events = _events("".join(chunks))
+    assert [json.loads(e["data"])["id"] for e in events] == ["2"]
+    assert events[0]["id"].endswith("-2")
+    assert ": keepalive\n\n" in chunks
+
+
+def test_gap_in_buffer_starts_with_reset():
+    async def scenario():
+        stream = ChangeStream(buffer_size=2, client_queue=10, keepalive=1, max_seconds=1)
+        stream.on_events([ChangeEvent("User", str(i), "insert") for i in range(5)])
+        assert stream.subscribe("User", stream.event_id(2)).reset_id == stream.event_id(5)
+        client = stream.subscribe("User", stream.event_id(3))
+        assert client.reset_id is None
+        return [seq for seq, _ in [client.queue.get_nowait() for _ in range(client.queue.qsize())]]
+
+    assert asyncio.run(scenario()) == [4, 5]
+
+
+def test_slow_client_is_disconnected_after_its_queue():
+    async def scenario():
+        stream = ChangeStream(buffer_size=100, client_queue=3, keepalive=1, max_seconds=10)
+        client = stream.subscribe("User")
+        stream.on_events([ChangeEvent("User", str(i), "update") for i in range(10)])
+        await asyncio.sleep(0)
+        assert client.overflowed
+        return [chunk async for chunk in stream.stream(client)]
+
+    events = _events("".join(asyncio.run(scenario())))
+    # The queued events are delivered, then the stream ends so the client resumes from the last id
+    assert [e["id"].rsplit("-", 1)[1] for e in events] == ["1", "2", "3"]
+
+
+def test_forked_worker_gets_its_own_epoch():
+    change_stream.on_events([ChangeEvent("User", "forked", "update")])
+    parent_epoch, parent_id = change_stream.epoch, change_stream.last_event_id()
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        reply = f"{change_stream.epoch}|{change_stream.last_event_id()}|{len(change_stream._buffer)}"
+        os.write(write_end, reply.encode())
+        os._exit(0)
+    os.close(write_end)
+    child_epoch, child_id, child_buffered = os.read(read_end, 100).decode().split("|")
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert child_epoch != parent_epoch
+    assert child_id == f"{child_epoch}-0" and child_buffered == "0"
+    assert change_stream.epoch == parent_epoch and change_stream.last_event_id() == parent_id
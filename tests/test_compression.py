@@ -0,0 +1,83 @@
+import gzip
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, disable_compression, negotiate
+
+PAYLOAD = {"items": [{"id": i, "email": f"user{i}@example.com"} for i in range(200)]}
+
+
+@pytest.fixture(scope="module")
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, offload_size=4096)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/opt-out", dependencies=[Depends(disable_compression)])
+    async def opt_out():
+        return PAYLOAD
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(100):
+                yield f'{{"line": {i}, "padding": "{"x" * 50}"}}\n'
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    with TestClient(app) as c:
+        yield c
+
+
+def _raw(client, path, encoding):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_negotiate():
+    supported = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", supported) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert negotiate("identity", supported) is None
+    assert negotiate("*;q=0.1, zstd;q=0", supported) == "br"
+    assert negotiate("", supported) is None
+
+
+def test_gzip_large_body(compressed_client):
+    r, raw = _raw(compressed_client, "/large", "gzip")
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert int(r.headers["content-length"]) == len(raw)
+    assert len(raw) < len(gzip.decompress(raw)) / 3
+
+
+def test_small_body_and_opt_out_are_not_compressed(compressed_client):
+    assert "content-encoding" not in _raw(compressed_client, "/small", "gzip")[0].headers
+    assert "content-encoding" not in _raw(compressed_client, "/opt-out", "gzip")[0].headers
+
+
+def test_streaming_response_is_compressed(compressed_client):
+    r, raw = _raw(compressed_client, "/stream", "gzip")
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert gzip.decompress(raw).count(b"\n") == 100
+
+
+@pytest.mark.parametrize("encoding,module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encodings(compressed_client, encoding, module):
+    lib = pytest.importorskip(module)
+    r, raw = _raw(compressed_client, "/large", encoding)
+    assert r.headers["content-encoding"] == encoding
+    if module == "brotli":
+        assert lib.decompress(raw)
+    else:
+        assert lib.ZstdDecompressor().decompressobj().decompress(raw)
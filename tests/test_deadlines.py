@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+
+from app.api.routers.abstractions.base_router import BaseRouter
+from app.core import deadlines
+from app.core.deadlines import (
+    CLIENT_CLOSED_REQUEST, DISCONNECT, TIMEOUT, QueryCancelled, RequestDeadline, current_deadline,
+    query_cancelled_handler, resolve_timeout,
+)
+from app.core.metrics import registry
+from app.database.session import get_db
+from app.repositories.abstractions.base_repository import run_off_loop
+from app.repositories.user_repository import UserRepository
+from app.schemas.user.user_schemas import UserInput, UserOutput, UserPaginatedInput, UserUpdateInput
+from app.services.user.user_service import UserService
+from tests.conftest import TestingSessionLocal, override_get_db
+
+
+@pytest.fixture
+def bound_deadline():
+    def bind(timeout_ms):
+        deadline = RequestDeadline("/test:route", timeout_ms)
+        token = current_deadline.set(deadline)
+        tokens.append(token)
+        return deadline
+
+    tokens = []
+    yield bind
+    for token in reversed(tokens):
+        current_deadline.reset(token)
+
+
+def test_resolve_timeout_prefers_header_and_caps():
+    assert resolve_timeout(None, 500) == 500
+    assert resolve_timeout(200, 500) == 200
+    assert resolve_timeout(10 ** 9, None) == deadlines.settings.QUERY_TIMEOUT_MAX_MS
+    assert resolve_timeout(None, None) is None
+
+
+def test_expired_deadline_refuses_statement(bound_deadline):
+    deadline = bound_deadline(1)
+    deadline.expires_at -= 1
+    before = deadlines.cancellations.value(reason=TIMEOUT, route="/test:route")
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(QueryCancelled) as e:
+            db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+    assert e.value.reason == TIMEOUT
+    assert deadlines.cancellations.value(reason=TIMEOUT, route="/test:route") == before + 1
+
+
+def test_disconnect_cancels_in_flight_and_later_statements(bound_deadline):
+    deadline = bound_deadline(None)
+    cancelled = []
+    deadline.active_connection = SimpleNamespace(cancel=lambda: cancelled.append(True))
+    deadline.disconnected = True
+    deadline.cancel_in_flight()
+    assert cancelled == [True]
+
+    deadline.active_connection = None
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(QueryCancelled) as e:
+            db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+    assert e.value.reason == DISCONNECT
+
+
+def test_statements_run_with_live_deadline(bound_deadline):
+    bound_deadline(60000)
+    db = TestingSessionLocal()
+    try:
+        assert db.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        db.close()
+
+
+def test_route_deadline_returns_504_and_is_counted(client, monkeypatch):
+    clock = itertools.count(start=1000.0, step=1.0)
+    monkeypatch.setattr(deadlines, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+
+    r = client.get("/users/?page=1&size=10", headers={deadlines.DEADLINE_HEADER: "1"})
+    assert r.status_code == 504
+
+    metrics = client.get("/metrics").text
+    assert 'db_query_cancellations_total{reason="timeout",route="/users:get_paged"}' in metrics
+    assert registry.counter("db_query_cancellations_total", "").value(reason=TIMEOUT, route="/users:get_paged") >= 1
+
+
+def test_deadline_header_is_validated(client):
+    assert client.get("/users/?page=1&size=10", headers={deadlines.DEADLINE_HEADER: "0"}).status_code == 422
+    assert client.get("/users/?page=1&size=10", headers={deadlines.DEADLINE_HEADER: "5000"}).status_code == 200
+
+
+class SlowCountRepository(UserRepository):
+    @run_off_loop
+    def count(self, predicate=None, *args, **kwargs) -> int:
+        # ~40 s on SQLite unless interrupted
+        return self.db.execute(text(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+            "SELECT count(*) FROM c"
+        )).scalar()
+
+
+class SlowCountService(UserService):
+    @property
+    def repository_class(self):
+        return SlowCountRepository
+
+
+def test_client_disconnect_interrupts_running_statement():
+    slow = BaseRouter(
+        service_factory=lambda db=Depends(get_db): SlowCountService(db),
+        input_schema=UserInput,
+        update_schema=UserUpdateInput,
+        output_schema=UserOutput,
+        paginated_input_schema=UserPaginatedInput,
+        prefix="/slow-users",
+        resource_name="user",
+    )
+    app = FastAPI()
+    app.include_router(slow.router)
+    app.add_exception_handler(QueryCancelled, query_cancelled_handler)
+    app.dependency_overrides[get_db] = override_get_db
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/slow-users/count", "raw_path": b"/slow-users/count",
+             "query_string": b"", "root_path": "", "headers": [(b"host", b"test")],
+             "client": ("127.0.0.1", 1), "server": ("test", 80)}
+
+    async def scenario():
+        messages, received = [], []
+
+        async def receive():
+            received.append(True)
+            if len(received) == 1:
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(0.2)  # the client goes away while the statement runs
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        await asyncio.wait_for(app(scope, receive, send), timeout=60)
+        return messages
+
+    before = deadlines.cancellations.value(reason=DISCONNECT, route="/slow-users:count")
+    started = time.monotonic()
+    messages = asyncio.run(scenario())
+    assert time.monotonic() - started < 3
+    assert messages[0]["status"] == CLIENT_CLOSED_REQUEST
+    assert deadlines.cancellations.value(reason=DISCONNECT, route="/slow-users:count") == before + 1
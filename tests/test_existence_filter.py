@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, event
+
+from app.core.bloom import BloomFilter
+from app.database.existence_filter import ExistenceFilter, user_email_filter
+from app.database.invalidation import ChangeEvent, invalidation_bus
+from app.models.user import User
+from app.schemas.user.user_schemas import UserInput
+from app.services.user.user_service import UserService
+from tests.conftest import TestingSessionLocal, engine
+
+
+def _selects(fn):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return result, statements
+
+
+@pytest.fixture(autouse=True)
+def cross_process_bus(monkeypatch):
+    monkeypatch.setattr(invalidation_bus, "cross_process", True)
+
+
+@pytest.fixture
+def email_filter(monkeypatch):
+    monkeypatch.setattr(user_email_filter, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(user_email_filter, "pending", set())
+    user_email_filter.rebuild()
+    yield user_email_filter
+    monkeypatch.setattr(user_email_filter, "_filter", None)
+
+
+def _cleanup(db, *emails):
+    db.execute(delete(User).where(User.email.in_(emails)))
+    db.commit()
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f"user{i}@example.com")
+    assert all(f"user{i}@example.com" in bloom for i in range(10_000))
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10_000))
+    assert false_positives < 250
+    assert 0.005 < bloom.estimated_fp_rate() < 0.02
+    assert bloom.memory_bytes < 13_000
+
+
+def test_pending_ids_answer_maybe_until_resolved(db):
+    user = User(email="pending-filter@example.com", password="x", name="P", last_name="F")
+    db.add(user)
+    db.commit()
+    try:
+        existence = ExistenceFilter(User, "email", fp_rate=0.01, min_capacity=100, rebuild_interval=3600,
+                                    session_factory=TestingSessionLocal)
+        assert existence.might_contain("anything@example.com")  # not built yet
+        existence._filter = BloomFilter(100, 0.01)  # built before the user existed
+        assert not existence.might_contain(user.email)
+
+        existence.on_events([ChangeEvent("User", str(user.id), "insert")])
+        assert existence.might_contain("anything@example.com")
+        existence.resolve_pending()
+        assert existence.pending == set()
+        assert existence.might_contain(user.email)
+        assert not existence.might_contain("anything@example.com")
+    finally:
+        _cleanup(db, user.email)
+
+
+def test_by_email_skips_query_for_unknown_email(client, email_filter):
+    r, selects = _selects(lambda: client.get("/users/users/by_email/nobody-ever@example.com"))
+    assert r.status_code == 200 and r.json() is None
+    assert selects == []
+    assert email_filter.stats()["ready"] is True
+
+
+def test_create_user_skips_conflict_query_for_new_email(db, email_filter):
+    service = UserService(db)
+    email = f"bloom-{uuid.uuid4().hex[:8]}@example.com"
+    payload = UserInput(email=email, password="StrongPass123!", name="B", last_name="F")
+    try:
+        created, selects = _selects(lambda: asyncio.run(service.create_user(payload)))
+        assert created.email == email
+        assert not any("WHERE" in s and "email" in s.split("WHERE")[1] for s in selects)
+        assert email_filter.might_contain(email)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(service.create_user(payload))
+        assert exc.value.status_code == 409
+        assert exc.value.detail == "User already exists"
+    finally:
+        _cleanup(db, email)
+
+
+def test_local_bus_always_answers_maybe(client, db, email_filter, monkeypatch):
+    user = User(email="other-worker@example.com", password="x", name="O", last_name="W")
+    db.add(user)
+    db.commit()
+    # As if written by another worker: its event never reaches this one over a local bus
+    email_filter.pending.clear()
+    url = f"/users/users/by_email/{user.email}"
+    try:
+        assert client.get(url).json() is None  # what trusting the filter would answer
+
+        monkeypatch.setattr(invalidation_bus, "cross_process", False)
+        assert email_filter.stats()["cross_process_bus"] is False
+        assert email_filter.might_contain("nobody-ever@example.com")
+        r = client.get(url)
+        assert r.status_code == 200 and r.json()["email"] == user.email
+    finally:
+        _cleanup(db, user.email)
@@ -0,0 +1,66 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.models.user import User
+from app.schemas.abstractions.filters import (PREFIX, Condition, check_index_support, leading_index_columns,
+                                               prefix_index_columns)
+
+
+@pytest.fixture
+def filtered_users(client: TestClient, db):
+    ids = []
+    for i, (name, last_name) in enumerate([("Ana", "Filtro"), ("Andres", "Filtro"), ("Bea", "Filtro")]):
+        r = client.post("/users/", json={"email": f"filter{i}@example.com", "password": "Secret123!",
+                                         "name": name, "last_name": last_name})
+        ids.append(uuid.UUID(r.json()["id"]))
+    yield ids
+    for user_id in ids:
+        db.delete(db.get(User, user_id))
+    db.commit()
+
+
+def test_user_filters_are_index_backed():
+    assert {"id", "email", "date_created", "last_name", "role_id"} <= leading_index_columns(User)
+    assert "name" not in leading_index_columns(User)
+    assert prefix_index_columns(User) == {"email", "last_name"}
+
+
+def test_prefix_needs_a_pattern_ops_index():
+    # date_created leads plain btrees only, which cannot serve LIKE 'abc%' outside the C collation
+    with pytest.raises(HTTPException) as exc:
+        check_index_support(User, [Condition("date_created", PREFIX, "2026")])
+    assert exc.value.status_code == 422
+    check_index_support(User, [Condition("last_name", PREFIX, "Fil")])
+
+
+def test_filters_compile_to_predicates(client: TestClient, filtered_users):
+    r = client.get("/users/?last_name=Filtro&name__prefix=An")
+    assert r.status_code == 200
+    assert [u["name"] for u in r.json()["items"]] == ["Ana", "Andres"]
+    assert r.json()["total"] == 2
+
+    r = client.get("/users/?email__in=filter0@example.com&email__in=filter2@example.com")
+    assert sorted(u["name"] for u in r.json()["items"]) == ["Ana", "Bea"]
+
+    r = client.get("/users/?email__prefix=filter&ascending=false&offset_field=email")
+    assert [u["email"] for u in r.json()["items"]] == [f"filter{i}@example.com" for i in (2, 1, 0)]
+
+    created = client.get(f"/users/{filtered_users[1]}").json()["date_created"]
+    r = client.get(f"/users/?last_name=Filtro&date_created__gte={created}")
+    assert sorted(u["name"] for u in r.json()["items"]) == ["Andres", "Bea"]
+
+
+def test_unindexed_combinations_are_rejected(client: TestClient):
+    r = client.get("/users/?name=Ana")
+    assert r.status_code == 422
+    assert "No index supports filtering by name" in r.json()["detail"]
+
+    r = client.get("/users/?offset_field=name")
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"] == ["query", "offset_field"]
+    assert client.get("/users/?offset_field=date_created").status_code == 200
+    assert client.get("/users/?email__prefix=").status_code == 422
+    assert client.get("/users/?role_id=not-a-uuid").status_code == 422
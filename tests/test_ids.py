@@ -0,0 +1,52 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.abstractions.id_generators import get_id_generator, uuid7, uuid7_datetime, uuid7_floor
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+
+
+def test_uuid7_layout_and_order():
+    ids = [uuid7() for _ in range(5000)]
+    assert all(i.version == 7 and i.variant == uuid.RFC_4122 for i in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert abs(uuid7_datetime(ids[0]) - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+
+def test_uuid7_floor_bounds_ids():
+    before = uuid7_floor(datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert before < uuid7()
+    with pytest.raises(ValueError):
+        uuid7_datetime(uuid.uuid4())
+    with pytest.raises(ValueError):
+        get_id_generator("snowflake")
+
+
+def test_base_entity_uses_uuid7():
+    user = User(email="v7@example.com", password="x", name="V", last_name="Seven")
+    assert user.id.version == 7
+
+
+def test_keyset_page_newest_first(db):
+    users = [
+        User(email=f"keyset{i}@example.com", password="x", name=f"K{i}", last_name="Set")
+        for i in range(5)
+    ]
+    db.add_all(users)
+    db.commit()
+    repository = UserRepository(db)
+    keyset = lambda u: u.email.like("keyset%")
+
+    try:
+        first = asyncio.run(repository.get_keyset_page(limit=3, predicate=keyset))
+        assert [u.email for u in first] == [f"keyset{i}@example.com" for i in (4, 3, 2)]
+        second = asyncio.run(repository.get_keyset_page(after=first[-1].id, limit=3, predicate=keyset))
+        assert [u.email for u in second] == ["keyset1@example.com", "keyset0@example.com"]
+    finally:
+        for user in users:
+            db.delete(user)
+        db.commit()
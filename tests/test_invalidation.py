@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database.invalidation import ChangeEvent, FileBackend, InvalidationBus, invalidation_bus
+
+
+def test_writes_publish_one_batch_per_transaction(client: TestClient):
+    batches = []
+    invalidation_bus.subscribe("User", batches.append)
+    try:
+        r = client.post("/users/", json={
+            "email": "bus@example.com", "password": "x", "name": "Bus", "last_name": "Event",
+        })
+        user_id = r.json()["id"]
+        client.put(f"/users/{user_id}", json={"name": "Bus2", "last_name": "Event"})
+        client.delete(f"/users/{user_id}")
+    finally:
+        invalidation_bus.unsubscribe("User", batches.append)
+
+    assert [[(e.id, e.op) for e in batch] for batch in batches] == [
+        [(user_id, "insert")], [(user_id, "update")], [(user_id, "delete")],
+    ]
+
+
+def test_file_backend_delivers_to_other_workers(tmp_path):
+    path = str(tmp_path / "bus.log")
+    publisher = InvalidationBus(FileBackend(path, poll_interval=0.01))
+    worker = InvalidationBus(FileBackend(path, poll_interval=0.01))
+    received, local = [], []
+    delivered = threading.Event()
+
+    def on_worker(events):
+        received.extend(events)
+        delivered.set()
+
+    worker.subscribe("*", on_worker)
+    publisher.subscribe("User", local.extend)
+    publisher.start()
+    worker.start()
+    try:
+        time.sleep(0.05)
+        publisher.publish([ChangeEvent("User", "1", "update"), ChangeEvent("Role", "2", "delete")])
+        assert delivered.wait(2)
+    finally:
+        publisher.stop()
+        worker.stop()
+
+    assert sorted(received, key=lambda e: e.id) == [ChangeEvent("User", "1", "update"),
+                                                   ChangeEvent("Role", "2", "delete")]
+    # The publisher evicts locally at commit and ignores its own message on the bus
+    assert local == [ChangeEvent("User", "1", "update")]
+
+
+def test_malformed_message_does_not_stop_the_listener(tmp_path):
+    path = str(tmp_path / "bus.log")
+    publisher = InvalidationBus(FileBackend(path, poll_interval=0.01))
+    worker = InvalidationBus(FileBackend(path, poll_interval=0.01))
+    received = []
+    delivered = threading.Event()
+
+    def on_worker(events):
+        received.extend(events)
+        delivered.set()
+
+    worker.subscribe("*", on_worker)
+    worker.start()
+    try:
+        time.sleep(0.05)
+        for bad in ("not json", "[1, 2]", '{"origin": "other"}', '{"origin": "other", "events": [[1]]}'):
+            publisher.backend.publish(bad)
+        publisher.publish([ChangeEvent("User", "1", "update")])
+        assert delivered.wait(2)
+        assert worker._thread.is_alive()
+    finally:
+        worker.stop()
+
+    assert received == [ChangeEvent("User", "1", "update")]
+
+
+def test_large_batches_are_split_under_notify_limit():
+    bus = InvalidationBus(None)
+    payloads = bus._encode([ChangeEvent("User", f"{i:036d}", "update") for i in range(500)])
+    assert len(payloads) > 1
+    assert all(len(p) < 8000 for p in payloads)
+    assert sum(len(json.loads(p)["events"]) for p in payloads) == 500
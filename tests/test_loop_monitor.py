@@ -0,0 +1,87 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.loop_monitor import (
+    LoopBlocked, LoopMonitor, LoopMonitorMiddleware, Stall, loop_monitor, route_label, stalls_total,
+)
+from app.core.security import create_access_token
+
+
+def _app(monitor: LoopMonitor) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(_):
+        monitor.start(asyncio.get_running_loop())
+        yield
+        monitor.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+
+    @app.get("/items/{item_id}/blocking")
+    async def blocking(item_id: int):
+        time.sleep(0.3)  # sync call on the loop thread
+        return {"id": item_id}
+
+    @app.get("/items/{item_id}/awaiting")
+    async def awaiting(item_id: int):
+        await asyncio.sleep(0.3)
+        return {"id": item_id}
+
+    return app
+
+
+def test_stall_is_attributed_to_route_with_stack():
+    monitor = LoopMonitor(threshold_ms=50, interval_ms=10)
+    before = stalls_total.value(route="GET /items/{item_id}/blocking")
+    with TestClient(_app(monitor)) as client:
+        assert client.get("/items/7/awaiting").status_code == 200
+        assert monitor.recent() == []
+        assert client.get("/items/7/blocking").status_code == 200
+        time.sleep(0.05)
+
+    [stall] = monitor.recent()
+    assert stall["route"] == "GET /items/{item_id}/blocking"
+    assert stall["duration_ms"] >= 200
+    assert "time.sleep(0.3)" in stall["stack"]
+    assert stalls_total.value(route="GET /items/{item_id}/blocking") == before + 1
+
+
+def test_fail_on_stall_fails_blocking_request():
+    monitor = LoopMonitor(threshold_ms=50, interval_ms=10, fail_on_stall=True)
+    with TestClient(_app(monitor)) as client:
+        assert client.get("/items/1/awaiting").status_code == 200
+        with pytest.raises(LoopBlocked, match="GET /items/{item_id}/blocking blocked the event loop"):
+            client.get("/items/1/blocking")
+
+
+def test_admin_lists_recent_stalls(client):
+    loop_monitor.clear()
+    loop_monitor.stalls.append(Stall("GET /users/", 150.0, "stack", "2026-01-01T00:00:00+00:00"))
+    admin = {"Authorization": f"Bearer {create_access_token('someone', [settings.ADMIN_PERMISSION])}"}
+    body = client.get("/admin/loop-stalls", headers=admin).json()
+    assert body["stalls"][0]["route"] == "GET /users/"
+    assert client.delete("/admin/loop-stalls", headers=admin).status_code == 204
+    assert client.get("/admin/loop-stalls", headers=admin).json()["stalls"] == []
+
+
+def test_route_label_uses_the_route_template():
+    app = FastAPI()
+
+    @app.get("/roles/{role_id}/users/{user_id}")
+    async def role_user(role_id: int, user_id: int, request: Request):
+        return route_label(request.scope)
+
+    @app.get("/users/by_email/{email}")
+    async def by_email(email: str, request: Request):
+        return route_label(request.scope)
+
+    with TestClient(app) as client:
+        assert client.get("/roles/1/users/1").json() == "GET /roles/{role_id}/users/{user_id}"
+        assert client.get("/users/by_email/a").json() == "GET /users/by_email/{email}"
+    assert route_label({"type": "http", "method": "GET", "path": "/nowhere/123"}) == "GET <unmatched>"
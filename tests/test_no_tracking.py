@@ -0,0 +1,33 @@
+import asyncio
+
+from sqlalchemy.engine import Row
+
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.schemas.user.user_schemas import UserOutput
+
+
+def test_untracked_reads_return_plain_rows(db):
+    users = [User(email=f"untracked{i}@example.com", password="x", name="Un", last_name=f"T{i}") for i in range(3)]
+    db.add_all(users)
+    db.commit()
+    ids = {u.id for u in users}
+    db.expunge_all()
+    try:
+        repository = UserRepository(db)
+        items, total = asyncio.run(repository.get_paged(page_size=100, predicate=lambda m: m.name == "Un"))
+        assert total == 3
+        assert all(isinstance(i, Row) for i in items)
+        assert len(db.identity_map) == 0
+        outputs = [UserOutput.model_validate(i, from_attributes=True) for i in items]
+        assert {o.id for o in outputs} == ids
+
+        found = asyncio.run(repository.find(lambda m: m.name == "Un"))
+        assert all(isinstance(i, Row) for i in found) and len(db.identity_map) == 0
+
+        tracked = asyncio.run(repository.find(lambda m: m.name == "Un", disable_tracking=False))
+        assert all(isinstance(i, User) for i in tracked) and len(db.identity_map) == 3
+    finally:
+        for user in db.query(User).filter(User.id.in_(ids)):
+            db.delete(user)
+        db.commit()
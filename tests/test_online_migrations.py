@@ -0,0 +1,72 @@
+import io
+
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+import app.database.online_migrations  # noqa: F401  (registers the operations)
+from app.database.lock_impact import BLOCKING, BRIEF, ONLINE, analyze_script, classify, worst
+from app.database.online_migrations import PROGRESS_TABLE, run_batched_update
+
+
+def _offline_postgres():
+    buffer = io.StringIO()
+    context = MigrationContext.configure(dialect_name="postgresql",
+                                         opts={"as_sql": True, "output_buffer": buffer})
+    return Operations(context), buffer
+
+
+def test_operations_render_online_ddl():
+    op, buffer = _offline_postgres()
+    op.create_index_concurrently("ix_user_role_id", "user", ["role_id"])
+    op.add_foreign_key_not_valid("fk_user_role_id_role", "user", "role", ["role_id"], ["id"])
+    op.validate_constraint("fk_user_role_id_role", "user")
+    op.batched_update("user", "is_deleted = false", where="is_deleted IS NULL")
+    sql = " ".join(buffer.getvalue().split())
+    assert 'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_role_id ON "user" (role_id)' in sql
+    assert ('ALTER TABLE "user" ADD CONSTRAINT "fk_user_role_id_role" FOREIGN KEY ("role_id") '
+            'REFERENCES "role" ("id") NOT VALID') in sql
+    assert 'ALTER TABLE "user" VALIDATE CONSTRAINT "fk_user_role_id_role"' in sql
+
+    report = analyze_script("-- Running upgrade a -> b\n\n" + buffer.getvalue())
+    assert worst(report["a -> b"]) == BRIEF
+
+
+def test_classify_lock_impact():
+    assert classify('CREATE INDEX ix_a ON "user" (a)').severity == BLOCKING
+    assert classify('CREATE INDEX CONCURRENTLY ix_a ON "user" (a)').severity == ONLINE
+    assert classify('ALTER TABLE "user" ADD FOREIGN KEY(role_id) REFERENCES role (id)').severity == BLOCKING
+    assert classify('ALTER TABLE "user" ADD COLUMN flag BOOLEAN').severity == BRIEF
+    assert classify('ALTER TABLE "user" ADD COLUMN flag BOOLEAN DEFAULT false NOT NULL').severity == BRIEF
+    assert classify('ALTER TABLE "user" ADD COLUMN flag BOOLEAN NOT NULL').severity == BLOCKING
+    assert classify('ALTER TABLE "user" ADD COLUMN seen TIMESTAMP DEFAULT now()').severity == BLOCKING
+    assert classify('ALTER TABLE "user" ALTER COLUMN name TYPE TEXT').severity == BLOCKING
+    assert classify('UPDATE "user" SET is_deleted = false').severity == BLOCKING
+
+    report = analyze_script(
+        "-- Running upgrade  -> a\n\nCREATE TABLE t (id INTEGER);\n\nCREATE INDEX ix_t ON t (id);\n\n"
+        "UPDATE alembic_version SET version_num='a';\n"
+    )
+    assert [i.severity for i in report["-> a"]] == [ONLINE, ONLINE]
+
+
+def test_batched_update_resumes_from_progress():
+    engine = create_engine("sqlite://")
+    sleeps = []
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE item (id VARCHAR(32) PRIMARY KEY, flag BOOLEAN)"))
+        connection.execute(text("INSERT INTO item (id, flag) VALUES " +
+                                ", ".join(f"('{i:032x}', NULL)" for i in range(25))))
+        connection.commit()
+
+        kwargs = dict(batch_size=10, pause=0.01, name="item.flag", sleep=sleeps.append)
+        assert run_batched_update(connection, "item", "flag = 0", "flag IS NULL", max_batches=1, **kwargs) == 10
+        progress = connection.execute(text(f"SELECT last_key, rows_done, done FROM {PROGRESS_TABLE}")).one()
+        assert progress == (f"{9:032x}", 10, False)
+
+        assert run_batched_update(connection, "item", "flag = 0", "flag IS NULL", **kwargs) == 15
+        assert connection.execute(text("SELECT count(*) FROM item WHERE flag IS NULL")).scalar() == 0
+        assert connection.execute(text(f"SELECT rows_done, done FROM {PROGRESS_TABLE}")).one() == (25, True)
+        assert sleeps == [0.01]
+
+        assert run_batched_update(connection, "item", "flag = 0", "flag IS NULL", **kwargs) == 0
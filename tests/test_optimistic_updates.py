@@ -0,0 +1,74 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database.invalidation import invalidation_bus
+from app.models.user import User
+from tests.conftest import engine
+
+
+def _statements(client: TestClient, method: str, url: str, **kwargs):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.request(method, url, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_update_is_one_statement_with_if_match(client: TestClient, db):
+    r = client.post("/users/", json={"email": "versioned@example.com", "password": "x", "name": "V", "last_name": "One"})
+    user_id = r.json()["id"]
+    assert r.json()["version"] == 1
+    assert client.get(f"/users/{user_id}").headers["ETag"] == '"1"'
+
+    events = []
+    invalidation_bus.subscribe("User", events.extend)
+    try:
+        r, statements = _statements(client, "PUT", f"/users/{user_id}",
+                                    json={"name": "V", "last_name": "Two"}, headers={"If-Match": '"1"'})
+    finally:
+        invalidation_bus.unsubscribe("User", events.extend)
+    assert r.status_code == 200
+    assert r.json()["last_name"] == "Two" and r.json()["date_updated"] is not None
+    assert r.headers["ETag"] == '"2"'
+    assert statements == ["UPDATE"]
+    assert [(e.id, e.op) for e in events] == [(user_id, "update")]
+
+    # A writer holding the old version loses instead of overwriting
+    r = client.put(f"/users/{user_id}", json={"name": "V", "last_name": "Lost"}, headers={"If-Match": '"1"'})
+    assert r.status_code == 412
+    assert client.put(f"/users/{user_id}", json={"name": "V", "last_name": "Three"}).json()["version"] == 3
+    assert client.put(f"/users/{uuid.uuid4()}", json={"name": "V", "last_name": "X"},
+                      headers={"If-Match": '"1"'}).status_code == 404
+
+    assert client.delete(f"/users/{user_id}", headers={"If-Match": '"2"'}).status_code == 412
+    r, statements = _statements(client, "DELETE", f"/users/{user_id}", headers={"If-Match": 'W/"3"'})
+    assert r.status_code == 204
+    assert statements[0] == "UPDATE" and "SELECT" not in statements
+    assert client.delete(f"/users/{user_id}").status_code == 404
+
+    user = db.get(User, uuid.UUID(user_id))
+    assert user.is_deleted and user.version == 4
+    db.delete(user)
+    db.commit()
+
+
+def test_orm_updates_bump_version(db):
+    user = User(email="orm-versioned@example.com", password="x", name="O", last_name="Rm")
+    db.add(user)
+    db.commit()
+    assert user.version == 1
+    db.commit()
+    assert user.version == 1
+    user.name = "Changed"
+    db.commit()
+    assert user.version == 2
+    db.delete(user)
+    db.commit()
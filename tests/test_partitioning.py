@@ -0,0 +1,110 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel
+
+from app.database.partition_maintenance import partitioned_tables, plan_maintenance, run_maintenance
+from app.database.partitioning import (
+    add_months, create_partition_sql, detach_partition_sql, parse_partition_month, partition_name,
+)
+from app.models.abstractions.partitioned_entity import PartitionedEntity, is_partitioned
+from app.models.user import User
+from app.repositories.abstractions.base_repository import BaseRepository
+
+
+class AuditEvent(PartitionedEntity, table=True):
+    action: str
+
+
+class AuditEventRepository(BaseRepository[AuditEvent]):
+    @property
+    def model(self) -> type[AuditEvent]:
+        return AuditEvent
+
+
+def test_partitioned_entity_ddl():
+    ddl = str(CreateTable(AuditEvent.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (date_created)" in ddl
+    assert "PRIMARY KEY (id, date_created)" in ddl
+    assert is_partitioned(AuditEvent)
+    assert not is_partitioned(User)
+    assert partitioned_tables(SQLModel.metadata) == ["auditevent"]
+
+
+def test_partition_sql():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert partition_name("user", date(2026, 1, 1)) == "user_p2026_01"
+    assert parse_partition_month("user", "user_p2026_01") == date(2026, 1, 1)
+    assert parse_partition_month("user", "user_default") is None
+    assert create_partition_sql("user", date(2026, 12, 15)) == (
+        'CREATE TABLE IF NOT EXISTS "user_p2026_12" PARTITION OF "user" '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+    assert detach_partition_sql("user", date(2025, 1, 1), concurrently=True).endswith(
+        'DETACH PARTITION "user_p2025_01" CONCURRENTLY')
+
+
+def test_plan_maintenance():
+    existing = [date(2025, 12, 1), date(2026, 9, 1), date(2026, 10, 1)]
+    plan = plan_maintenance(existing, date(2026, 10, 19), ahead=2, retain=6)
+    assert plan["create"] == [date(2026, 11, 1), date(2026, 12, 1)]
+    assert plan["detach"] == [date(2025, 12, 1)]
+
+
+def test_sqlite_falls_back_to_single_table(db):
+    assert "auditevent" in inspect(db.get_bind()).get_table_names()
+
+    old = AuditEvent(action="old", date_created=datetime(2025, 1, 10))
+    new = AuditEvent(action="new", date_created=datetime(2026, 10, 1))
+    db.add_all([old, new])
+    db.commit()
+
+    repository = AuditEventRepository(db)
+    items, total = asyncio.run(repository.get_paged(created_from=datetime(2026, 10, 1),
+                                                    created_to=datetime(2026, 10, 1) + timedelta(days=31)))
+    assert total == 1
+    assert [i.action for i in items] == ["new"]
+    assert asyncio.run(repository.count(created_to=datetime(2026, 1, 1))) == 1
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.value
+
+
+class _RecordingConnection:
+    def __init__(self, partitions, default_partition):
+        self.partitions = partitions
+        self.default_partition = default_partition
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "pg_partitioned_table" in sql:
+            return _Result(self.default_partition)
+        if "pg_inherits" in sql:
+            return _Result(self.partitions)
+        return _Result(None)
+
+
+def test_retention_detaches_concurrently_only_without_default_partition():
+    partitions = ["auditevent_default", "auditevent_p2025_01", "auditevent_p2026_10"]
+    for default_partition, suffix in ((True, '"auditevent_p2025_01"'), (False, '"auditevent_p2025_01" CONCURRENTLY')):
+        connection = _RecordingConnection(partitions, default_partition)
+        report = run_maintenance(connection, ahead=0, retain=6, today=date(2026, 10, 19), tables=["auditevent"])
+        assert report["auditevent"]["detach"] == [date(2025, 1, 1)]
+        [detach] = [s for s in connection.statements if "DETACH PARTITION" in s]
+        assert detach.endswith(suffix)
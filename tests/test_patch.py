@@ -0,0 +1,57 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.models.user import User
+from tests.conftest import engine
+
+
+def _patch(client: TestClient, url: str, body: dict, **kwargs):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.patch(url, json=body, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_patch_writes_only_changed_columns(client: TestClient, db):
+    r = client.post("/users/", json={"email": "patch@example.com", "password": "x", "name": "Pat", "last_name": "Ch"})
+    user_id = r.json()["id"]
+
+    r, statements = _patch(client, f"/users/{user_id}", {"name": "Patricia", "last_name": "Ch"})
+    assert r.status_code == 200
+    assert (r.json()["name"], r.json()["last_name"], r.json()["version"]) == ("Patricia", "Ch", 2)
+    updates = [s for s in statements if s.startswith("UPDATE")]
+    assert len(updates) == 1
+    set_clause = updates[0].split(" SET ")[1].split(" WHERE ")[0]
+    assert "name=" in set_clause and "last_name" not in set_clause and "date_updated" in set_clause
+
+    # Nothing changes: no write, date_updated and version untouched
+    date_updated = r.json()["date_updated"]
+    r, statements = _patch(client, f"/users/{user_id}", {"last_name": "Ch"})
+    assert r.status_code == 200
+    assert r.json()["date_updated"] == date_updated and r.headers["ETag"] == '"2"'
+    assert all(s.startswith("SELECT") for s in statements)
+    r, statements = _patch(client, f"/users/{user_id}", {})
+    assert r.status_code == 200 and all(s.startswith("SELECT") for s in statements)
+
+
+def test_patch_validation_and_preconditions(client: TestClient, db):
+    r = client.post("/users/", json={"email": "patch2@example.com", "password": "x", "name": "A", "last_name": "B"})
+    user_id = r.json()["id"]
+
+    assert client.patch(f"/users/{user_id}", json={"name": None}).status_code == 422
+    assert client.patch(f"/users/{user_id}", json={"name": "C"}, headers={"If-Match": '"7"'}).status_code == 412
+    assert client.patch(f"/users/{user_id}", json={"name": "C"}, headers={"If-Match": '"1"'}).status_code == 200
+    assert client.patch(f"/users/{uuid.uuid4()}", json={"name": "C"}).status_code == 404
+
+    for email in ("patch@example.com", "patch2@example.com"):
+        db.delete(db.query(User).filter(User.email == email).one())
+    db.commit()
@@ -0,0 +1,66 @@
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from app.core.config import settings
+from app.core.prefork import PreforkMaster
+from app.database.session import engine
+
+
+def test_forked_child_gets_a_fresh_pool():
+    parent_pool = engine.pool
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        os.write(write_end, b"1" if engine.pool is not parent_pool else b"0")
+        os._exit(0)
+    os.close(write_end)
+    fresh = os.read(read_end, 1)
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert fresh == b"1"
+    assert engine.pool is parent_pool
+
+
+def test_launcher_serves_from_preloaded_workers_and_stops_on_sigterm():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.core.prefork", "--port", str(port), "--workers", "2", "--no-access-log"],
+        stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        ready = 0
+        deadline = time.monotonic() + 30
+        while ready < 2 and time.monotonic() < deadline:
+            line = process.stderr.readline()
+            assert line, "launcher exited early"
+            ready += "ready in" in line
+        assert ready == 2
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/").read()
+        assert b"Hello World" in body
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(15) == 0
+
+
+def test_launcher_warns_when_workers_share_the_local_bus(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "INVALIDATION_BUS_BACKEND", "local")
+    with caplog.at_level(logging.WARNING, logger="app.core.prefork"):
+        PreforkMaster("app.main:app", "127.0.0.1", 0, workers=1).check_invalidation_bus()
+        assert not caplog.records
+        PreforkMaster("app.main:app", "127.0.0.1", 0, workers=2).check_invalidation_bus()
+        assert "INVALIDATION_BUS_BACKEND" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(settings, "INVALIDATION_BUS_BACKEND", "postgres")
+    with caplog.at_level(logging.WARNING, logger="app.core.prefork"):
+        PreforkMaster("app.main:app", "127.0.0.1", 0, workers=2).check_invalidation_bus()
+    assert not caplog.records
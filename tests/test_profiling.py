@@ -0,0 +1,73 @@
+import json
+from collections import Counter
+
+from app.core.config import settings
+from app.core.profiling import (
+    PROFILE_FILE_HEADER, PROFILE_HEADER, ProfileStore, profile_store, profile_token, profiling_toggle, speedscope,
+    verify_profile_token,
+)
+from app.core.security import create_access_token
+
+
+def _admin():
+    return {"Authorization": f"Bearer {create_access_token('someone', [settings.ADMIN_PERMISSION])}"}
+
+
+def test_signed_header_profiles_request(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    token = client.post("/admin/profiling/token", headers=_admin()).json()["value"]
+
+    response = client.get("/users/?page=1&size=2", headers={PROFILE_HEADER: token})
+    assert response.status_code == 200
+    name = response.headers[PROFILE_FILE_HEADER]
+    assert name.startswith(tuple("0123456789")) and "-GET-users-" in name
+
+    listed = client.get("/admin/profiles", headers=_admin()).json()["profiles"]
+    assert [p["name"] for p in listed] == [name]
+    profile = client.get(f"/admin/profiles/{name}", headers=_admin()).json()
+    assert profile["profiles"][0]["type"] == "sampled"
+    assert client.get("/admin/profiles/missing.speedscope.json", headers=_admin()).status_code == 404
+
+
+def test_invalid_or_expired_token_is_not_profiled(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    expires, signature = profile_token().split(".")
+    forged = f"{int(expires) + 3600}.{signature}"
+    for token in ("garbage", profile_token(ttl_seconds=-10), forged):
+        assert not verify_profile_token(token)
+        response = client.get("/", headers={PROFILE_HEADER: token})
+        assert PROFILE_FILE_HEADER not in response.headers
+    assert profile_store.list() == []
+
+
+def test_admin_toggle_samples_requests(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    monkeypatch.setattr(profiling_toggle, "enabled", False)
+    monkeypatch.setattr(profiling_toggle, "sample_rate", profiling_toggle.sample_rate)
+
+    assert client.post("/admin/profiling", json={"enabled": True, "sample_rate": 2}, headers=_admin()).status_code == 422
+    assert client.post("/admin/profiling", json={"enabled": True, "sample_rate": 1}).status_code == 401
+    body = client.post("/admin/profiling", json={"enabled": True, "sample_rate": 1}, headers=_admin()).json()
+    assert body == {"enabled": True, "sample_rate": 1}
+    assert PROFILE_FILE_HEADER in client.get("/").headers
+
+    client.post("/admin/profiling", json={"enabled": False}, headers=_admin())
+    assert PROFILE_FILE_HEADER not in client.get("/").headers
+
+
+def test_store_keeps_newest_files(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=3)
+    names = [store.save(speedscope(Counter(), 1.0, "x"), "GET", f"/p/{i}", 1.0) for i in range(5)]
+    assert [p["name"] for p in store.list()] == names[:1:-1]
+    assert store.path("../etc/passwd") is None
+    assert store.path(names[0]) is None
+    assert store.path(names[-1]) is not None
+
+
+def test_speedscope_shares_frames():
+    samples = Counter({(("main", "a.py", 1), ("work", "a.py", 5)): 3, (("main", "a.py", 1),): 1})
+    profile = speedscope(samples, 2.0, "GET /")
+    assert [f["name"] for f in profile["shared"]["frames"]] == ["main", "work"]
+    assert profile["profiles"][0]["samples"] == [[0, 1], [0]]
+    assert profile["profiles"][0]["weights"] == [6.0, 2.0]
+    json.dumps(profile)
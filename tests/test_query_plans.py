@@ -0,0 +1,97 @@
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.database.query_plans import PlanCapture, _is_select, fingerprint, normalize, plan_capture
+from app.database.result_cache import result_cache
+
+
+def test_fingerprint_ignores_literals_and_parameters():
+    a = "SELECT * FROM \"user\" WHERE email = 'a@example.com' AND id IN (1, 2, 3) LIMIT 10"
+    b = "SELECT * FROM \"user\" WHERE email = %(email_1)s AND id IN (%(id_1)s) LIMIT ?"
+    assert normalize(a) == 'SELECT * FROM "user" WHERE email = ? AND id IN (...) LIMIT ?'
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint('SELECT * FROM "user" WHERE name = ?')
+
+
+def test_sampled_plans_are_grouped_by_fingerprint_and_method(client, monkeypatch):
+    plan_capture.clear()
+    result_cache.clear()
+    monkeypatch.setattr(plan_capture, "sample_rate", 1.0)
+    for page in (1, 2):
+        assert client.get(f"/users/?page={page}&size=2").status_code == 200
+    monkeypatch.setattr(plan_capture, "sample_rate", 0.0)
+
+    assert client.get("/admin/query-plans").status_code == 401
+    denied = create_access_token("someone", ["users:read"])
+    assert client.get("/admin/query-plans", headers={"Authorization": f"Bearer {denied}"}).status_code == 403
+
+    admin = create_access_token("someone", [settings.ADMIN_PERMISSION])
+    body = client.get("/admin/query-plans", headers={"Authorization": f"Bearer {admin}"}).json()
+    paged = [g for g in body["groups"] if "UserRepository.get_paged" in g["methods"]]
+    assert paged
+    page_query = next(g for g in paged if "LIMIT" in g["statement"])
+    assert page_query["count"] == 2
+    assert page_query["plans"][0]["reason"] == "sampled"
+    assert "SCAN" in page_query["plans"][0]["plan"] or "SEARCH" in page_query["plans"][0]["plan"]
+    plan_capture.clear()
+
+
+def test_only_read_only_statements_are_analyzed():
+    assert _is_select("SELECT * FROM users")
+    assert _is_select("WITH recent AS (SELECT * FROM users) SELECT * FROM recent")
+    assert _is_select("WITH t AS (SELECT 'delete me' AS note) SELECT * FROM t")
+    assert not _is_select("WITH gone AS (DELETE FROM users RETURNING id) SELECT * FROM gone")
+    assert not _is_select("UPDATE users SET name = 'x'")
+
+
+class _FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.last = None
+
+    def execute(self, statement, parameters=None):
+        self.connection.statements.append(statement)
+        self.last = statement
+
+    def fetchone(self):
+        return (self.connection.read_only,)
+
+    def fetchall(self):
+        return [("Seq Scan on users",)]
+
+    def close(self):
+        pass
+
+
+class _FakeRawConnection:
+    def __init__(self, read_only):
+        self.read_only = read_only
+        self.statements = []
+        self.rolled_back = self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("read_only", ["on", "off"])
+def test_postgres_explain_runs_only_in_a_read_only_transaction(read_only):
+    raw = _FakeRawConnection(read_only)
+    engine = type("Engine", (), {"raw_connection": lambda self: raw})()
+    capture = PlanCapture(enabled=True, slow_ms=0, sample_rate=0, buffer_size=10)
+    if read_only == "on":
+        capture.explain_postgresql(engine, "SELECT 1", None, 1.0, "slow", None)
+        assert raw.statements[:2] == ["SET TRANSACTION READ ONLY", "SHOW transaction_read_only"]
+        assert raw.statements[-1] == "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) SELECT 1"
+        assert capture.plans[0].plan == "Seq Scan on users"
+    else:
+        with pytest.raises(RuntimeError):
+            capture.explain_postgresql(engine, "SELECT 1", None, 1.0, "slow", None)
+        assert not any(s.startswith("EXPLAIN") for s in raw.statements)
+    assert raw.rolled_back and raw.closed
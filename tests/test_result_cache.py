@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database.invalidation import ChangeEvent
+from app.database.result_cache import ResultCache, result_cache
+from app.models.user import User
+from tests.conftest import engine
+
+
+def _count_statements(client: TestClient, url: str):
+    statements = []
+
+    def capture(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return response, len(statements)
+
+
+def test_listing_is_served_from_cache_until_a_write(client: TestClient, db):
+    result_cache.clear()
+    url = "/users/?page=1&size=20&ascending=true"
+    first, queries = _count_statements(client, url)
+    assert queries == 2  # count + page
+    cached, queries = _count_statements(client, "/users/?ascending=true&size=20")  # same normalized input
+    assert queries == 0
+    assert cached.content == first.content
+
+    user = User(email="cached@example.com", password="x", name="Ca", last_name="Che")
+    db.add(user)
+    db.commit()
+    try:
+        fresh, queries = _count_statements(client, url)
+        assert queries == 2
+        assert fresh.json()["total"] == first.json()["total"] + 1
+    finally:
+        db.delete(user)
+        db.commit()
+    assert _count_statements(client, url)[0].json()["total"] == first.json()["total"]
+
+
+def test_eviction_is_byte_bounded_and_generations_invalidate():
+    now = [0.0]
+    cache = ResultCache(max_bytes=100, max_entry_bytes=60, ttl=10, clock=lambda: now[0])
+    assert cache.put("User", "a", 0, b"x" * 40)
+    assert cache.put("User", "b", 0, b"x" * 40)
+    assert cache.get("User", "a") is not None  # a is now most recently used
+    assert cache.put("User", "c", 0, b"x" * 40)
+    assert cache.get("User", "b") is None and cache.bytes == 80
+    assert not cache.put("User", "big", 0, b"x" * 61)
+
+    cache.on_events([ChangeEvent("User", "1", "update")])
+    assert cache.get("User", "a") is None
+    assert not cache.put("User", "d", 0, b"x")  # computed under the old generation
+    assert cache.put("User", "d", 1, b"x")
+    now[0] = 11
+    assert cache.get("User", "d") is None
+    assert cache.bytes == 40  # only c left, never looked up again
+
+
+def test_bus_events_bump_the_shared_cache():
+    generation = result_cache.generation("Role")
+    result_cache.on_events([ChangeEvent("Role", "1", "insert"), ChangeEvent("Role", "2", "delete")])
+    assert result_cache.generation("Role") == generation + 1
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from tests.conftest import engine
+
+
+def _create(client: TestClient, suffix: str) -> dict:
+    r = client.post("/users/", json={
+        "email": f"sparse{suffix}@example.com", "password": "x", "name": "Sparse", "last_name": suffix,
+    })
+    assert r.status_code == 201
+    return r.json()
+
+
+def _capture_selects():
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    return statements, before_execute
+
+
+def test_get_by_id_projects_columns(client: TestClient):
+    user = _create(client, "one")
+    statements, listener = _capture_selects()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = client.get(f"/users/{user['id']}?fields=id,email")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 200
+    assert r.json() == {"id": user["id"], "email": user["email"]}
+    assert "password" not in statements[-1] and "last_name" not in statements[-1]
+    client.delete(f"/users/{user['id']}")
+
+
+def test_get_paged_projects_columns(client: TestClient):
+    user = _create(client, "two")
+    r = client.get("/users/?page=1&size=100&fields=email, name")
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert all(set(item) == {"email", "name"} for item in items)
+    assert {"email": user["email"], "name": "Sparse"} in items
+    client.delete(f"/users/{user['id']}")
+
+
+def test_unknown_or_non_output_fields_are_rejected(client: TestClient):
+    r = client.get("/users/?fields=id,password")
+    assert r.status_code == 422
+    assert "password" in r.json()["detail"]
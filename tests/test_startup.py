@@ -0,0 +1,37 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.startup import include_routers, lifespan, load_precomputed_openapi
+
+
+def test_lifespan_records_startup_timings(client: TestClient):
+    timings = client.app.state.startup_timings
+    assert "configure_mappers_ms" in timings
+    assert "lifespan_total_ms" in timings
+
+
+def test_precomputed_openapi_is_served(tmp_path):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps({"openapi": "3.1.0", "info": {"title": "prebuilt", "version": "1"}, "paths": {}}))
+    app = FastAPI()
+    assert load_precomputed_openapi(app, str(path))
+    assert not load_precomputed_openapi(FastAPI(), str(tmp_path / "missing.json"))
+    with TestClient(app) as c:
+        assert c.get("/openapi.json").json()["info"]["title"] == "prebuilt"
+
+
+def test_lazy_router_loads_on_first_request(monkeypatch):
+    monkeypatch.setattr(settings, "LAZY_ROUTER_PREFIXES", ["/users"])
+    monkeypatch.setattr(settings, "STARTUP_WARMUP", False)
+    app = FastAPI(lifespan=lifespan)
+    lazy_routers = include_routers(app, [("/users", "app.api.routers.user_router")])
+    assert lazy_routers.pending == {"/users": "app.api.routers.user_router"}
+    assert not any(getattr(r, "path", "").startswith("/users") for r in app.routes)
+
+    with TestClient(app) as c:
+        # Routing happens after the middleware has loaded the router
+        assert c.get("/users/not-a-uuid").status_code == 422
+    assert lazy_routers.pending == {}
@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.auth.role import Role
+from app.models.stats_rollup import StatsRollup
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+
+
+def _count(groups, key, value):
+    return next((g["count"] for g in groups if g[key] == value), 0)
+
+
+@pytest.fixture
+def user_rollups(monkeypatch):
+    monkeypatch.setattr(UserRepository, "rollup_dimensions", ("date_created", "role_id", "is_deleted"))
+
+
+def test_rollups_are_opt_in(db):
+    assert UserRepository.rollup_dimensions == ()
+    repository = UserRepository(db)
+    before = db.query(StatsRollup).count()
+    user = User(email="norollup@example.com", password="x", name="No", last_name="Rollup")
+    asyncio.run(repository.add(user))
+    try:
+        assert db.query(StatsRollup).count() == before
+        _, source = asyncio.run(repository.stats(["date_created"]))
+        assert source == "table"
+    finally:
+        db.delete(user)
+        db.commit()
+
+
+def test_rollups_follow_add_update_remove(db, user_rollups):
+    role = Role(name=f"stats-{uuid.uuid4().hex[:8]}")
+    db.add(role)
+    db.commit()
+    repository = UserRepository(db)
+    asyncio.run(repository.rebuild_rollups())
+
+    def role_count():
+        groups, source = asyncio.run(repository.stats(["role_id"]))
+        assert source == "rollup"
+        return _count(groups, "role_id", str(role.id))
+
+    user = User(email="rollup@example.com", password="x", name="Roll", last_name="Up",
+                date_created=datetime(2026, 3, 14, 9, 30))
+    asyncio.run(repository.add(user))
+    groups, _ = asyncio.run(repository.stats(["date_created"], created_from=datetime(2026, 3, 1),
+                                             created_to=datetime(2026, 4, 1)))
+    assert groups == [{"date_created": "2026-03-14", "count": 1}]
+    assert role_count() == 0
+
+    user.role_id = role.id
+    asyncio.run(repository.update(user))
+    assert role_count() == 1
+
+    asyncio.run(repository.remove(user))
+    assert role_count() == 0
+    deleted, _ = asyncio.run(repository.stats(["is_deleted"]))
+    table, source = asyncio.run(repository.stats(["is_deleted", "role_id"]))
+    assert source == "table"
+    assert _count(deleted, "is_deleted", True) == sum(g["count"] for g in table if g["is_deleted"])
+
+    db.delete(user)
+    db.delete(role)
+    db.query(StatsRollup).delete()
+    db.commit()
+
+
+def test_stats_endpoint(client: TestClient, user_rollups):
+    r = client.post("/users/", json={"email": "stats@example.com", "password": "x", "name": "S", "last_name": "T"})
+    user_id = r.json()["id"]
+    try:
+        r = client.get("/users/stats?group_by=date_created&bucket=month")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["group_by"] == ["date_created"] and body["source"] == "rollup"
+        assert _count(body["groups"], "date_created", datetime.now(timezone.utc).strftime("%Y-%m")) >= 1
+
+        r = client.get("/users/stats?group_by=date_created&bucket=week")
+        assert r.json()["source"] == "table"
+
+        assert client.get("/users/stats?group_by=password").status_code == 422
+        assert client.get("/users/stats?group_by=role_id&bucket=year").status_code == 422
+    finally:
+        client.delete(f"/users/{user_id}")
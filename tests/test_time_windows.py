@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.models.user import User
+from tests.conftest import engine
+
+START = datetime(2001, 3, 1)
+
+
+@pytest.fixture
+def dated_users(db):
+    # 7 users, two of them sharing each timestamp: ties must be broken by id
+    users = [
+        User(email=f"window{i}@example.com", password="x", name="W", last_name=f"L{i}",
+             date_created=START + timedelta(hours=i // 2))
+        for i in range(7)
+    ]
+    db.add_all(users)
+    db.commit()
+    yield users
+    db.execute(delete(User).where(User.email.like("window%@example.com")))
+    db.commit()
+
+
+def _statements(client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return response, statements
+
+
+def test_listing_and_count_accept_created_window(client, dated_users):
+    window = f"created_from={START + timedelta(hours=1)}&created_to={START + timedelta(hours=3)}"
+    r = client.get(f"/users/?size=100&{window}")
+    assert r.status_code == 200
+    assert sorted(u["email"] for u in r.json()["items"]) == [f"window{i}@example.com" for i in range(2, 6)]
+    assert r.json()["total"] == 4
+    assert client.get(f"/users/count?{window}").json() == {"total": 4}
+    assert client.get(f"/users/count?{window}&last_name=L2").json() == {"total": 1}
+
+    inverted = f"created_from={START + timedelta(hours=3)}&created_to={START}"
+    assert client.get(f"/users/?{inverted}").status_code == 422
+    assert client.get(f"/users/count?{inverted}").status_code == 422
+
+
+def test_window_pages_walk_without_offset(client, dated_users):
+    url = f"/users/window?size=3&created_from={START}&created_to={START + timedelta(days=1)}"
+    seen, cursor, pages = [], None, 0
+    while True:
+        r, statements = _statements(client, url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200
+        # SQLite renders LIMIT ? OFFSET ? for every LIMIT: the offset bound must stay 0
+        assert all(parameters[-1] == 0 for statement, parameters in statements if "OFFSET" in statement)
+        seen += [u["email"] for u in r.json()["items"]]
+        cursor, pages = r.json()["next_cursor"], pages + 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert sorted(seen) == sorted(u.email for u in dated_users)
+    dates = {u.email: u.date_created for u in dated_users}
+    assert [dates[e] for e in seen] == sorted(dates[e] for e in seen)
+
+
+def test_window_projection_and_invalid_cursor(client, dated_users):
+    r = client.get(f"/users/window?size=2&fields=email&created_from={START}")
+    assert r.status_code == 200
+    assert all(list(i) == ["email"] for i in r.json()["items"])
+    assert sorted(i["email"] for i in r.json()["items"]) == ["window0@example.com", "window1@example.com"]
+    second = client.get(f"/users/window?size=2&fields=email&created_from={START}&cursor={r.json()['next_cursor']}")
+    assert sorted(i["email"] for i in second.json()["items"]) == ["window2@example.com", "window3@example.com"]
+    assert client.get("/users/window?cursor=not-a-cursor").status_code == 422
@@ -76,10 +76,11 @@ def test_get_paged_users(client: TestClient, db):
     assert data["total"] == 7
 
     # filtros
-    r2 = client.get("/users/?page=1&size=10&email=paged0@example.com")
+    r2 = client.get("/users/?page=1&size=10&email=testpaged0@example.com")
     assert r2.status_code == 200
     data2 = r2.json()
-    assert any(item["email"].endswith("paged0@example.com") for item in data2["items"])
+    assert [item["email"] for item in data2["items"]] == ["testpaged0@example.com"]
+    assert data2["total"] == 1
 
 
 def test_get_user_by_id(client: TestClient, db):
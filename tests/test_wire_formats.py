@@ -0,0 +1,92 @@
+import asyncio
+
+import msgpack
+import pytest
+from sqlalchemy import delete
+from starlette.requests import Request
+
+from app.core import wire_formats
+from app.core.wire_formats import ARROW, JSON, MSGPACK, TOTAL_HEADER, negotiate_media_type
+from app.models.user import User
+
+
+def test_negotiation_prefers_explicit_types_and_defaults_to_json():
+    supported = [JSON, MSGPACK, ARROW]
+    assert negotiate_media_type(None, supported) == JSON
+    assert negotiate_media_type("*/*", supported) == JSON
+    assert negotiate_media_type("application/msgpack, */*;q=0.1", supported) == MSGPACK
+    assert negotiate_media_type("application/msgpack, */*", supported) == MSGPACK
+    assert negotiate_media_type("application/json;q=0.5, application/vnd.apache.arrow.stream", supported) == ARROW
+    assert negotiate_media_type("application/msgpack;q=0", supported) == JSON
+    assert negotiate_media_type("application/msgpack", [JSON]) == JSON
+    assert negotiate_media_type("text/html", supported) == JSON
+
+
+def test_request_serves_preset_body_without_reading_the_stream():
+    # WireFormatRoute hands FastAPI the unpacked msgpack value through Request._body/_json
+    async def receive():
+        raise AssertionError("body must not be read again")
+
+    request = Request({"type": "http", "method": "POST", "headers": [(b"content-type", JSON.encode())]}, receive)
+    request._body = b"packed"
+    request._json = {"email": "wire@example.com"}
+    assert asyncio.run(request.body()) == b"packed"
+    assert asyncio.run(request.json()) == {"email": "wire@example.com"}
+
+
+def test_missing_packages_fall_back_to_json(client, monkeypatch):
+    monkeypatch.setattr(wire_formats, "msgpack", None)
+    r = client.get("/users/?size=2", headers={"Accept": MSGPACK})
+    assert r.status_code == 200 and r.headers["content-type"] == JSON
+    r = client.post("/users/", content=b"\x80", headers={"Content-Type": MSGPACK})
+    assert r.status_code == 415
+
+
+def test_msgpack_round_trip(client, db):
+    body = msgpack.packb({"email": "wire@example.com", "password": "StrongPass123!", "name": "W", "last_name": "F"})
+    try:
+        r = client.post("/users/", content=body, headers={"Content-Type": MSGPACK, "Accept": MSGPACK})
+        assert r.status_code == 201 and r.headers["content-type"] == MSGPACK
+        created = msgpack.unpackb(r.content)
+        assert created["email"] == "wire@example.com" and r.headers["Location"].endswith(created["id"])
+
+        r = client.get(f"/users/{created['id']}", headers={"Accept": MSGPACK})
+        assert msgpack.unpackb(r.content)["email"] == "wire@example.com"
+        assert r.headers["ETag"] == '"1"'
+
+        json_page = client.get("/users/?size=3").json()
+        msgpack_page = client.get("/users/?size=3", headers={"Accept": MSGPACK})
+        assert msgpack.unpackb(msgpack_page.content) == json_page
+        assert len(msgpack_page.content) < len(client.get("/users/?size=3").content)
+
+        invalid = msgpack.packb({"email": "not-an-email", "password": "x"})
+        r = client.post("/users/", content=invalid, headers={"Content-Type": MSGPACK})
+        assert r.status_code == 422 and r.json()["detail"][0]["loc"][0] == "body"
+        assert client.post("/users/", content=b"\xc1", headers={"Content-Type": MSGPACK}).status_code == 422
+    finally:
+        db.execute(delete(User).where(User.email == "wire@example.com"))
+        db.commit()
+
+
+def test_arrow_listing(client, db):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    db.add_all([User(email=f"arrow{i}@example.com", password="x", name="A", last_name="W") for i in range(3)])
+    db.commit()
+    try:
+        _check_arrow_listing(client, pyarrow)
+    finally:
+        db.execute(delete(User).where(User.email.like("arrow%@example.com")))
+        db.commit()
+
+
+def _check_arrow_listing(client, pyarrow):
+    r = client.get("/users/?size=3&fields=id,email", headers={"Accept": ARROW})
+    assert r.status_code == 200 and r.headers["content-type"] == ARROW
+    table = pyarrow.ipc.open_stream(r.content).read_all()
+    assert table.column_names == ["id", "email"]
+    assert table.num_rows == 3
+    assert int(r.headers[TOTAL_HEADER]) == client.get("/users/?size=3").json()["total"]
+    # Not a tabular route: falls back to JSON
+    assert client.get("/users/count", headers={"Accept": ARROW}).headers["content-type"] == JSON